@@ -0,0 +1,44 @@
+import argparse
+import multiprocessing
+import os
+import time
+from utils.batch_runner import collect_jobs, process_stream
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="无界面批量处理视频文件和图片目录")
+    parser.add_argument("inputs", nargs="+", help="视频文件、图片文件或目录")
+    parser.add_argument("--out", default="batch_results", help="结果输出目录")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="逐帧结果格式")
+    parser.add_argument("--mode", choices=["option1", "option2"], default="option1",
+                        help="option1 手势识别，option2 双手框选截图")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="并行进程数，每个进程处理一路")
+    parser.add_argument("--no-render", action="store_true", help="完全跳过绘制，只输出识别结果")
+    parser.add_argument("--flip", type=int, choices=[-1, 0, 1], default=None, help="处理前按 cv2.flip 翻转画面")
+    parser.add_argument("--motion", action="store_true", help="option1 下启用指尖轨迹的动态手势识别（motion 列）")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    jobs = collect_jobs(args.inputs, args.out, fmt=args.format, mode=args.mode,
+                        render=not args.no_render, flip=args.flip, motion=args.motion)
+    if not jobs:
+        print("没有找到可处理的文件")
+        return
+
+    workers = max(1, min(args.workers, len(jobs)))
+    print(f"共 {len(jobs)} 路，使用 {workers} 个进程")
+    started = time.perf_counter()
+    total_frames = 0
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(process_stream, jobs):
+            total_frames += result["frames"]
+            print(f"{result['source']}: {result['frames']} 帧，{result['fps']:.1f} FPS -> {result['output']}")
+
+    elapsed = time.perf_counter() - started
+    print(f"完成：{total_frames} 帧，用时 {elapsed:.1f} s，总吞吐 {total_frames / max(elapsed, 1e-6):.1f} FPS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import json
+import platform
+import time
+import cv2
+import numpy as np
+from utils.detector_pool import create_hand_detector
+from utils.roi_tracker import find_hands_raw
+
+# 用法（在仓库根目录，需要 cvzone/MediaPipe）：
+#   python -m benchmarks.bench_detection --video recording.mp4
+#   python -m benchmarks.bench_detection --image hand_images/ok.png --width 1280 --height 768
+# 不给 --video 时把手部图片平移生成一段合成片段，手在画面中缓慢移动
+
+VARIANTS = (
+    ("static", {"staticMode": True}),        # 每帧都跑手掌检测 + 关键点
+    ("video", {}),                           # 默认：MediaPipe 沿用上一帧手部区域，只在丢失时重新做手掌检测
+    ("video_lite", {"modelComplexity": 0}),  # --lite
+)
+
+
+def synthetic_clip(image_path, width, height, frames, scale):
+    hand = cv2.imread(image_path)
+    hand = cv2.resize(hand, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    h, w = min(hand.shape[0], height), min(hand.shape[1], width)
+    clip = []
+    for i in range(frames):
+        frame = np.full((height, width, 3), 90, dtype=np.uint8)
+        x = int((width - w) * (0.5 + 0.4 * np.sin(i / 20)))
+        y = int((height - h) * (0.5 + 0.4 * np.cos(i / 15)))
+        frame[y:y + h, x:x + w] = hand[:h, :w]
+        clip.append(frame)
+    return clip
+
+
+def video_clip(path, frames):
+    cap = cv2.VideoCapture(path)
+    clip = []
+    while len(clip) < frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        clip.append(frame)
+    cap.release()
+    return clip
+
+
+def bench_variant(clip, config, warmup):
+    detector = create_hand_detector(**config)
+    samples, found = [], 0
+    for i, frame in enumerate(clip):
+        img = frame.copy()
+        t0 = time.perf_counter()
+        hands = find_hands_raw(detector, img)
+        elapsed = (time.perf_counter() - t0) * 1000
+        if i >= warmup:
+            samples.append(elapsed)
+        found += bool(hands)
+    samples = np.array(samples)
+    return {
+        "median_ms": float(np.median(samples)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "mean_ms": float(samples.mean()),
+        "frames_with_hand": found,
+        "frames": len(clip),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MediaPipe 手部检测各模式的每帧耗时对比")
+    parser.add_argument("--video", help="用于计时的录像文件")
+    parser.add_argument("--image", default="hand_images/ok.png", help="未给 --video 时用来合成片段的手部图片")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=768)
+    parser.add_argument("--scale", type=float, default=0.6, help="合成片段中手部图片的缩放比例")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10, help="不计时的起始帧数（含首帧手掌检测）")
+    parser.add_argument("--max-hands", type=int, default=1)
+    parser.add_argument("--out", help="结果写入的 JSON 文件")
+    args = parser.parse_args()
+
+    if args.video:
+        clip = video_clip(args.video, args.frames)
+    else:
+        clip = synthetic_clip(args.image, args.width, args.height, args.frames, args.scale)
+    if len(clip) <= args.warmup:
+        print("帧数不足")
+        return
+
+    results = {}
+    for name, extra in VARIANTS:
+        config = dict({"maxHands": args.max_hands, "detectionCon": 0.8}, **extra)
+        results[name] = stats = bench_variant(clip, config, args.warmup)
+        print(f"{name:12s} 中位数 {stats['median_ms']:6.2f} ms  P95 {stats['p95_ms']:6.2f} ms  "
+              f"检出 {stats['frames_with_hand']}/{stats['frames']}")
+
+    if args.out:
+        frame_h, frame_w = clip[0].shape[:2]
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"machine": platform.platform(), "python": platform.python_version(),
+                       "source": args.video or args.image, "resolution": [frame_w, frame_h],
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
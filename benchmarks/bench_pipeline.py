@@ -0,0 +1,186 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import cv2
+import numpy as np
+from utils.batch_runner import HeadlessSession
+from utils.frame_buffers import FrameBufferPool
+from utils.process_pipeline import ProcessPipeline
+from utils.roi_tracker import draw_hands, find_hands_raw
+from utils.synthetic_hands import SyntheticHands
+
+# 用法（在仓库根目录）：
+#   python -m benchmarks.bench_pipeline --frames 300 --detect-ms 15 --out pipeline.json
+# 用合成画面和模拟检测器比较单进程循环与多进程共享内存流水线的端到端 FPS，无需摄像头和 MediaPipe
+
+
+class SyntheticCapture:
+    # 模拟 cv2.VideoCapture：固定噪声背景，按帧号生成，读完 frames 帧后结束
+    def __init__(self, width, height, frames, seed=0):
+        self.frames = frames
+        self.index = 0
+        self.background = np.random.default_rng(seed).integers(0, 255, (height, width, 3), dtype=np.uint8)
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        if self.index >= self.frames:
+            return False, None
+        if image is None or image.shape != self.background.shape:
+            image = np.empty_like(self.background)
+        np.copyto(image, self.background)
+        cv2.putText(image, str(self.index), (40, 80), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        self.index += 1
+        return True, image
+
+    def release(self):
+        pass
+
+
+class SyntheticDetector:
+    # 模拟 HandDetector：先做与 MediaPipe 预处理相当的缩放/颜色转换/模糊（OpenCV，释放 GIL），
+    # 再占用 detect_ms 毫秒的纯 Python 计算（持有 GIL，对应推理图调度和结果转换），返回沿圆周移动的 'one' 手势
+    def __init__(self, max_hands, detect_ms=15.0, seed=0):
+        self.max_hands = max_hands
+        self.detect_ms = detect_ms
+        gen = SyntheticHands(seed)
+        self.frames = gen.session(gen.trajectory("circle", n=120, size=300), pose="one", hands=max_hands)
+        self.index = 0
+
+    def findHands(self, img, draw=True, flipType=True):
+        small = cv2.resize(img, (256, 256))
+        cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2RGB), (9, 9), 0)
+        deadline = time.perf_counter() + self.detect_ms / 1000.0
+        spin = 0
+        while time.perf_counter() < deadline:
+            spin += 1
+        hands = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        return hands, img
+
+
+def synthetic_capture(source):
+    width, height, frames = source
+    return SyntheticCapture(width, height, frames)
+
+
+def synthetic_detector(max_hands, detect_ms=15.0):
+    return SyntheticDetector(max_hands, detect_ms)
+
+
+def make_renderer():
+    # 与 main.py 渲染阶段相同的工作量：复制 UI 画面、绘制关键点、手势识别和界面绘制
+    session = HeadlessSession("option1", render=True)
+    session.recognizer.writer = None
+    buffers = FrameBufferPool(depth=1)
+
+    def render(index, captured_at, hands, raw_frame):
+        buffers.begin_frame()
+        frame_for_ui = buffers.copy('ui', raw_frame)
+        draw_hands(frame_for_ui, hands)
+        session.step(index, captured_at * 1000.0, hands, raw_frame, frame_for_ui)
+
+    return render
+
+
+def run_single(width, height, frames, detect_ms):
+    cap = synthetic_capture((width, height, frames))
+    detector = synthetic_detector(1, detect_ms)
+    render = make_renderer()
+    raw_frame = np.empty((height, width, 3), dtype=np.uint8)
+    latencies = []
+    frame = None
+    started = time.perf_counter()
+    count = 0
+    while True:
+        ret, frame = cap.read(frame)
+        if not ret:
+            break
+        captured_at = time.perf_counter()
+        cv2.flip(frame, 1, dst=raw_frame)
+        hands = find_hands_raw(detector, raw_frame)
+        render(count, captured_at, hands, raw_frame)
+        latencies.append(time.perf_counter() - captured_at)
+        count += 1
+    elapsed = time.perf_counter() - started
+    return summarize("single", count, elapsed, latencies)
+
+
+def run_processes(width, height, frames, detect_ms, slots):
+    render = make_renderer()
+    pipeline = ProcessPipeline((width, height, frames), max_hands=1, slots=slots, flip=1, drop_frames=False,
+                               detector_factory=synthetic_detector, detector_options={"detect_ms": detect_ms},
+                               capture_factory=synthetic_capture).start()
+    latencies = []
+    count = 0
+    started = None
+    try:
+        for packet in pipeline.results():
+            if started is None:
+                # 不计子进程启动（spawn 导入模块）的时间，从第一帧结果开始计时
+                started = time.perf_counter()
+                first_at = packet.captured_at
+            render(packet.index, packet.captured_at, packet.hands, packet.frame)
+            latencies.append(time.perf_counter() - packet.captured_at)
+            count += 1
+    finally:
+        pipeline.stop()
+    elapsed = time.perf_counter() - (started or time.perf_counter())
+    # 第一帧从采集到结果的时间也算进总时长
+    elapsed += (started - first_at) if started else 0.0
+    return summarize(f"processes[slots={slots}]", count, elapsed, latencies)
+
+
+def summarize(name, frames, elapsed, latencies):
+    latencies = np.asarray(latencies) * 1000.0 if latencies else np.zeros(1)
+    return {
+        "mode": name,
+        "frames": frames,
+        "seconds": elapsed,
+        "fps": frames / max(elapsed, 1e-9),
+        "latency_mean_ms": float(latencies.mean()),
+        "latency_p95_ms": float(np.percentile(latencies, 95)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="单进程与多进程流水线的端到端 FPS 对比（无需摄像头）")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--detect-ms", type=float, default=15.0, help="模拟检测器每帧持有 GIL 的时间")
+    parser.add_argument("--slots", type=int, nargs="+", default=[4], help="共享内存帧槽位数，可给多个")
+    parser.add_argument("--out", help="结果写入的 JSON 文件")
+    args = parser.parse_args()
+
+    results = [run_single(args.width, args.height, args.frames, args.detect_ms)]
+    for slots in args.slots:
+        results.append(run_processes(args.width, args.height, args.frames, args.detect_ms, slots))
+
+    baseline = results[0]["fps"]
+    print(f"{'模式':<20} {'帧数':>6} {'FPS':>8} {'加速比':>7} {'延迟均值ms':>11} {'P95 ms':>8}")
+    for row in results:
+        print(f"{row['mode']:<20} {row['frames']:>6} {row['fps']:>8.1f} {row['fps'] / baseline:>6.2f}x "
+              f"{row['latency_mean_ms']:>11.1f} {row['latency_p95_ms']:>8.1f}")
+    print(f"CPU 核数：{os.cpu_count()}")
+
+    if args.out:
+        meta = {
+            "frames": args.frames,
+            "resolution": [args.width, args.height],
+            "detect_ms": args.detect_ms,
+            "cpu_count": os.cpu_count(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import cv2
+import numpy as np
+from utils.batch_runner import HeadlessSession
+from utils.frame_history import FrameHistoryRing
+from utils.gesture_knn import ExemplarLibrary, NearestNeighborClassifier
+from utils.option_hand_circle_capture import HandGestureRecognizer
+from utils.option_hands_capture import HandsCapture
+from utils.stroke_store import StrokeStore
+from utils.synthetic_hands import SyntheticHands
+from utils.trajectory_recognizer import TrajectoryRecognizer
+
+# 用法（在仓库根目录）：
+#   python -m benchmarks.bench_recognition --out bench.json
+#   python -m benchmarks.bench_recognition --baseline bench.json --threshold 0.15
+# 超过阈值的回退会列出并以退出码 1 结束，可用于升级前的性能门禁
+
+RESOLUTIONS = ((640, 480), (1280, 720), (1920, 1080))
+STROKE_LENGTHS = (0, 100, 1000, 5000)
+
+
+def time_calls(fn, calls, warmup=20):
+    # 逐次计时，返回每次调用耗时（微秒）的统计
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(calls)
+    for i in range(calls):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples[i] = time.perf_counter_ns() - t0
+    samples /= 1000.0
+    return {
+        "calls": calls,
+        "median_us": float(np.median(samples)),
+        "p95_us": float(np.percentile(samples, 95)),
+        "mean_us": float(samples.mean()),
+    }
+
+
+def bench_features(gen, calls):
+    recognizer = HandGestureRecognizer()
+    landmarks, _ = gen.batch(256, ("one", "ok", "open", "fist"))
+    hands = [lm.tolist() for lm in landmarks]
+    it = iter(range(1 << 62))
+    results = {
+        "get_finger_bending_degree": time_calls(
+            lambda: recognizer.get_finger_bending_degree(hands[next(it) % 256]), calls),
+        "check_ok_gesture": time_calls(lambda: recognizer.check_ok_gesture(hands[next(it) % 256]), calls),
+    }
+    batch = time_calls(lambda: recognizer.get_finger_states_batch(landmarks), max(calls // 20, 10))
+    batch["per_hand_us"] = batch["median_us"] / len(landmarks)
+    results["get_finger_states_batch_256"] = batch
+    return results
+
+
+def bench_nn(gen, calls, exemplars=5000):
+    # 近邻分类：单帧与整段批量（每只手）
+    poses = ("one", "ok", "open", "fist", "two")
+    library = ExemplarLibrary()
+    for pose in poses:
+        library.add(np.stack([gen.pose(pose) for _ in range(exemplars // len(poses))]), pose)
+    classifier = NearestNeighborClassifier(library)
+    landmarks, _ = gen.batch(1024, poses)
+    hands = [lm.tolist() for lm in landmarks]
+    it = iter(range(1 << 62))
+    results = {f"nn.classify[{exemplars}]": time_calls(lambda: classifier.classify(hands[next(it) % 1024]), calls)}
+    batch = time_calls(lambda: classifier.classify_batch(landmarks), max(calls // 50, 5), warmup=2)
+    batch["per_hand_us"] = batch["median_us"] / len(landmarks)
+    results[f"nn.classify_batch_1024[{exemplars}]"] = batch
+    return results
+
+
+def bench_motion(gen, calls, fps=30.0):
+    # 动态手势匹配：连续的画圈/划动/折线轨迹逐点喂入，单次 update 的耗时（与已喂入的点数无关）
+    kinds = ("circle", "swipe_left", "zigzag", "swipe_up", "circle", "swipe_right")
+    path = np.concatenate([gen.trajectory(kind, n=30, size=300, jitter=2.0) for kind in kinds])
+    recognizer = TrajectoryRecognizer()
+    it = iter(range(1 << 62))
+
+    def step():
+        i = next(it)
+        recognizer.update(path[i % len(path)], i / fps)
+
+    return {"motion.update": time_calls(step, calls)}
+
+
+def bench_history(gen, calls, width=1280, height=720):
+    # 原始画面环形缓冲：每帧的槽位维护（翻转写入槽位与原先写入 raw 缓冲区相同，不计入），
+    # 以及停留完成时在 0.5 秒窗口内挑最清晰一帧（半屏区域 / 整帧）；
+    # 界面线程只承担 candidates 的区域复制，打分在后台线程
+    history = FrameHistoryRing()
+    frame = gen.rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for i in range(history.capacity_for(frame.shape)):
+        history.push(frame, i / 30)
+    now = history.capacity / 30
+    half = (width // 4, height // 4, width * 3 // 4, height * 3 // 4)
+    results = {
+        "history.candidates[half]": time_calls(lambda: history.candidates(half, now - 0.5, now),
+                                               max(calls // 10, 1), warmup=2),
+        "history.best_frame[half]": time_calls(lambda: history.best_frame(half, now - 0.5, now), max(calls // 10, 1),
+                                               warmup=2),
+        "history.best_frame[full]": time_calls(lambda: history.best_frame(None, now - 0.5, now), max(calls // 10, 1),
+                                               warmup=2),
+    }
+    it = iter(range(1 << 62))
+
+    def step():
+        history.next_slot(frame.shape, frame.dtype)
+        history.commit(now + next(it) / 30)
+
+    results["history.slot"] = time_calls(step, calls)
+    return results
+
+
+def bench_recognize(gen, calls, width=1280, height=720):
+    results = {}
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    raw_frame = gen.rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    path = gen.trajectory("zigzag", n=4096, center=(width / 2, height / 2), size=min(width, height) * 0.6)
+    frames = gen.session(path, pose="one")
+    for length in STROKE_LENGTHS:
+        recognizer = HandGestureRecognizer()
+        for hands in frames[:5]:
+            recognizer.recognize(frame.copy(), hands, raw_frame)
+        for i in range(length):
+            recognizer.stroke.append(path[i % len(path)] - 20)
+        frame_buffer = frame.copy()
+        state = {"i": 0}
+
+        def step(recognizer=recognizer):
+            hands = frames[state["i"] % len(frames)]
+            state["i"] += 1
+            recognizer.preview_stopped = False
+            recognizer.dwell.reset()
+            recognizer.recognize(frame_buffer, hands, raw_frame)
+
+        results[f"recognize[stroke={length}]"] = time_calls(step, calls)
+    return results
+
+
+def bench_stroke(gen, calls, width=1280, height=720):
+    # 笔迹绘制：沿同一个圆反复画，包围框固定，只有点数不同；每次调用追加一个点（与实时绘制相同）
+    results = {}
+    frame = gen.rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    path = gen.trajectory("circle", n=90, center=(width / 2, height / 2), size=min(width, height) * 0.5)
+    for length in STROKE_LENGTHS[1:]:
+        stroke = StrokeStore(capacity=max(2048, 2 * length))
+        for i in range(length):
+            stroke.append(path[i % len(path)])
+        frame_buffer = frame.copy()
+        it = iter(range(length, 1 << 62))
+
+        def step(stroke=stroke):
+            stroke.append(path[next(it) % len(path)])
+            stroke.draw(frame_buffer, (0, 0, 255), 5, alpha=0.7)
+
+        results[f"stroke.draw[stroke={length}]"] = time_calls(step, calls)
+    return results
+
+
+def bench_capture(gen, calls, width=1280, height=720):
+    results = {}
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    raw_frame = gen.rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    frames = gen.session(gen.trajectory("still", n=256, center=(width / 3, height / 2)), pose="one", hands=2)
+    capture = HandsCapture(hover_seconds=10 ** 9)
+    it = iter(range(1 << 62))
+    results["process_frame"] = time_calls(
+        lambda: capture.process_frame(frame, frames[next(it) % len(frames)], raw_frame), calls)
+    tips = [[hand["lmList"][8] for hand in hands] for hands in frames]
+    results["update_and_draw_progress"] = time_calls(
+        lambda: capture.update_and_draw_progress(frame, tips[next(it) % len(tips)], raw_frame), calls)
+    return results
+
+
+def bench_preview(gen, calls):
+    results = {}
+    preview = gen.rng.integers(0, 255, (200, 200, 3), dtype=np.uint8)
+    for width, height in RESOLUTIONS:
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        for name, obj in (("gesture", HandGestureRecognizer()), ("capture", HandsCapture())):
+            obj.preview_image = preview
+            obj.show_save_button = True
+            obj.save_button_rect = (width - 220, height - 35, 200, 40)
+            results[f"{name}.draw_preview_and_save_button[{width}x{height}]"] = time_calls(
+                lambda obj=obj, frame=frame: obj.draw_preview_and_save_button(frame), calls)
+    return results
+
+
+def bench_sessions(gen, calls, width=1280, height=720):
+    # 宏基准：合成会话逐帧经过完整识别流程（含绘制）
+    results = {}
+    raw_frame = gen.rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    ui_frame = np.empty_like(raw_frame)
+    for mode, pose, hands in (("option1", "one", 1), ("option2", "one", 2)):
+        path = np.concatenate([gen.trajectory("circle", n=90, size=300), gen.trajectory("still", n=30)])
+        frames = gen.session(path, pose=pose, hands=hands)
+        session = HeadlessSession(mode, render=True)
+        state = {"i": 0}
+
+        def step(session=session, frames=frames):
+            np.copyto(ui_frame, raw_frame)
+            session.step(state["i"], state["i"] * 1000.0 / 30, frames[state["i"] % len(frames)], raw_frame, ui_frame)
+            state["i"] += 1
+
+        results[f"session.{mode}"] = time_calls(step, calls)
+    return results
+
+
+def run(seed=0, calls=500):
+    gen = SyntheticHands(seed)
+    results = {}
+    for bench in (bench_features, bench_nn, bench_motion, bench_history, bench_recognize, bench_stroke, bench_capture,
+                  bench_preview, bench_sessions):
+        results.update(bench(gen, calls))
+    return {
+        "meta": {
+            "seed": seed,
+            "calls": calls,
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    # 返回 (名称, 基线中位数, 当前中位数, 比值) 列表，以及超过阈值的回退项
+    rows, regressions = [], []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base or not base["median_us"]:
+            continue
+        ratio = result["median_us"] / base["median_us"]
+        rows.append((name, base["median_us"], result["median_us"], ratio))
+        if ratio > 1.0 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="识别热路径基准测试（无需摄像头）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--calls", type=int, default=500, help="每项计时调用次数")
+    parser.add_argument("--out", help="结果写入的 JSON 文件")
+    parser.add_argument("--baseline", help="作为对比基线的 JSON 结果文件")
+    parser.add_argument("--threshold", type=float, default=0.10, help="中位数变慢超过该比例视为回退")
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    current = run(args.seed, args.calls)
+    for name, result in current["results"].items():
+        print(f"{name:<55} 中位数 {result['median_us']:10.1f} us  P95 {result['p95_us']:10.1f} us")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows, regressions = compare(current, baseline, args.threshold)
+        print("\n与基线对比：")
+        for name, base_us, cur_us, ratio in rows:
+            flag = "  <-- 回退" if name in regressions else ""
+            print(f"{name:<55} {base_us:10.1f} -> {cur_us:10.1f} us  x{ratio:.2f}{flag}")
+        if regressions:
+            print(f"\n{len(regressions)} 项超过阈值 {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
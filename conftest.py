@@ -0,0 +1,13 @@
+# pytest 从仓库根目录导入 utils（测试中的素材路径也以仓库根目录为准）
+import os
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def recognizer(monkeypatch):
+    # HandGestureRecognizer 按相对路径加载手势示意图，需要在仓库根目录下创建
+    from utils.option_hand_circle_capture import HandGestureRecognizer
+    monkeypatch.chdir(ROOT)
+    return HandGestureRecognizer()
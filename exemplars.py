@@ -0,0 +1,77 @@
+import argparse
+import json
+import time
+from collections import Counter
+import numpy as np
+from utils.gesture_knn import ExemplarLibrary, NearestNeighborClassifier
+from utils.landmark_recording import LandmarkRecording
+from utils.synthetic_hands import POSE_FINGERS, SyntheticHands
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="构建手势样本库并用近邻分类器为录制打分")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="从录制目录构建样本库，每个录制对应一个手势")
+    build.add_argument("out", help="输出的 .npz 文件")
+    build.add_argument("recordings", nargs="+", help="录制目录:手势名，例如 recordings/ok1:ok")
+    build.add_argument("--step", type=int, default=1, help="每隔多少帧取一个样本")
+    build.add_argument("--append", action="store_true", help="追加到已有的样本库")
+
+    synth = sub.add_parser("synth", help="用合成手势生成样本库（无摄像头时测试用）")
+    synth.add_argument("out", help="输出的 .npz 文件")
+    synth.add_argument("--per-pose", type=int, default=1000)
+    synth.add_argument("--poses", nargs="+", default=list(POSE_FINGERS), choices=list(POSE_FINGERS))
+    synth.add_argument("--seed", type=int, default=0)
+
+    score = sub.add_parser("score", help="对录制逐帧分类")
+    score.add_argument("library", help="样本库 .npz")
+    score.add_argument("recording", help="录制目录")
+    score.add_argument("--k", type=int, default=5)
+    score.add_argument("--max-distance", type=float, default=0.5, help="拒识距离")
+    score.add_argument("--kdtree", action="store_true", help="使用 scipy cKDTree（需安装 scipy）")
+    score.add_argument("--out", help="逐帧结果 .jsonl")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == "build":
+        library = ExemplarLibrary.load(args.out) if args.append else ExemplarLibrary()
+        for item in args.recordings:
+            path, sep, name = item.rpartition(":")
+            if not sep or not path:
+                raise SystemExit(f"需要 录制目录:手势名 的格式：{item}")
+            added = library.add_recording(LandmarkRecording(path), name, step=args.step)
+            print(f"{path}: {added} 个 {name} 样本")
+        library.save(args.out)
+        print(f"样本库共 {len(library)} 个样本 -> {args.out}")
+
+    elif args.command == "synth":
+        gen = SyntheticHands(args.seed)
+        library = ExemplarLibrary()
+        for pose in args.poses:
+            library.add(np.stack([gen.pose(pose) for _ in range(args.per_pose)]), pose)
+        library.save(args.out)
+        print(f"样本库共 {len(library)} 个样本 -> {args.out}")
+
+    else:
+        classifier = NearestNeighborClassifier(ExemplarLibrary.load(args.library), k=args.k,
+                                               max_distance=args.max_distance, use_kdtree=args.kdtree)
+        recording = LandmarkRecording(args.recording)
+        started = time.perf_counter()
+        names, dist = classifier.classify_recording(recording)
+        elapsed = time.perf_counter() - started
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                for i, (name, d) in enumerate(zip(names, dist)):
+                    row = {"frame": i, "time_ms": round(float(recording.timestamps[i]) * 1000.0, 3),
+                           "gesture": name, "distance": round(float(d), 4) if np.isfinite(d) else None}
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        print(f"{len(names)} 帧，用时 {elapsed * 1000:.1f} ms（{elapsed * 1e6 / max(len(names), 1):.1f} us/帧）")
+        for name, count in Counter(names).most_common():
+            print(f"  {name}: {count}")
+
+
+if __name__ == "__main__":
+    main()
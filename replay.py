@@ -0,0 +1,55 @@
+import argparse
+import time
+import cv2
+from utils.batch_runner import TimelineWriter
+from utils.landmark_recording import LandmarkRecording
+from utils.replay_driver import replay
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="回放录制的手部关键点，无需摄像头和 MediaPipe")
+    parser.add_argument("recording", help="main.py --record 生成的录制目录")
+    parser.add_argument("--mode", choices=["option1", "option2"], default="option1",
+                        help="option1 手势识别，option2 双手框选截图")
+    parser.add_argument("--realtime", action="store_true", help="按录制时间戳实时回放（默认全速）")
+    parser.add_argument("--render", action="store_true", help="执行绘制")
+    parser.add_argument("--show", action="store_true", help="显示回放画面（隐含 --render）")
+    parser.add_argument("--frames", help="与录制同步的视频文件，不指定时使用合成画面")
+    parser.add_argument("--out", help="逐帧结果输出文件（.jsonl 或 .csv）")
+    parser.add_argument("--motion", action="store_true", help="option1 下启用指尖轨迹的动态手势识别（motion 列）")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    recording = LandmarkRecording(args.recording)
+    render = args.render or args.show
+    writer = None
+    if args.out:
+        writer = TimelineWriter(args.out, "csv" if args.out.endswith(".csv") else "jsonl")
+
+    frames = 0
+    started = time.perf_counter()
+    try:
+        for frame, row in replay(recording, mode=args.mode, realtime=args.realtime, render=render,
+                                 frames_source=args.frames, motion=args.motion):
+            frames += 1
+            if writer:
+                writer.write(row)
+            if args.show:
+                cv2.imshow("回放", frame)
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+    finally:
+        if writer:
+            writer.close()
+        if args.show:
+            cv2.destroyAllWindows()
+
+    elapsed = time.perf_counter() - started
+    print(f"回放 {frames} 帧，用时 {elapsed:.2f} s，{frames / max(elapsed, 1e-6):.1f} FPS，"
+          f"{elapsed * 1000 / max(frames, 1):.3f} ms/帧")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import os
+import time
+from utils.stream_server import StreamServer, StreamSource
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="多路摄像头/视频同时识别，共享检测线程池")
+    parser.add_argument("sources", nargs="+", help="摄像头编号、RTSP 地址或视频文件")
+    parser.add_argument("--mode", choices=["option1", "option2"], default="option1",
+                        help="option1 手势识别，option2 双手框选截图")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="检测线程数")
+    parser.add_argument("--queue-size", type=int, default=2, help="每路最多积压的帧数，超出后丢弃最旧的帧")
+    parser.add_argument("--pace", action="store_true", help="视频文件按原帧率读取，模拟实时摄像头（会丢帧）")
+    parser.add_argument("--loop", action="store_true", help="视频文件读完后从头循环")
+    parser.add_argument("--duration", type=float, help="运行秒数，不指定时直到所有输入结束")
+    parser.add_argument("--render", action="store_true", help="执行识别结果的绘制（默认跳过）")
+    parser.add_argument("--flip", type=int, choices=[-1, 0, 1], default=None, help="处理前按 cv2.flip 翻转画面")
+    parser.add_argument("--motion", action="store_true", help="option1 下启用指尖轨迹的动态手势识别（motion 列）")
+    parser.add_argument("--out", help="逐帧结果输出目录，每路一个 .jsonl")
+    parser.add_argument("--stats-interval", type=float, default=5.0, help="打印各路统计的间隔（秒）")
+    return parser.parse_args()
+
+
+def print_stats(summary):
+    for name, s in summary["streams"].items():
+        print(f"  {name:<20} 采集 {s['captured']:6d}  处理 {s['rendered']:6d}  丢帧 {s['capture_dropped']:6d}  "
+              f"{s['fps']:6.1f} FPS  延迟均值 {s['latency_mean_ms']:6.1f} ms  P95 {s['latency_p95_ms']:6.1f} ms")
+    print(f"  合计 {summary['processed']} 帧，{summary['fps']:.1f} FPS（{summary['workers']} 个检测线程）")
+
+
+def main():
+    args = parse_args()
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    streams = []
+    for i, source in enumerate(args.sources):
+        name = f"{i}_{os.path.splitext(os.path.basename(source.rstrip('/')))[0] or 'stream'}"
+        timeline = os.path.join(args.out, f"{name}.jsonl") if args.out else None
+        streams.append(StreamSource(name, source, mode=args.mode, render=args.render, queue_size=args.queue_size,
+                                    pace=args.pace, flip=args.flip, loop=args.loop, timeline=timeline,
+                                    motion=args.motion))
+
+    server = StreamServer(streams, workers=args.workers).start()
+    print(f"共 {len(streams)} 路，{args.workers} 个检测线程，Ctrl+C 结束")
+    deadline = time.perf_counter() + args.duration if args.duration else None
+    last_report = time.perf_counter()
+    try:
+        while server.running() and (deadline is None or time.perf_counter() < deadline):
+            time.sleep(0.1)
+            if time.perf_counter() - last_report >= args.stats_interval:
+                last_report = time.perf_counter()
+                print_stats(server.summary())
+    except KeyboardInterrupt:
+        pass
+    server.stop()
+    print("最终统计：")
+    print_stats(server.summary())
+
+
+if __name__ == "__main__":
+    main()
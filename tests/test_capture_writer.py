@@ -0,0 +1,109 @@
+import itertools
+import json
+import os
+from datetime import datetime
+import cv2
+import numpy as np
+import pytest
+import utils.capture_writer as capture_writer
+from utils.capture_writer import CaptureWriter
+
+IMAGE = np.random.default_rng(0).integers(0, 255, (40, 60, 3), dtype=np.uint8)
+
+
+class FrozenClock:
+    @staticmethod
+    def now():
+        return datetime(2024, 1, 2, 3, 4, 5, 678000)
+
+
+def read_sidecar(path):
+    with open(os.path.splitext(path)[0] + ".json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_names_do_not_collide(tmp_path):
+    writer = CaptureWriter(queue_size=32)
+    futures = [writer.submit(IMAGE, str(tmp_path)) for _ in range(20)]
+    writer.close()
+    paths = [future.result() for future in futures]
+    assert len(set(paths)) == 20
+    assert sorted(os.path.basename(p) for p in paths) == sorted(f for f in os.listdir(tmp_path) if f.endswith(".png"))
+
+
+def test_returns_actual_path_after_rename(tmp_path, monkeypatch):
+    # 同一毫秒、同一序号（例如两个进程写同一目录）时第二张改名为 name_1，返回值和预录片段都按改名后的文件名
+    monkeypatch.setattr(capture_writer, "datetime", FrozenClock)
+    writer = CaptureWriter()
+    writer._sequence = itertools.repeat(0)
+    clip = np.zeros((3, 48, 64, 3), dtype=np.uint8), np.arange(3) / 30
+    first = writer.submit(IMAGE, str(tmp_path))
+    second = writer.submit(IMAGE, str(tmp_path), clip=clip)
+    writer.close()
+    name = "hand_20240102_030405_678_0000"
+    assert first.result() == os.path.join(str(tmp_path), name + ".png")
+    path = second.result()
+    assert path == os.path.join(str(tmp_path), name + "_1.png")
+    assert os.path.isfile(os.path.join(str(tmp_path), name + "_1.mp4"))
+    assert not os.path.exists(os.path.join(str(tmp_path), name + ".mp4"))
+    info = read_sidecar(path)
+    assert info["file"] == name + "_1.png"
+    assert info["clip"] == name + "_1.mp4"
+
+
+def test_sidecar_records_metadata(tmp_path):
+    writer = CaptureWriter(fmt="jpeg", quality=80)
+    future = writer.submit(IMAGE, str(tmp_path), metadata={"gesture": "one", "rect": [1, 2, 61, 42]})
+    writer.close()
+    info = read_sidecar(future.result())
+    assert info["gesture"] == "one" and info["rect"] == [1, 2, 61, 42]
+    assert info["format"] == "jpeg" and info["quality"] == 80
+    assert (info["width"], info["height"]) == (60, 40)
+    assert "timestamp" in info and "clip" not in info
+
+
+def test_no_sidecar(tmp_path):
+    writer = CaptureWriter(sidecar=False)
+    future = writer.submit(IMAGE, str(tmp_path))
+    writer.close()
+    assert os.listdir(tmp_path) == [os.path.basename(future.result())]
+
+
+def test_encoding_params(tmp_path):
+    png = CaptureWriter()
+    assert png.params == [cv2.IMWRITE_PNG_COMPRESSION, 3]
+    path = png.submit(IMAGE, str(tmp_path)).result()
+    png.close()
+    assert path.endswith(".png") and np.array_equal(cv2.imread(path), IMAGE)
+
+    sizes = {}
+    for quality in (10, 95):
+        writer = CaptureWriter(fmt="jpeg", quality=quality)
+        assert writer.params == [cv2.IMWRITE_JPEG_QUALITY, quality]
+        path = writer.submit(IMAGE, str(tmp_path / str(quality))).result()
+        writer.close()
+        assert path.endswith(".jpg")
+        sizes[quality] = os.path.getsize(path)
+    assert sizes[10] < sizes[95]
+
+    with pytest.raises(ValueError):
+        CaptureWriter(fmt="bmp")
+
+
+def test_close_flushes_pending(tmp_path):
+    writer = CaptureWriter(queue_size=64)
+    for _ in range(30):
+        writer.submit(IMAGE, str(tmp_path))
+    writer.close()
+    assert writer.pending() == 0
+    assert writer.saved == 30
+    assert len([f for f in os.listdir(tmp_path) if f.endswith(".png")]) == 30
+
+
+def test_full_queue_drops(tmp_path):
+    writer = CaptureWriter(queue_size=1)
+    # 工作线程还没启动时先占满队列
+    writer._threads = [None]
+    writer._queue.put_nowait(None)
+    assert writer.submit(IMAGE, str(tmp_path)) is None
+    assert writer.dropped == 1
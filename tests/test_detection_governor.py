@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+import utils.detection_governor as detection_governor
+from utils.detection_governor import DetectionGovernor, LandmarkPredictor
+from utils.roi_tracker import make_hand
+from utils.synthetic_hands import SyntheticHands
+
+TEMPLATE = SyntheticHands(0).pose("one", wrist=(300, 400), angle=0.0, noise=0.0)
+VELOCITY = np.array([240.0, -90.0])  # 像素/秒
+
+
+class FakeClock:
+    # 代替模块里的 time：检测耗时由假检测器推进，与机器快慢无关
+    def __init__(self):
+        self.t = 0.0
+
+    def perf_counter(self):
+        return self.t
+
+
+class MovingDetector:
+    # 一只手以 VELOCITY 匀速移动；每次调用把时钟推进 cost_ms
+    def __init__(self, clock=None, cost_ms=0.0):
+        self.clock = clock
+        self.cost_ms = cost_ms
+        self.calls = []
+
+    def findHands(self, img, draw=True, flipType=True):
+        now = img["now"]
+        self.calls.append(now)
+        if self.clock is not None:
+            self.clock.t += self.cost_ms / 1000
+        return [make_hand(true_landmarks(now).tolist(), "Right")], img
+
+
+def true_landmarks(now):
+    lm = TEMPLATE.astype(np.float64)
+    lm[:, :2] += VELOCITY * now
+    return np.rint(lm).astype(np.int64)
+
+
+def run(governor, frames, fps=30.0):
+    # 画面用字典代替，假检测器从中取本帧时间
+    out = []
+    for i in range(frames):
+        now = i / fps
+        hands, _ = governor.findHands({"now": now}, draw=False, now=now)
+        out.append((now, hands))
+    return out
+
+
+def test_every_n_frames():
+    detector = MovingDetector()
+    governor = DetectionGovernor(detector, every=3)
+    run(governor, 10)
+    assert detector.calls == pytest.approx([0 / 30, 3 / 30, 6 / 30, 9 / 30])
+    assert (governor.detections, governor.predictions) == (4, 6)
+
+
+@pytest.mark.parametrize("cost_ms, budget_ms, interval", [(20.0, 8.0, 3), (5.0, 8.0, 1), (16.0, 8.0, 2),
+                                                          (100.0, 8.0, 6)])
+def test_budget_sets_interval(monkeypatch, cost_ms, budget_ms, interval):
+    clock = FakeClock()
+    monkeypatch.setattr(detection_governor, "time", clock)
+    detector = MovingDetector(clock, cost_ms)
+    governor = DetectionGovernor(detector, every=1, budget_ms=budget_ms, max_every=6)
+    assert governor.interval() == 1
+    run(governor, 60)
+    assert governor.detect_ms == pytest.approx(cost_ms)
+    assert governor.interval() == interval
+    # 第一次测出耗时后每 interval 帧检测一次
+    gaps = np.diff(np.rint(np.asarray(detector.calls) * 30)).astype(int)
+    assert set(gaps[1:].tolist()) == {interval}
+
+
+def test_predictor_extrapolates_constant_velocity():
+    governor = DetectionGovernor(MovingDetector(), every=3)
+    out = run(governor, 90)
+    # 速度估计经过几次检测收敛后，跳过的帧与真实位置相差不超过 1 像素（取整误差）
+    for now, hands in out[30:]:
+        assert np.abs(np.asarray(hands[0]["lmList"]) - true_landmarks(now)).max() <= 1
+    assert hands[0]["type"] == "Right"
+
+
+def test_predictor_horizon_and_reset():
+    predictor = LandmarkPredictor(smoothing=1.0, max_horizon=0.25)
+    assert predictor.predict(0.0) == []
+    for now in (0.0, 0.1):
+        predictor.correct([make_hand(true_landmarks(now).tolist(), "Right")], now)
+    # 外推时间不超过 max_horizon
+    far = np.asarray(predictor.predict(5.0)[0]["lmList"])
+    assert np.abs(far - true_landmarks(0.1 + 0.25)).max() <= 1
+    # 手丢失后不再外推
+    predictor.correct([], 0.2)
+    assert predictor.predict(0.3) == []
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from utils.dwell_timer import DwellTimer
+
+
+def completion_time(fps, seconds=100 / 30, move_until=1.0, duration=6.0, jitter=1.0, seed=0):
+    # 指尖先以 600 像素/秒移动 move_until 秒，之后停住（带检测抖动）；返回停留完成的时间
+    rng = np.random.default_rng(seed)
+    timer = DwellTimer(seconds, max_speed=300.0)
+    for i in range(int(duration * fps) + 1):
+        now = i / fps
+        x = 100 + 600 * min(now, move_until)
+        timer.update((x + rng.normal(0, jitter), 300 + rng.normal(0, jitter)), now)
+        if timer.done:
+            return now
+    return None
+
+
+def test_dwell_completes_at_same_time_at_10_and_60_fps():
+    seconds = 100 / 30
+    t10, t60 = completion_time(10), completion_time(60)
+    assert t10 is not None and t60 is not None
+    # 都在停下后约 seconds 秒完成，相差不超过低帧率下的一帧
+    for t, fps in ((t10, 10), (t60, 60)):
+        assert 1.0 + seconds - 1 / fps <= t <= 1.0 + seconds + 2 / fps
+    assert abs(t10 - t60) <= 1 / 10 + 1e-9
+
+
+def test_jitter_at_high_fps_is_not_movement():
+    # 60 fps 下逐帧抖动几个像素，按相邻两帧换算的速度会超过 max_speed；按 window 秒前的位置判断则不算移动
+    rng = np.random.default_rng(1)
+    points = 300 + rng.normal(0, 1.5, (180, 2))
+    frame_speed = np.hypot(*np.diff(points, axis=0).T) * 60
+    assert frame_speed.max() > 300
+    timer = DwellTimer(1.0, max_speed=300.0)
+    moving = [timer.update(p, i / 60) for i, p in enumerate(points)]
+    assert not any(moving)
+    assert timer.done
+
+
+def test_progress_and_restart():
+    timer = DwellTimer(2.0)
+    for i in range(31):
+        timer.update((10, 10), i / 30)
+    assert timer.progress == pytest.approx(0.5)
+    timer.restart(1.0)
+    timer.update((10, 10), 1.5)
+    assert timer.progress == pytest.approx(0.25)
+
+
+def test_gap_and_point_count_restart_timing():
+    timer = DwellTimer(1.0, max_gap=0.5)
+    for i in range(25):
+        timer.update((10, 10), i / 30)
+    assert timer.elapsed == pytest.approx(24 / 30)
+    # 手丢失超过 max_gap 后重新计时
+    timer.update((10, 10), 24 / 30 + 0.6)
+    assert timer.elapsed == 0.0
+    timer.update((10, 10), 24 / 30 + 0.7)
+    assert timer.elapsed == pytest.approx(0.1)
+    # 跟踪点数量变化（单手 -> 双手）也重新计时
+    timer.update([(10, 10), (50, 50)], 24 / 30 + 0.8)
+    assert timer.elapsed == 0.0
@@ -0,0 +1,136 @@
+import threading
+import cv2
+import numpy as np
+from concurrent.futures import Future
+from utils.frame_history import BestFrameCapture, FrameHistoryRing
+from utils.option_hands_capture import HandsCapture
+
+RNG = np.random.default_rng(0)
+SHARP = RNG.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+BLUR = cv2.GaussianBlur(SHARP, (9, 9), 0)
+
+
+def test_best_frame_picks_sharpest_in_window():
+    ring = FrameHistoryRing(max_bytes=SHARP.nbytes * 8)
+    for i in range(8):
+        ring.push(SHARP if i == 5 else BLUR, i / 30)
+    crop, timestamp, _ = ring.best_frame((10, 20, 90, 100), since=3 / 30, until=7 / 30)
+    assert timestamp == 5 / 30
+    assert np.array_equal(crop, SHARP[20:100, 10:90])
+    # 返回的是副本，之后写入的帧不会改动它
+    for i in range(8):
+        ring.push(np.zeros_like(SHARP), (8 + i) / 30)
+    assert np.array_equal(crop, SHARP[20:100, 10:90])
+
+
+def test_uncommitted_slot_is_never_read():
+    ring = FrameHistoryRing(max_bytes=SHARP.nbytes * 4)
+    for i in range(4):
+        ring.push(BLUR, i)
+    slot = ring.next_slot(SHARP.shape)
+    slot[:] = SHARP
+    # 写了一半（尚未 commit）的槽位不参与挑选
+    _, timestamp, _ = ring.best_frame()
+    assert timestamp != 0
+    assert len(ring) == 3
+    ring.commit(4)
+    assert ring.best_frame()[1] == 4
+
+
+def test_concurrent_writes_and_reads():
+    # 写入线程每帧写入整帧常数 k，读取到的帧必须是某个完整的常数帧
+    ring = FrameHistoryRing(max_bytes=SHARP.nbytes * 4)
+    stop = threading.Event()
+
+    def write():
+        k = 0
+        while not stop.is_set():
+            slot = ring.next_slot(SHARP.shape)
+            slot[:] = k % 256
+            ring.commit(k)
+            k += 1
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    try:
+        for _ in range(200):
+            frames, times = ring.clip(1.0)
+            for frame, t in zip(frames, times):
+                assert (frame == int(t) % 256).all()
+    finally:
+        stop.set()
+        thread.join()
+
+
+def test_hands_capture_replaces_crop_with_sharpest_frame():
+    ring = FrameHistoryRing(max_bytes=SHARP.nbytes * 16)
+    capture = HandsCapture()
+    capture.render = False
+    capture.best_frame = BestFrameCapture(ring)
+    hands = [{"lmList": [[0, 0, 0]] * 8 + [[40, 30, 0]] + [[0, 0, 0]] * 12},
+             {"lmList": [[0, 0, 0]] * 8 + [[120, 90, 0]] + [[0, 0, 0]] * 12}]
+    # 一直推送模糊帧，停留（100 帧）快完成前插入一帧清晰画面
+    sharp_at = 95
+    for i in range(130):
+        now = i / 30
+        raw = ring.push(SHARP if i == sharp_at else BLUR, now)
+        capture.process_frame(raw.copy(), hands, raw, now=now)
+        if capture.show_save_button:
+            break
+    assert capture.show_save_button
+    capture.best_frame._pending[0].result()
+    capture._apply_best_frame()
+    x_min, y_min, x_max, y_max = capture.last_captured_rect
+    assert np.array_equal(capture.latest_crop, SHARP[y_min:y_max, x_min:x_max])
+    assert capture.latest_crop_info["frame_age_ms"] == round((i - sharp_at) / 30 * 1000, 1)
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.saved = []
+        self.clips = []
+
+    def submit(self, image, directory, prefix="hand", metadata=None, clip=None):
+        self.saved.append((image, dict(metadata or {})))
+        path = f"{directory}/{prefix}_{len(self.saved)}.png"
+        if clip is not None:
+            self.clips.append((len(clip[0]), path))
+        future = Future()
+        future.set_result(path)
+        return future
+
+
+class PendingHistory:
+    # best_frame_async 返回由测试手动完成的 Future，模拟后台选帧还没结束
+    def __init__(self):
+        self.future = Future()
+
+    def best_frame_async(self, rect=None, since=-np.inf, until=np.inf):
+        return self.future
+
+    def clip(self, seconds, until=np.inf):
+        return np.zeros((3, 4, 4, 3), dtype=np.uint8), np.arange(3.0)
+
+
+def test_save_does_not_wait_for_best_frame():
+    history = PendingHistory()
+    best_frame = BestFrameCapture(history, clip_seconds=1.0)
+    writer = RecordingWriter()
+    best_frame.start((0, 0, 4, 4), now=2.0)
+    done = best_frame.save(writer, BLUR[:4, :4], "captures", {"frame_age_ms": 0.0})
+    # 选帧未完成：保存不等待，也还没有提交
+    assert not done.done() and writer.saved == []
+    history.future.set_result((SHARP[:4, :4].copy(), 1.5, 100.0))
+    assert done.result(timeout=1) == "captures/hand_1.png"
+    image, info = writer.saved[0]
+    assert np.array_equal(image, SHARP[:4, :4])
+    assert info["frame_age_ms"] == 500.0
+    assert writer.clips == [(3, "captures/hand_1.png")]
+
+
+def test_save_without_history_submits_current_crop():
+    writer = RecordingWriter()
+    done = BestFrameCapture().save(writer, BLUR[:4, :4], "captures", {})
+    assert done.result(timeout=1) == "captures/hand_1.png"
+    assert np.array_equal(writer.saved[0][0], BLUR[:4, :4])
+    assert writer.clips == []
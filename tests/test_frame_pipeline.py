@@ -0,0 +1,86 @@
+import time
+import numpy as np
+from utils.frame_pipeline import FramePipeline
+from utils.option_hand_circle_capture import HandGestureRecognizer
+from utils.roi_tracker import make_hand
+from utils.synthetic_hands import SyntheticHands
+
+# 每段手势持续的帧数；None 表示画面中没有手
+SCRIPT = [("one", 20), ("ok", 12), (None, 6), ("open", 10), ("fist", 10), ("one", 30), ("ok", 4), ("one", 8)]
+
+
+def scripted_hands():
+    gen = SyntheticHands(0, frame_size=(640, 480))
+    frames = []
+    for pose, count in SCRIPT:
+        for _ in range(count):
+            frames.append([] if pose is None else [make_hand(gen.pose(pose, wrist=(320, 400)).tolist(), "Right")])
+    return frames
+
+
+class FakeCapture:
+    # 第 i 帧整幅画面填充为 i（按 16 位拆成两个通道），检测器据此找回帧号
+    def __init__(self, frames):
+        self.frames = frames
+        self.index = 0
+
+    def read(self, frame=None):
+        if self.index >= self.frames:
+            return False, None
+        frame = np.empty((48, 64, 3), dtype=np.uint8)
+        frame[..., 0] = self.index % 256
+        frame[..., 1] = self.index // 256
+        self.index += 1
+        return True, frame
+
+
+class ScriptedDetector:
+    # 按帧号返回预先生成的手，耗时随机抖动，让流水线各线程的先后顺序每次都不同
+    def __init__(self, hands):
+        self.hands = hands
+        self.rng = np.random.default_rng(1)
+
+    def findHands(self, img, draw=True, flipType=True):
+        index = int(img[0, 0, 0]) + 256 * int(img[0, 0, 1])
+        time.sleep(self.rng.uniform(0, 0.002))
+        return [dict(hand) for hand in self.hands[index]], img
+
+
+def prepare(frame, captured_at):
+    return frame.copy(), frame.copy()
+
+
+def recognize(recognizer, index, hands, raw_frame):
+    # 时间取帧号 / 30，两条路径的停留计时与处理快慢无关
+    _, gesture = recognizer.recognize(raw_frame.copy(), hands, raw_frame, now=index / 30)
+    return index, gesture
+
+
+def test_pipeline_matches_serial_on_video_file(recognizer):
+    hands = scripted_hands()
+    n = len(hands)
+
+    recognizer.render = False
+    cap, detector = FakeCapture(n), ScriptedDetector(hands)
+    serial = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        raw_frame, frame_for_ui = prepare(frame, None)
+        found, frame_for_ui = detector.findHands(frame_for_ui)
+        serial.append(recognize(recognizer, cap.index - 1, found, raw_frame))
+
+    # 录像文件（drop_frames=False）：流水线不丢帧，手势序列必须与串行一致
+    pipelined_recognizer = HandGestureRecognizer()
+    pipelined_recognizer.render = False
+    pipeline = FramePipeline(FakeCapture(n), ScriptedDetector(hands), prepare, drop_frames=False).start()
+    pipelined = [recognize(pipelined_recognizer, packet.index, packet.hands, packet.raw_frame)
+                 for packet in pipeline.results()]
+    pipeline.stop()
+
+    assert [index for index, _ in pipelined] == list(range(n))
+    assert pipelined == serial
+    assert {gesture for _, gesture in serial} >= {"one", "ok", None}
+    assert pipeline.stats.captured == pipeline.stats.detected == n
+    assert pipeline.stats.capture_dropped == pipeline.stats.detect_dropped == 0
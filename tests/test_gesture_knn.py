@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from utils.gesture_knn import ExemplarLibrary, NearestNeighborClassifier, cKDTree, landmark_embeddings
+from utils.synthetic_hands import SyntheticHands
+
+POSES = ("one", "ok", "open", "fist")
+
+
+def transform(lm, scale=1.0, angle=0.0, shift=(0.0, 0.0)):
+    # 绕手腕在平面内旋转、缩放（z 同比例）后平移
+    lm = np.asarray(lm, dtype=np.float64).copy()
+    wrist = lm[0, :2].copy()
+    c, s = np.cos(np.radians(angle)), np.sin(np.radians(angle))
+    xy = (lm[:, :2] - wrist) @ np.array([[c, s], [-s, c]]) * scale
+    lm[:, :2] = xy + wrist + shift
+    lm[:, 2] *= scale
+    return lm
+
+
+def library(seed=0, per_pose=40):
+    gen = SyntheticHands(seed)
+    lib = ExemplarLibrary()
+    for pose in POSES:
+        lib.add(np.stack([gen.pose(pose) for _ in range(per_pose)]).astype(np.float64), pose)
+    return lib
+
+
+def test_embeddings_ignore_position_scale_and_rotation():
+    gen = SyntheticHands(0)
+    lm = gen.pose("one", noise=0.0).astype(np.float64)
+    base = landmark_embeddings(lm)
+    for scale, angle, shift in [(1.0, 0.0, (200, -50)), (0.4, 0.0, (0, 0)), (2.5, 35.0, (-100, 80)),
+                                (1.0, -90.0, (10, 10)), (0.7, 170.0, (300, 0))]:
+        np.testing.assert_allclose(landmark_embeddings(transform(lm, scale, angle, shift)), base, atol=1e-5)
+
+
+def test_left_hand_is_mirrored():
+    gen = SyntheticHands(0)
+    lm = gen.pose("ok", noise=0.0).astype(np.float64)
+    mirrored = lm.copy()
+    mirrored[:, 0] = 1280 - mirrored[:, 0]
+    np.testing.assert_allclose(landmark_embeddings(mirrored, ["Left"]), landmark_embeddings(lm, ["Right"]),
+                               atol=1e-5)
+    # 不给类型时不做镜像，镜像后的手与原手不同
+    assert not np.allclose(landmark_embeddings(mirrored), landmark_embeddings(lm), atol=1e-2)
+
+
+def test_classifies_transformed_and_mirrored_hands():
+    classifier = NearestNeighborClassifier(library(), k=5, max_distance=0.5)
+    gen = SyntheticHands(1)
+    for pose in POSES:
+        lm = transform(gen.pose(pose), scale=1.8, angle=60.0, shift=(-150, 40))
+        assert classifier.classify(lm.tolist())[0] == pose
+        mirrored = lm.copy()
+        mirrored[:, 0] *= -1
+        assert classifier.classify(mirrored.tolist(), "Left")[0] == pose
+
+
+def test_max_distance_rejects_unknown_hands():
+    lib = library()
+    gen = SyntheticHands(2)
+    # 关节随机乱放的“手”：离所有样本都很远
+    garbage = gen.pose("open").astype(np.float64)
+    garbage[1:, :2] = garbage[0, :2] + gen.rng.uniform(-200, 200, (20, 2))
+    label, dist = NearestNeighborClassifier(lib, max_distance=0.5).classify(garbage.tolist())
+    assert label is None and dist > 0.5
+    # 不设拒识距离时总会给出某个类别，距离相同
+    label, same_dist = NearestNeighborClassifier(lib, max_distance=None).classify(garbage.tolist())
+    assert label in POSES and same_dist == dist
+    # 正常的手在阈值内
+    label, dist = NearestNeighborClassifier(lib, max_distance=0.5).classify(gen.pose("fist").tolist())
+    assert label == "fist" and dist <= 0.5
+
+
+@pytest.mark.parametrize("use_kdtree", [False, True])
+def test_classify_batch_matches_classify(use_kdtree):
+    if use_kdtree and cKDTree is None:
+        pytest.skip("需要 scipy")
+    classifier = NearestNeighborClassifier(library(), k=3, max_distance=0.3, use_kdtree=use_kdtree)
+    gen = SyntheticHands(3)
+    landmarks, _ = gen.batch(200, POSES)
+    landmarks = landmarks.astype(np.float64)
+    landmarks[::7, 4:9, :2] += gen.rng.normal(0, 40, (len(landmarks[::7]), 5, 2))
+    types = [("Left", "Right", None)[i % 3] for i in range(len(landmarks))]
+    # chunk_size 小于样本数，同时覆盖分块路径
+    names, dist = classifier.classify_batch(landmarks, types, chunk_size=64)
+    assert None in names and len(set(names) - {None}) == len(POSES)
+    for lm, hand_type, name, d in zip(landmarks, types, names, dist):
+        single_name, single_dist = classifier.classify(lm, hand_type)
+        assert single_name == name
+        # 暴力搜索在 float32 中按展开的平方距离计算，批量与单个的矩阵乘法舍入不同
+        assert single_dist == pytest.approx(d, abs=1e-3)
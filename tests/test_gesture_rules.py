@@ -0,0 +1,55 @@
+import numpy as np
+from utils.gesture_rules import GestureRuleIndex
+from utils.synthetic_hands import SyntheticHands
+
+
+def tip_offsets():
+    # 拇指尖相对食指尖的偏移：随机、恰在 30 像素边界上的整数勾股数、边界两侧的小数
+    rng = np.random.default_rng(0)
+    offsets = [tuple(v) for v in rng.integers(-60, 61, (2000, 2))]
+    offsets += [(30, 0), (0, -30), (18, 24), (-24, 18), (29, 0), (21, 21), (22, 21)]
+    offsets += [tuple(v) for v in rng.normal(0, 1, (500, 2)) / np.sqrt(2) + 30 / np.sqrt(2)]
+    return offsets
+
+
+def test_ok_touch_rule_matches_check_ok_gesture(recognizer):
+    # 'ok' 由 'check': check_ok_gesture 改为 'touch': (4, 8, 30)，两者对任意关键点的判定必须一致
+    touch = GestureRuleIndex({'ok': recognizer.gesture_config['ok']})
+    check = GestureRuleIndex({'ok': {'check': recognizer.check_ok_gesture}})
+    gen = SyntheticHands(0)
+    fingers = np.zeros(5, dtype=np.int64)
+    hands = []
+    for dx, dy in tip_offsets():
+        lm = gen.pose(gen.rng.choice(["one", "ok", "open", "fist"])).astype(np.float64)
+        lm[4, :2] = lm[8, :2] + (dx, dy)
+        if float(dx).is_integer() and float(dy).is_integer():
+            lm = lm.astype(np.int64)
+        hands.append(lm)
+        assert touch.match(fingers, lm.tolist()) == check.match(fingers, lm.tolist()), (dx, dy)
+    landmarks = np.asarray(hands, dtype=np.float64)
+    batch_fingers = np.zeros((len(hands), 5), dtype=np.int64)
+    assert np.array_equal(touch.hit_matrix(batch_fingers, landmarks), check.hit_matrix(batch_fingers, landmarks))
+
+
+def test_hit_matrix_with_many_rules_matches_linear_scan():
+    # 数百条手指规则与距离规则混合：查表 + 向量化的结果与逐条线性匹配一致
+    rng = np.random.default_rng(1)
+    config = {}
+    for i in range(400):
+        if i % 3:
+            config[f"fingers{i}"] = {'fingers': rng.integers(0, 2, 5).tolist()}
+        else:
+            a, b = rng.choice(21, 2, replace=False)
+            config[f"touch{i}"] = {'touch': (int(a), int(b), float(rng.uniform(20, 200)))}
+    index = GestureRuleIndex(config)
+    fingers = rng.integers(0, 2, (50, 5))
+    landmarks = rng.uniform(0, 400, (50, 21, 3))
+    expected = np.zeros((50, len(config)), dtype=bool)
+    for pos, rule in enumerate(config.values()):
+        for i in range(50):
+            if 'fingers' in rule:
+                expected[i, pos] = fingers[i].tolist() == rule['fingers']
+            else:
+                a, b, limit = rule['touch']
+                expected[i, pos] = np.hypot(*(landmarks[i, a, :2] - landmarks[i, b, :2])) < limit
+    assert np.array_equal(index.hit_matrix(fingers, landmarks), expected)
@@ -0,0 +1,73 @@
+import numpy as np
+from utils.multi_hand_state import MultiHandState
+
+
+def vote_sequence(state, sequence, fps=30.0):
+    results = []
+    for i, gestures in enumerate(sequence):
+        now = i / fps
+        slots = state.update([[100.0, 100.0]], now)
+        results.append(state.vote(slots, state.gesture_hits([gestures]), now)[0])
+    return results
+
+
+def test_majority_in_frame_window():
+    state = MultiHandState(history_ms=None, window_frames=3)
+    sequence = [["one"], ["one"], ["ok"], ["ok"], ["ok"], []]
+    assert vote_sequence(state, sequence) == ["one", "one", "one", "ok", "ok", "ok"]
+
+
+def test_enter_ratio_delays_switch():
+    state = MultiHandState(history_ms=None, window_frames=4, enter_ratio=0.75)
+    sequence = [["one"]] * 4 + [["ok"]] * 3
+    assert vote_sequence(state, sequence) == ["one"] * 5 + [None, "ok"]
+
+
+def test_exit_ratio_holds_current_gesture():
+    state = MultiHandState(history_ms=None, window_frames=4, exit_ratio=0.25)
+    sequence = [["one"]] * 4 + [["ok"]] * 4
+    # 'one' 在窗口中还占 1/4 时保持不变，完全移出窗口后才切换
+    assert vote_sequence(state, sequence) == ["one"] * 7 + ["ok"]
+
+
+def test_time_window_drops_old_votes():
+    state = MultiHandState(history_ms=100)
+    sequence = [["one"]] * 5 + [["ok"]] * 4
+    assert vote_sequence(state, sequence)[-1] == "ok"
+
+
+def test_more_than_63_gestures():
+    # 自定义手势可达数百种，投票不能受位掩码宽度限制
+    state = MultiHandState(history_ms=None, window_frames=3)
+    names = [f"pose{i}" for i in range(200)]
+    for name in names:
+        state.gesture_code(name)
+    sequence = [["pose150"], ["pose199", "pose150"], ["pose199"], ["pose199"]]
+    assert vote_sequence(state, sequence) == ["pose150", "pose150", "pose150", "pose199"]
+
+
+def test_long_time_window_is_not_truncated():
+    # 2 s 窗口在 30 FPS 下有 60 帧，超过环形缓冲的初始长度：40 帧 'one' 之后 25 帧 'ok'，窗口内仍是 35:25
+    state = MultiHandState(history_ms=2000)
+    sequence = [["one"]] * 40 + [["ok"]] * 25
+    assert vote_sequence(state, sequence)[-1] == "one"
+    assert state.history_size >= 60
+
+
+def test_running_counts_match_full_recount():
+    # 累计计数与逐帧重新数窗口的结果一致（时间窗口 + 帧窗口，中途丢帧）
+    rng = np.random.default_rng(0)
+    names = ["a", "b", "c", "d"]
+    state = MultiHandState(history_ms=700, window_frames=17, max_missing=10.0)
+    frames = []
+    now = 0.0
+    for _ in range(400):
+        now += rng.choice([1 / 30, 1 / 10, 0.3])
+        gestures = [n for n in names if rng.random() < 0.4]
+        frames.append((now, gestures))
+        slots = state.update([[100.0, 100.0]], now)
+        state.vote(slots, state.gesture_hits([gestures]), now)
+        window = [g for t, g in frames[-17:] if t > now - 0.7]
+        expected = [sum(name in g for g in window) for name in state.gesture_names]
+        assert state._counts[slots[0], :len(expected)].tolist() == expected
+        assert state._total[slots[0]] == len(window)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from utils.multi_hand_state import MultiHandState
+from utils.synthetic_hands import SyntheticHands
+
+FPS = 12.0
+
+
+@pytest.fixture
+def recognizer(recognizer):
+    recognizer.render = False
+    recognizer.motion = None
+    return recognizer
+
+
+def fast_path(n):
+    # 每帧约 200 像素的来回划动（10–15 FPS 下的正常快速移动）
+    x = np.where(np.arange(n) % 2 == 0, 400.0, 600.0)
+    y = 300.0 + 4.0 * np.arange(n)
+    return np.stack([x, y], axis=1)
+
+
+def run(recognizer, frames, fps=FPS):
+    raw_frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    for i, hands in enumerate(frames):
+        recognizer.recognize(raw_frame.copy(), hands, raw_frame, now=i / fps)
+
+
+def test_single_hand_keeps_id_when_moving_fast():
+    state = MultiHandState()
+    ids = [int(state.ids_of(state.update([point], i / FPS))[0]) for i, point in enumerate(fast_path(21))]
+    assert ids == [ids[0]] * 21
+
+
+def test_fast_single_hand_keeps_stroke(recognizer):
+    frames = SyntheticHands(0).session(fast_path(21), pose="one")
+    run(recognizer, frames)
+    assert len(recognizer.stroke) == 21
+
+
+def test_stroke_survives_detection_dropout(recognizer):
+    gen = SyntheticHands(0)
+    path = gen.trajectory("swipe_right", n=21, size=150)
+    frames = gen.session(path, pose="one")
+    # 中间 8 帧（约 0.67 秒）没有检测到手
+    frames = frames[:10] + [[]] * 8 + frames[10:]
+    run(recognizer, frames)
+    assert len(recognizer.stroke) == 21
+
+
+def test_two_hands_still_get_separate_ids():
+    state = MultiHandState()
+    slots = state.update([[100, 100], [800, 100]], 0.0)
+    ids = state.ids_of(slots)
+    assert ids[0] != ids[1]
+    slots = state.update([[810, 100], [110, 100]], 1 / 30)
+    assert list(state.ids_of(slots)) == [ids[1], ids[0]]
@@ -0,0 +1,39 @@
+import threading
+import time
+from utils.instrumentation import Profiler
+
+
+def test_nested_spans_with_same_name_keep_their_own_start():
+    profiler = Profiler()
+    with profiler.span("stage"):
+        time.sleep(0.02)
+        with profiler.span("stage"):
+            pass
+    samples = sorted(profiler.histogram("stage").samples[:2])
+    # 外层区间包含 20 ms 的等待，不能被内层区间的起点覆盖
+    assert samples[1] >= 20e6
+    assert samples[0] < samples[1]
+
+
+def test_concurrent_spans_and_snapshot():
+    profiler = Profiler()
+    errors = []
+
+    def work(k):
+        try:
+            for i in range(200):
+                with profiler.span(f"stage.{k}.{i % 20}"):
+                    pass
+                profiler.snapshot()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(k,)) for k in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    snapshot = profiler.snapshot()
+    assert len(snapshot) == 80
+    assert all(s["count"] == 10 for s in snapshot.values())
@@ -0,0 +1,43 @@
+import json
+import os
+import numpy as np
+from utils.landmark_recording import LandmarkRecorder, LandmarkRecording
+from utils.synthetic_hands import SyntheticHands
+
+
+def session(n):
+    gen = SyntheticHands(0)
+    return gen.session(gen.trajectory("circle", n=n), pose="one")
+
+
+def test_closed_recording_round_trip(tmp_path):
+    frames = session(10)
+    with LandmarkRecorder(str(tmp_path), max_hands=2, frame_size=(640, 480)) as recorder:
+        for i, hands in enumerate(frames):
+            recorder.write(hands, timestamp=i / 30)
+    recording = LandmarkRecording(str(tmp_path))
+    assert len(recording) == 10
+    assert recording.hands_at(3)[0]["lmList"] == frames[3][0]["lmList"]
+
+
+def test_unclosed_recording_recovers_frame_count(tmp_path):
+    # 模拟进程被杀：meta.json 仍是开始时写入的版本，最后一帧只写了一部分
+    recorder = LandmarkRecorder(str(tmp_path), max_hands=2)
+    frames = session(12)
+    for i, hands in enumerate(frames):
+        recorder.write(hands, timestamp=i / 30, frame_size=(640, 480))
+    for f in recorder._files.values():
+        f.flush()
+    with open(tmp_path / "landmarks.bin", "ab") as f:
+        f.write(b"\0" * 10)
+    with open(tmp_path / "meta.json", encoding="utf-8") as f:
+        meta = json.load(f)
+    assert meta["frames"] == 0 and meta["frame_size"] == [640, 480]
+
+    recording = LandmarkRecording(str(tmp_path))
+    assert len(recording) == 12
+    assert recording.frame_size == (640, 480)
+    assert np.allclose(recording.timestamps, np.arange(12) / 30)
+    assert recording.hands_at(11)[0]["lmList"] == frames[11][0]["lmList"]
+    recorder.close()
+    assert not os.path.exists(tmp_path / "meta.json.tmp")
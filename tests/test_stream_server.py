@@ -0,0 +1,56 @@
+import json
+import time
+import cv2
+import numpy as np
+from utils.stream_server import StreamServer, StreamSource
+
+
+class RecordingDetector:
+    # 记录每帧画面的颜色，用来检查有没有混入其他路的帧
+    def __init__(self, **config):
+        self.seen = set()
+
+    def findHands(self, img, draw=True, flipType=True):
+        self.seen.add(int(img[0, 0, 0]) // 50)
+        return [], img
+
+
+def write_video(path, value, frames=20):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 30, (64, 48))
+    for _ in range(frames):
+        writer.write(np.full((48, 64, 3), value, dtype=np.uint8))
+    writer.release()
+
+
+def test_each_stream_uses_its_own_detector(tmp_path):
+    streams = []
+    for k in range(3):
+        path = tmp_path / f"{k}.mp4"
+        write_video(path, 50 * k + 25)
+        streams.append(StreamSource(f"s{k}", str(path)))
+    server = StreamServer(streams, workers=2, detector_factory=RecordingDetector).start()
+    while server.running():
+        time.sleep(0.01)
+    server.stop()
+    for k, stream in enumerate(streams):
+        assert stream.stats.rendered == 20
+        (detector,) = stream.detectors.values()
+        assert detector.seen == {k}
+
+
+def test_file_timeline_uses_frame_rate(tmp_path):
+    # 文件来源的 time_ms 由帧号和帧率得出，与处理快慢无关，两次运行结果一致
+    path = tmp_path / "a.mp4"
+    write_video(path, 25)
+    runs = []
+    for k in range(2):
+        timeline = tmp_path / f"a{k}.jsonl"
+        stream = StreamSource("a", str(path), timeline=str(timeline))
+        server = StreamServer([stream], workers=1, detector_factory=RecordingDetector).start()
+        while server.running():
+            time.sleep(0.01)
+        server.stop()
+        rows = [json.loads(line) for line in timeline.read_text(encoding="utf-8").splitlines()]
+        runs.append([(row["frame"], row["time_ms"]) for row in rows])
+    assert runs[0] == runs[1]
+    assert runs[0] == [(i, round(i * 1000.0 / 30, 3)) for i in range(20)]
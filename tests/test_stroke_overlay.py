@@ -0,0 +1,34 @@
+import numpy as np
+from utils.frame_buffers import FrameBufferPool
+from utils.stroke_store import StrokeStore
+
+
+def test_overlay_buffer_is_not_reallocated_as_stroke_grows(recognizer):
+    buffers = FrameBufferPool()
+    base = np.random.default_rng(0).integers(0, 255, (360, 640, 3), dtype=np.uint8)
+    points = []
+    for i in range(40):
+        points.append((100 + 10 * i, 100 + (i * 7) % 150))
+        buffers.begin_frame()
+        frame = base.copy()
+        recognizer.draw_transparent_lines(frame, points, buffers=buffers)
+        expected = recognizer.draw_transparent_lines(base.copy(), points)
+        assert np.array_equal(frame, expected)
+    buffers.begin_frame()
+    # 只有第一次取缓冲区时分配
+    assert buffers.total_allocations == buffers.depth
+
+
+def test_incremental_stroke_draw_matches_full_redraw(recognizer):
+    buffers = FrameBufferPool()
+    rng = np.random.default_rng(1)
+    base = rng.integers(0, 255, (360, 640, 3), dtype=np.uint8)
+    # 容量小，途中会抽稀；中途清空一次，检验掩码重画
+    stroke = StrokeStore(capacity=16, min_step=2)
+    for i in range(120):
+        if i == 70:
+            stroke.clear()
+        stroke.append(rng.integers(-20, 660, 2) if i % 9 == 0 else (300 + 3 * (i % 40), 150 + 2 * (i % 25)))
+        frame = stroke.draw(base.copy(), (0, 0, 255), 5, alpha=0.7, buffers=buffers)
+        expected = recognizer.draw_transparent_lines(base.copy(), stroke.points)
+        assert np.array_equal(frame, expected), i
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from utils.synthetic_hands import SyntheticHands
+from utils.trajectory_recognizer import TrajectoryRecognizer
+
+FPS = 30
+KINDS = ("circle", "swipe_left", "swipe_right", "swipe_up", "swipe_down", "zigzag")
+
+
+def run(recognizer, path, fps=FPS):
+    events = []
+    for i, point in enumerate(path):
+        event = recognizer.update(point, i / fps)
+        if event is not None:
+            events.append(event)
+    event = recognizer.flush()
+    if event is not None:
+        events.append(event)
+    return events
+
+
+def gesture_path(kind, seconds=0.8, seed=0):
+    # 停住 0.3 s -> 用 seconds 秒画出手势 -> 停住 0.5 s，全程带 1 像素抖动
+    gen = SyntheticHands(seed)
+    stroke = gen.trajectory(kind, n=int(seconds * FPS), center=(640, 360), size=200, jitter=1.0)
+    before = stroke[:1] + gen.rng.normal(0, 1.0, (int(0.3 * FPS), 2))
+    after = stroke[-1:] + gen.rng.normal(0, 1.0, (int(0.5 * FPS), 2))
+    return np.vstack([before, stroke, after])
+
+
+@pytest.mark.parametrize("kind", KINDS)
+@pytest.mark.parametrize("seconds", [0.6, 1.0])
+def test_one_event_per_gesture(kind, seconds):
+    events = run(TrajectoryRecognizer(), gesture_path(kind, seconds))
+    assert [event["gesture"] for event in events] == [kind]
+    # 事件时间覆盖画出手势的那一段（尾段时长取自 durations，可能带上一点之前停住的时间）
+    event = events[0]
+    assert 0.0 <= event["start"] <= 0.3 + 0.15
+    assert 0.3 + seconds - 0.1 <= event["end"] <= 0.3 + seconds + 0.2
+
+
+def test_still_fingertip_produces_no_events():
+    gen = SyntheticHands(0)
+    path = (640, 360) + gen.rng.normal(0, 2.0, (3 * FPS, 2))
+    recognizer = TrajectoryRecognizer()
+    assert run(recognizer, path) == []
+    assert recognizer.dtw_runs == 0
+
+
+def test_two_gestures_in_a_row():
+    first = gesture_path("swipe_right", seed=1)
+    second = gesture_path("circle", seed=2)
+    # 第二个手势从第一个停住的位置接着画，中间没有跳变
+    path = np.vstack([first, second - second[0] + first[-1]])
+    events = run(TrajectoryRecognizer(), path)
+    assert [event["gesture"] for event in events] == ["swipe_right", "circle"]
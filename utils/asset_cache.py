@@ -0,0 +1,44 @@
+import os
+import cv2
+import numpy as np
+
+CACHE_DIRECTORY = os.path.join(".cache", "assets")
+
+_memory_cache = {}
+
+
+def load_resized_image(path, size, cache_directory=CACHE_DIRECTORY):
+    # 读取并缩放图片，结果以 .npy 缓存在磁盘（按文件修改时间和大小失效），同一进程内再缓存一份
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (os.path.abspath(path), tuple(size), stat.st_mtime_ns, stat.st_size)
+    if key in _memory_cache:
+        return _memory_cache[key]
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    cache_file = os.path.join(cache_directory, f"{stem}_{size[0]}x{size[1]}_{stat.st_mtime_ns}_{stat.st_size}.npy")
+    img = None
+    if os.path.exists(cache_file):
+        try:
+            img = np.load(cache_file)
+        except (OSError, ValueError):
+            img = None
+
+    if img is None:
+        raw = cv2.imread(path)
+        if raw is None:
+            return None
+        img = cv2.resize(raw, tuple(size))
+        try:
+            os.makedirs(cache_directory, exist_ok=True)
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "wb") as f:
+                np.save(f, img)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            print(f"⚠️ 无法写入缓存 {cache_file}: {e}")
+
+    _memory_cache[key] = img
+    return img
@@ -0,0 +1,203 @@
+import csv
+import json
+import os
+import time
+import cv2
+from utils.detector_pool import create_hand_detector
+from utils.option_hand_circle_capture import HandGestureRecognizer
+from utils.option_hands_capture import HandsCapture
+from utils.roi_tracker import find_hands_raw, draw_hands
+from utils.trajectory_recognizer import TrajectoryRecognizer
+
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".m4v", ".webm"}
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".webp"}
+TIMELINE_FIELDS = ["frame", "time_ms", "hands", "gesture", "capture_rect", "motion"]
+# 图片序列没有时间戳，按该帧率换算停留时间
+IMAGE_SEQUENCE_FPS = 30.0
+
+
+class HeadlessSession:
+    # 不依赖窗口的单路识别状态：option1 为手势识别，option2 为双手框选截图
+    def __init__(self, mode="option1", render=True, motion=False):
+        if mode not in ("option1", "option2"):
+            raise ValueError(f"未知模式 {mode}")
+        self.mode = mode
+        self.render = render
+        if mode == "option1":
+            self.recognizer = HandGestureRecognizer()
+        else:
+            self.recognizer = HandsCapture()
+        self.recognizer.render = render
+        if motion and mode == "option1":
+            self.recognizer.motion = TrajectoryRecognizer()
+
+    @property
+    def max_hands(self):
+        return 1 if self.mode == "option1" else 2
+
+    def step(self, frame_index, time_ms, hands, raw_frame, frame=None):
+        # frame 为绘制用的画面；不渲染时可直接传 None。停留计时按 time_ms 计算，与处理速度无关
+        if frame is None:
+            frame = raw_frame
+        now = time_ms / 1000.0
+        gesture = None
+        motion = None
+        if self.mode == "option1":
+            frame, gesture = self.recognizer.recognize(frame, hands, raw_frame, now=now)
+            if self.render:
+                self.recognizer.ui.draw(frame, f"gesture_text.{gesture}", None, lambda canvas: cv2.putText(
+                    canvas, f'Gesture: {gesture}', (30, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3))
+            # 本帧完成的动态手势（一般至多一个）
+            motion = "+".join(event["gesture"] for event in self.recognizer.motion_events) or None
+        else:
+            frame = self.recognizer.process_frame(frame, hands, raw_frame, now=now)
+        rect = self.recognizer.captured_rect
+        row = {
+            "frame": frame_index,
+            "time_ms": round(time_ms, 3),
+            "hands": len(hands),
+            "gesture": gesture,
+            "capture_rect": [int(v) for v in rect] if rect is not None else None,
+            "motion": motion,
+        }
+        return frame, row
+
+
+class TimelineWriter:
+    # 逐帧写出识别结果，支持 jsonl 和 csv
+    def __init__(self, path, fmt="jsonl"):
+        self.fmt = fmt
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(TIMELINE_FIELDS)
+
+    def write(self, row):
+        if self._csv is not None:
+            rect = row["capture_rect"]
+            self._csv.writerow([row["frame"], row["time_ms"], row["hands"], row["gesture"] or "",
+                                " ".join(map(str, rect)) if rect else "", row["motion"] or ""])
+        else:
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+def video_fps(path, default=30.0):
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    return fps if fps and fps > 0 else default
+
+
+def iter_frames(job):
+    # 依次产出 (帧号, 时间戳ms, 图像)
+    if job["kind"] == "images":
+        for i, path in enumerate(job["files"]):
+            img = cv2.imread(path)
+            if img is None:
+                print(f"⚠️ 无法读取 {path}")
+                continue
+            yield i, i * 1000.0 / IMAGE_SEQUENCE_FPS, img
+        return
+
+    fps = video_fps(job["path"])
+    cap = cv2.VideoCapture(job["path"])
+    index = 0
+    frame = None
+    try:
+        while True:
+            ret, frame = cap.read(frame)
+            if not ret:
+                break
+            yield index, index * 1000.0 / fps, frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def collect_jobs(inputs, output_dir, fmt="jsonl", mode="option1", render=True, flip=None, motion=False):
+    # 视频文件各自为一路；目录中的图片按文件名排序合为一路，目录中的视频各自为一路
+    jobs = []
+    used_names = set()
+
+    def add(kind, path, files=None):
+        stem = os.path.splitext(os.path.basename(os.path.normpath(path)))[0] or "stream"
+        name, n = stem, 1
+        while name in used_names:
+            n += 1
+            name = f"{stem}_{n}"
+        used_names.add(name)
+        jobs.append({
+            "kind": kind, "path": path, "files": files or [], "name": name,
+            "output": os.path.join(output_dir, f"{name}.{fmt}"), "output_dir": output_dir,
+            "format": fmt, "mode": mode, "render": render, "flip": flip, "motion": motion,
+        })
+
+    for path in inputs:
+        if os.path.isdir(path):
+            entries = sorted(os.listdir(path))
+            images = [os.path.join(path, e) for e in entries if os.path.splitext(e)[1].lower() in IMAGE_EXTENSIONS]
+            if images:
+                add("images", path, images)
+            for e in entries:
+                if os.path.splitext(e)[1].lower() in VIDEO_EXTENSIONS:
+                    add("video", os.path.join(path, e))
+        elif os.path.isfile(path):
+            ext = os.path.splitext(path)[1].lower()
+            if ext in IMAGE_EXTENSIONS:
+                add("images", path, [path])
+            else:
+                add("video", path)
+        else:
+            print(f"⚠️ 找不到 {path}")
+    return jobs
+
+
+def process_stream(job):
+    # 进程池中的工作函数：一路视频/图片序列对应一个检测器和一份识别状态
+    cv2.setNumThreads(1)
+    started = time.perf_counter()
+    session = HeadlessSession(job["mode"], job["render"], job["motion"])
+    detector = create_hand_detector(staticMode=job["kind"] == "images", maxHands=session.max_hands,
+                                    detectionCon=0.8)
+    os.makedirs(job["output_dir"], exist_ok=True)
+    writer = TimelineWriter(job["output"], job["format"])
+    video_writer = None
+    annotated_dir = None
+    frames = 0
+    try:
+        for index, time_ms, frame in iter_frames(job):
+            if job["flip"] is not None:
+                frame = cv2.flip(frame, job["flip"])
+            hands = find_hands_raw(detector, frame)
+            ui_frame = None
+            if job["render"]:
+                ui_frame = draw_hands(frame.copy(), hands)
+            ui_frame, row = session.step(index, time_ms, hands, frame, ui_frame)
+            writer.write(row)
+            frames += 1
+
+            if job["render"]:
+                if job["kind"] == "video":
+                    if video_writer is None:
+                        h, w = ui_frame.shape[:2]
+                        video_writer = cv2.VideoWriter(
+                            os.path.join(job["output_dir"], f"{job['name']}_annotated.mp4"),
+                            cv2.VideoWriter_fourcc(*"mp4v"), video_fps(job["path"]), (w, h))
+                    video_writer.write(ui_frame)
+                else:
+                    if annotated_dir is None:
+                        annotated_dir = os.path.join(job["output_dir"], f"{job['name']}_annotated")
+                        os.makedirs(annotated_dir, exist_ok=True)
+                    cv2.imwrite(os.path.join(annotated_dir, os.path.basename(job["files"][index])), ui_frame)
+    finally:
+        writer.close()
+        if video_writer is not None:
+            video_writer.release()
+
+    elapsed = time.perf_counter() - started
+    return {"source": job["path"], "output": job["output"], "frames": frames,
+            "seconds": elapsed, "fps": frames / elapsed if elapsed else 0.0}
@@ -0,0 +1,138 @@
+import itertools
+import json
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+import cv2
+from utils.frame_history import write_clip
+
+# 格式 -> (扩展名, OpenCV 编码参数, 默认值)
+ENCODINGS = {
+    "png": (".png", cv2.IMWRITE_PNG_COMPRESSION, 3),
+    "jpeg": (".jpg", cv2.IMWRITE_JPEG_QUALITY, 95),
+    "webp": (".webp", cv2.IMWRITE_WEBP_QUALITY, 90),
+}
+
+
+class CaptureWriter:
+    # 后台保存截图：界面线程只负责入队，编码和写盘都在工作线程中完成
+    # 队列满时直接丢弃本次保存并提示，界面线程永远不会等待磁盘
+    def __init__(self, fmt="png", quality=None, queue_size=16, workers=1, sidecar=True):
+        if fmt not in ENCODINGS:
+            raise ValueError(f"不支持的截图格式 {fmt}，可选 {', '.join(ENCODINGS)}")
+        self.fmt = fmt
+        self.extension, param, default = ENCODINGS[fmt]
+        # PNG 为压缩级别 0-9，JPEG/WebP 为质量 0-100
+        self.quality = default if quality is None else int(quality)
+        self.params = [param, self.quality]
+        self.sidecar = sidecar
+        self.workers = workers
+        self.saved = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._sequence = itertools.count()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"capture-writer-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, image, directory, prefix="hand", metadata=None, clip=None):
+        # 返回 Future，结果为实际写入的文件名（重名时会加 _1、_2 等后缀）；队列已满时返回 None
+        # clip：截图对应的预录片段（FrameHistoryRing.clip 的结果），写成与截图同名的 .mp4
+        if image is None or image.size == 0:
+            return None
+        self._start()
+        now = datetime.now()
+        # 毫秒 + 进程内序号，同一秒内多次保存也不会覆盖
+        name = f"{prefix}_{now:%Y%m%d_%H%M%S}_{now.microsecond // 1000:03d}_{next(self._sequence):04d}"
+        info = dict(metadata or {})
+        info.setdefault("timestamp", now.isoformat(timespec="milliseconds"))
+        future = Future()
+        try:
+            self._queue.put_nowait((future, (image, directory, name, info, clip)))
+        except queue.Full:
+            self.dropped += 1
+            print(f"⚠️ 保存队列已满，丢弃截图 {name}")
+            return None
+        return future
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                future, args = job
+                try:
+                    future.set_result(self._write(*args))
+                except Exception as e:
+                    self.failed += 1
+                    print(f"⚠️ 保存截图失败: {e}")
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, image, directory, name, info, clip=None):
+        ok, encoded = cv2.imencode(self.extension, image, self.params)
+        if not ok:
+            raise RuntimeError(f"{self.fmt} 编码失败")
+        os.makedirs(directory, exist_ok=True)
+        # 以独占方式创建文件，多个进程写同一目录时也不会互相覆盖
+        path = os.path.join(directory, name + self.extension)
+        suffix = 0
+        while True:
+            try:
+                with open(path, "xb") as f:
+                    f.write(encoded.tobytes())
+                break
+            except FileExistsError:
+                suffix += 1
+                path = os.path.join(directory, f"{name}_{suffix}{self.extension}")
+
+        # 片段按截图实际写入的文件名命名，重名加后缀后两者仍然对应
+        stem = os.path.splitext(path)[0]
+        if clip is not None and len(clip[0]):
+            frames, times = clip
+            write_clip(stem + ".mp4", frames, times)
+            info["clip"] = os.path.basename(stem + ".mp4")
+            print(f"片段已保存为 {stem}.mp4（{len(frames)} 帧）")
+
+        if self.sidecar:
+            h, w = image.shape[:2]
+            info.update({"file": os.path.basename(path), "format": self.fmt, "quality": self.quality,
+                         "width": w, "height": h})
+            with open(stem + ".json", "w", encoding="utf-8") as f:
+                json.dump(info, f, ensure_ascii=False, indent=2)
+        self.saved += 1
+        print(f"图片已保存为 {path}")
+        return path
+
+    def pending(self):
+        return self._queue.unfinished_tasks
+
+    def flush(self):
+        # 等待已入队的截图全部写完
+        if self._threads:
+            self._queue.join()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+
+
+default_writer = CaptureWriter()
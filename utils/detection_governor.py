@@ -0,0 +1,89 @@
+import math
+import time
+import numpy as np
+from utils.roi_tracker import draw_hands, find_hands_raw, make_hand
+
+
+class LandmarkPredictor:
+    # 常速度模型：每次检测后用相邻两次检测的位移估计所有关键点的速度（指数平滑），跳过的帧按速度外推
+    #   smoothing：速度平滑系数，越大越跟手、越小越稳
+    #   max_horizon：最多外推多少秒，避免长时间不检测时关键点飞出去
+    def __init__(self, smoothing=0.6, max_horizon=0.25):
+        self.smoothing = smoothing
+        self.max_horizon = max_horizon
+        self.reset()
+
+    def reset(self):
+        self.landmarks = None  # (H, 21, 3) float
+        self.velocity = None
+        self.types = None
+        self.timestamp = None
+
+    def correct(self, hands, now):
+        if not hands:
+            self.reset()
+            return
+        landmarks = np.asarray([hand["lmList"] for hand in hands], dtype=np.float64)
+        types = [hand.get("type") for hand in hands]
+        if self.landmarks is None or self.landmarks.shape != landmarks.shape or self.types != types:
+            self.velocity = np.zeros_like(landmarks)
+        else:
+            dt = now - self.timestamp
+            if dt > 0:
+                measured = (landmarks - self.landmarks) / dt
+                self.velocity += self.smoothing * (measured - self.velocity)
+        self.landmarks = landmarks
+        self.types = types
+        self.timestamp = now
+
+    def predict(self, now):
+        if self.landmarks is None:
+            return []
+        dt = min(max(now - self.timestamp, 0.0), self.max_horizon)
+        predicted = np.rint(self.landmarks + self.velocity * dt).astype(np.int64)
+        return [make_hand(lm.tolist(), hand_type) for lm, hand_type in zip(predicted, self.types)]
+
+
+class DetectionGovernor:
+    # 包装 HandDetector：只在部分帧上真正检测，其余帧用 LandmarkPredictor 外推关键点
+    #   every：每隔多少帧检测一次
+    #   budget_ms：每帧平均检测耗时预算；设置后按实测检测耗时自动调整间隔（不超过 max_every）
+    def __init__(self, detector, every=2, budget_ms=None, max_every=6, predictor=None):
+        self.detector = detector
+        self.every = max(1, every)
+        self.budget_ms = budget_ms
+        self.max_every = max_every
+        self.predictor = predictor or LandmarkPredictor()
+        self.detect_ms = None
+        self.detections = 0
+        self.predictions = 0
+        self._since_detect = None
+
+    def interval(self):
+        if self.budget_ms is None or self.detect_ms is None:
+            return self.every
+        return min(max(1, math.ceil(self.detect_ms / self.budget_ms)), self.max_every)
+
+    def reset(self):
+        self.predictor.reset()
+        self._since_detect = None
+
+    def findHands(self, img, draw=True, flipType=True, now=None):
+        if now is None:
+            now = time.perf_counter()
+        if self._since_detect is None or self._since_detect + 1 >= self.interval():
+            started = time.perf_counter()
+            hands = find_hands_raw(self.detector, img, flipType)
+            cost = (time.perf_counter() - started) * 1000
+            self.detect_ms = cost if self.detect_ms is None else self.detect_ms * 0.9 + cost * 0.1
+            self.predictor.correct(hands, now)
+            self.detections += 1
+            self._since_detect = 0
+        else:
+            hands = self.predictor.predict(now)
+            self.predictions += 1
+            self._since_detect += 1
+
+        if draw:
+            draw_hands(img, hands)
+        return hands, img
@@ -0,0 +1,76 @@
+import threading
+
+
+def create_hand_detector(**config):
+    # 延迟导入：cvzone/MediaPipe 加载较慢，放到真正需要检测器时（可在后台线程）再导入
+    from cvzone.HandTrackingModule import HandDetector
+    return HandDetector(**config)
+
+
+class DetectorPool:
+    # 按配置缓存 HandDetector，切换模式时复用已加载的 MediaPipe 图，避免卡顿
+    def __init__(self, factory=create_hand_detector):
+        self.factory = factory
+        self._detectors = {}
+        self._building = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(config):
+        return tuple(sorted(config.items()))
+
+    def get(self, **config):
+        key = self._key(config)
+        with self._lock:
+            if key in self._detectors:
+                return self._detectors[key]
+            event = self._building.get(key)
+            owner = event is None
+            if owner:
+                event = self._building[key] = threading.Event()
+
+        if owner:
+            self._build(key, config, event)
+        else:
+            event.wait()
+        with self._lock:
+            if key in self._errors:
+                raise self._errors.pop(key)
+            return self._detectors[key]
+
+    def _build(self, key, config, event):
+        try:
+            detector = self.factory(**config)
+            with self._lock:
+                self._detectors[key] = detector
+        except Exception as e:
+            with self._lock:
+                self._errors[key] = e
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+            event.set()
+
+    def warm(self, configs, background=True):
+        # 预先构建检测器；background=True 时在后台线程中进行，返回该线程
+        def run():
+            for config in configs:
+                try:
+                    self.get(**config)
+                except Exception as e:
+                    print(f"⚠️ 预加载检测器失败 {config}: {e}")
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="detector-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def __contains__(self, config):
+        with self._lock:
+            return self._key(config) in self._detectors
+
+
+default_pool = DetectorPool()
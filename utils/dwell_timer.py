@@ -0,0 +1,60 @@
+from collections import deque
+import numpy as np
+
+
+class DwellTimer:
+    # 按时间计算的停留：所有跟踪点的速度都低于 max_speed（像素/秒）并持续 seconds 秒即完成，与帧率无关
+    #   window：速度按当前位置与至少 window 秒前的位置计算；高帧率下逐帧位移太小，关键点抖动会被误判为移动
+    #   min_distance：位移低于该值一律视为静止
+    #   max_gap：两次更新间隔超过该值（秒，例如手短暂丢失）时重新计时
+    def __init__(self, seconds, max_speed=300.0, window=1 / 30, min_distance=3.0, max_gap=0.5):
+        self.seconds = seconds
+        self.max_speed = max_speed
+        self.window = window
+        self.min_distance = min_distance
+        self.max_gap = max_gap
+        self.reset()
+
+    def reset(self):
+        self._history = deque()
+        self.started = None
+        self.elapsed = 0.0
+
+    def restart(self, now):
+        # 保留位置历史（继续做移动判断），只重新开始计时
+        self.started = now
+        self.elapsed = 0.0
+
+    @property
+    def progress(self):
+        return min(self.elapsed / self.seconds, 1.0) if self.seconds > 0 else 1.0
+
+    @property
+    def done(self):
+        return self.elapsed >= self.seconds
+
+    def update(self, points, now):
+        # points 为 (x, y) 或 (N, 2)，返回本次是否判定为移动
+        pos = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        history = self._history
+        if history and (now - history[-1][0] > self.max_gap or history[-1][1].shape != pos.shape):
+            # 手丢失太久或跟踪点数量变化，重新计时
+            history.clear()
+            self.started = now
+
+        # 只保留最新的一个“至少 window 秒前”的位置作为参考
+        # 留 1 µs 余量：帧时间按 i / fps 计算时，恰好 window 秒前的那一帧会因浮点舍入显得稍晚，被当成没有参考帧
+        cutoff = now - self.window + 1e-6
+        while len(history) > 1 and history[1][0] <= cutoff:
+            history.popleft()
+        moving = False
+        if history and history[0][0] <= cutoff:
+            t_ref, ref = history[0]
+            dist = np.sqrt(((pos - ref) ** 2).sum(axis=1)).max()
+            moving = dist >= max(self.max_speed * (now - t_ref), self.min_distance)
+
+        if moving or self.started is None:
+            self.started = now
+        history.append((now, pos))
+        self.elapsed = now - self.started
+        return moving
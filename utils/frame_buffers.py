@@ -0,0 +1,66 @@
+import threading
+import cv2
+import numpy as np
+
+
+class FrameBufferPool:
+    # 按名称预分配、循环复用的帧缓冲区
+    #   depth：每个名称的缓冲区个数；流水线模式下同时在途的帧较多，需要 >1
+    # 同时统计每帧的新分配次数和复制字节数
+    def __init__(self, depth=1):
+        self.depth = depth
+        self._buffers = {}
+        self._next = {}
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.frame_allocations = 0
+        self.frame_bytes_copied = 0
+        self.total_allocations = 0
+        self.total_bytes_copied = 0
+
+    def acquire(self, name, shape, dtype=np.uint8):
+        shape = tuple(shape)
+        with self._lock:
+            slots = self._buffers.get(name)
+            if slots is None or slots[0].shape != shape or slots[0].dtype != dtype:
+                slots = self._buffers[name] = [np.empty(shape, dtype=dtype) for _ in range(self.depth)]
+                self._next[name] = 0
+                self.frame_allocations += self.depth
+            index = self._next[name]
+            self._next[name] = (index + 1) % self.depth
+            return slots[index]
+
+    def count_copy(self, nbytes):
+        with self._lock:
+            self.frame_bytes_copied += nbytes
+
+    def copy(self, name, src):
+        dst = self.acquire(name, src.shape, src.dtype)
+        np.copyto(dst, src)
+        self.count_copy(src.nbytes)
+        return dst
+
+    def flip(self, name, src, flip_code):
+        dst = self.acquire(name, src.shape, src.dtype)
+        cv2.flip(src, flip_code, dst=dst)
+        self.count_copy(src.nbytes)
+        return dst
+
+    def begin_frame(self):
+        with self._lock:
+            self.frames += 1
+            self.total_allocations += self.frame_allocations
+            self.total_bytes_copied += self.frame_bytes_copied
+            self.frame_allocations = 0
+            self.frame_bytes_copied = 0
+
+    def stats(self):
+        with self._lock:
+            frames = max(self.frames, 1)
+            return {
+                "frames": self.frames,
+                "allocations_per_frame": self.total_allocations / frames,
+                "bytes_copied_per_frame": self.total_bytes_copied / frames,
+                "current_frame_allocations": self.frame_allocations,
+                "current_frame_bytes_copied": self.frame_bytes_copied,
+            }
@@ -0,0 +1,243 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import cv2
+import numpy as np
+
+# BGR -> 灰度权重（与 cv2.COLOR_BGR2GRAY 相同）
+GRAY_WEIGHTS = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+
+def sharpness(frames, max_pixels=1 << 18):
+    # frames: (K, H, W, 3) -> (K,) 拉普拉斯方差，越大越清晰；所有帧一次数组运算
+    # 区域很大时隔行隔列取样，使每帧参与计算的像素不超过 max_pixels
+    k, h, w = frames.shape[:3]
+    if k == 0 or h < 3 or w < 3:
+        return np.zeros(k)
+    step = max(1, int(np.ceil(np.sqrt(h * w / max_pixels))))
+    gray = frames[:, ::step, ::step] @ GRAY_WEIGHTS
+    lap = 4 * gray[:, 1:-1, 1:-1] - gray[:, :-2, 1:-1] - gray[:, 2:, 1:-1] - gray[:, 1:-1, :-2] - gray[:, 1:-1, 2:]
+    return lap.reshape(k, -1).var(axis=1)
+
+
+class FrameHistoryRing:
+    # 最近若干帧原始画面的环形缓冲，内存上限由 max_bytes 显式给出
+    #   第一帧到来时按画面尺寸一次性分配 capacity = min(max_frames, max_bytes // 单帧字节数) 个槽位，之后不再分配
+    #   （分辨率变化时按新尺寸重新分配一次）
+    #   主循环用 next_slot() 取下一个槽位、把翻转后的画面直接写进去，再 commit(时间)，不额外复制；
+    #   已有画面时用 push() 复制进来
+    #   线程安全：写入线程（流水线模式下为检测线程）与读取线程可以并发；取出但未 commit 的槽位时间为 -inf，
+    #   读取时在锁内只挑已 commit 的槽位并复制出来，之后的打分和裁剪都在副本上进行，不会读到写了一半的画面
+    #   best_frame_async 在后台线程中打分，调用线程只做一次区域复制
+    def __init__(self, max_bytes=64 * 2 ** 20, max_frames=32):
+        self.max_bytes = max_bytes
+        self.max_frames = max_frames
+        self.capacity = 0
+        self._frames = None
+        self._times = None
+        self._head = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def nbytes(self):
+        return 0 if self._frames is None else self._frames.nbytes
+
+    def capacity_for(self, shape, dtype=np.uint8):
+        frame_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        return min(self.max_frames, self.max_bytes // frame_bytes)
+
+    def allocate(self, shape, dtype=np.uint8):
+        shape = tuple(shape)
+        capacity = self.capacity_for(shape, dtype)
+        if capacity < 1:
+            raise ValueError(f"max_bytes={self.max_bytes} 放不下一帧 {shape} 画面")
+        with self._lock:
+            self.capacity = capacity
+            self._frames = np.empty((capacity,) + shape, dtype=dtype)
+            self._times = np.full(capacity, -np.inf)
+            self._head = 0
+
+    def next_slot(self, shape, dtype=np.uint8):
+        if self._frames is None or self._frames.shape[1:] != tuple(shape) or self._frames.dtype != dtype:
+            self.allocate(shape, dtype)
+        with self._lock:
+            self._times[self._head] = -np.inf
+            return self._frames[self._head]
+
+    def commit(self, timestamp):
+        with self._lock:
+            self._times[self._head] = timestamp
+            self._head = (self._head + 1) % self.capacity
+
+    def push(self, frame, timestamp):
+        slot = self.next_slot(frame.shape, frame.dtype)
+        np.copyto(slot, frame)
+        self.commit(timestamp)
+        return slot
+
+    def __len__(self):
+        with self._lock:
+            return 0 if self._times is None else int(np.isfinite(self._times).sum())
+
+    def _indices(self, since=-np.inf, until=np.inf):
+        # 时间在 [since, until] 内的槽位，按时间从旧到新（调用方持有锁）
+        if self._times is None:
+            return np.zeros(0, dtype=np.intp)
+        times = self._times
+        hit = np.flatnonzero(np.isfinite(times) & (times >= since) & (times <= until))
+        return hit[np.argsort(times[hit], kind="stable")]
+
+    def indices(self, since=-np.inf, until=np.inf):
+        with self._lock:
+            return self._indices(since, until)
+
+    def candidates(self, rect=None, since=-np.inf, until=np.inf):
+        # 在锁内复制 [since, until] 内各帧的 rect 区域 -> (区域副本 (K, h, w, 3), 时间 (K,))
+        with self._lock:
+            slots = self._indices(since, until)
+            if len(slots) == 0:
+                return None, np.zeros(0)
+            if rect is None:
+                crops = self._frames[slots]
+            else:
+                x_min, y_min, x_max, y_max = rect
+                crops = self._frames[slots, y_min:y_max, x_min:x_max]
+            return crops, self._times[slots].copy()
+
+    def best_frame(self, rect=None, since=-np.inf, until=np.inf):
+        # rect=(x_min, y_min, x_max, y_max) 内最清晰的一帧 -> (区域副本, 时间, 清晰度)，没有候选时返回 (None, None, None)
+        return pick_sharpest(*self.candidates(rect, since, until))
+
+    def best_frame_async(self, rect=None, since=-np.inf, until=np.inf):
+        # 同 best_frame，打分放到后台线程；返回 concurrent.futures.Future
+        crops, times = self.candidates(rect, since, until)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="frame-history")
+        return self._executor.submit(pick_sharpest, crops, times)
+
+    def clip(self, seconds, until=np.inf):
+        # 截至 until 的最近 seconds 秒画面 -> (帧副本 (K, H, W, 3), 时间 (K,))；副本不受之后写入影响
+        with self._lock:
+            if self._frames is None:
+                return np.zeros((0, 0, 0, 3), dtype=np.uint8), np.zeros(0)
+            slots = self._indices(until=until)
+            if len(slots):
+                slots = self._indices(self._times[slots[-1]] - seconds, until)
+            return self._frames[slots], self._times[slots].copy()
+
+    def export_clip(self, path, seconds, until=np.inf, fps=None):
+        frames, times = self.clip(seconds, until)
+        return write_clip(path, frames, times, fps)
+
+
+def pick_sharpest(crops, times):
+    # 候选区域中最清晰的一帧 -> (区域副本, 时间, 清晰度)；清晰度相同时取最新的一帧
+    if crops is None or len(crops) == 0:
+        return None, None, None
+    scores = sharpness(crops)
+    best = len(scores) - 1 - int(scores[::-1].argmax())
+    return crops[best].copy(), float(times[best]), float(scores[best])
+
+
+def clip_fps(times, default=30.0):
+    # 由帧时间估计帧率（中位帧间隔），帧数不足时取 default
+    if len(times) < 2:
+        return default
+    interval = float(np.median(np.diff(times)))
+    return 1.0 / interval if interval > 0 else default
+
+
+def write_clip(path, frames, times, fps=None):
+    # 写出 mp4 片段，返回写入的帧数
+    if len(frames) == 0:
+        return 0
+    h, w = frames.shape[1:3]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps or clip_fps(times), (w, h))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+    return len(frames)
+
+
+def crop_rect(frame, rect):
+    x_min, y_min, x_max, y_max = rect
+    return frame[y_min:y_max, x_min:x_max].copy()
+
+
+class BestFrameCapture:
+    # 停留截图的后台选帧与保存（HandGestureRecognizer 和 HandsCapture 共用）
+    #   history：FrameHistoryRing，为 None 时截图取当前帧
+    #   停留完成时 start() 在后台从最近 best_frame_seconds 秒中挑截图区域最清晰的一帧，
+    #   clip_seconds > 0 时同时截下之前 clip_seconds 秒的预录片段，保存时写成同名 .mp4
+    def __init__(self, history=None, best_frame_seconds=0.5, clip_seconds=0.0):
+        self.history = history
+        self.best_frame_seconds = best_frame_seconds
+        self.clip_seconds = clip_seconds
+        self.latest_clip = None
+        # (Future, 停留完成时间)
+        self._pending = None
+
+    def start(self, rect, now):
+        self.cancel()
+        if self.history is None:
+            return
+        self._pending = (self.history.best_frame_async(rect, now - self.best_frame_seconds, now), now)
+        if self.clip_seconds > 0:
+            self.latest_clip = self.history.clip(self.clip_seconds, until=now)
+
+    def cancel(self):
+        self._pending = None
+        self.latest_clip = None
+
+    def poll(self):
+        # 后台挑选已完成时返回 (区域副本, 距停留完成的毫秒数)，否则返回 None；不等待
+        if self._pending is None or not self._pending[0].done():
+            return None
+        future, now = self._pending
+        self._pending = None
+        crop, timestamp, _ = future.result()
+        if crop is None:
+            return None
+        return crop, round((now - timestamp) * 1000, 1)
+
+    def save(self, writer, crop, directory, metadata):
+        # 提交截图（及预录片段）到 writer，不阻塞调用线程（鼠标回调在界面线程里）：
+        # 后台挑选还没完成时，在它的完成回调里提交选出的那一帧
+        # 返回 Future，结果为实际写入的文件名；保存队列已满时为 None
+        pending, clip = self._pending, self.latest_clip
+        self.cancel()
+        done = Future()
+        info = dict(metadata)
+
+        def written(f):
+            if f.exception() is not None:
+                done.set_exception(f.exception())
+            else:
+                done.set_result(f.result())
+
+        def submit(image):
+            saved = writer.submit(image, directory, metadata=info, clip=clip)
+            if saved is None:
+                done.set_result(None)
+            else:
+                saved.add_done_callback(written)
+
+        if pending is None:
+            submit(crop)
+            return done
+
+        future, now = pending
+
+        def on_selected(f):
+            try:
+                best, timestamp, _ = f.result()
+                image = crop
+                if best is not None:
+                    image = best
+                    info["frame_age_ms"] = round((now - timestamp) * 1000, 1)
+                submit(image)
+            except Exception as e:
+                done.set_exception(e)
+
+        future.add_done_callback(on_selected)
+        return done
@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import deque
+from utils.instrumentation import NULL_PROFILER
+
+
+class LatestFrameQueue:
+    # 有界队列：drop_oldest=True 时满了丢弃最旧的帧，否则阻塞等待
+    def __init__(self, maxsize=1, drop_oldest=True):
+        self.maxsize = maxsize
+        self.drop_oldest = drop_oldest
+        self.dropped = 0
+        self.closed = False
+        self._items = deque()
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        with self._cond:
+            if self.drop_oldest:
+                while len(self._items) >= self.maxsize:
+                    self._items.popleft()
+                    self.dropped += 1
+            else:
+                while len(self._items) >= self.maxsize and not self.closed:
+                    self._cond.wait()
+            if self.closed:
+                return False
+            self._items.append(item)
+            self._cond.notify_all()
+            return True
+
+    def get(self):
+        with self._cond:
+            while not self._items and not self.closed:
+                self._cond.wait()
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class FramePacket:
+    __slots__ = ("index", "captured_at", "frame", "raw_frame", "frame_for_ui", "hands")
+
+    def __init__(self, index, captured_at, frame):
+        self.index = index
+        self.captured_at = captured_at
+        self.frame = frame
+        self.raw_frame = None
+        self.frame_for_ui = None
+        self.hands = None
+
+
+class PipelineStats:
+    def __init__(self, window=300):
+        self.latencies = deque(maxlen=window)
+        self.captured = 0
+        self.detected = 0
+        self.rendered = 0
+        self.capture_dropped = 0
+        self.detect_dropped = 0
+        self.started_at = time.perf_counter()
+
+    def record_render(self, packet):
+        self.rendered += 1
+        self.latencies.append(time.perf_counter() - packet.captured_at)
+
+    def summary(self):
+        elapsed = max(time.perf_counter() - self.started_at, 1e-6)
+        latencies = sorted(self.latencies)
+        if latencies:
+            mean_ms = sum(latencies) / len(latencies) * 1000
+            p95_ms = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+        else:
+            mean_ms = p95_ms = 0.0
+        return {
+            "captured": self.captured,
+            "detected": self.detected,
+            "rendered": self.rendered,
+            "capture_dropped": self.capture_dropped,
+            "detect_dropped": self.detect_dropped,
+            "fps": self.rendered / elapsed,
+            "latency_mean_ms": mean_ms,
+            "latency_p95_ms": p95_ms,
+        }
+
+
+class FramePipeline:
+    # 采集线程 -> 检测线程 -> 渲染阶段（调用方所在线程，cv2.imshow 需要在主线程）
+    def __init__(self, cap, detector, prepare, queue_size=1, drop_frames=True, profiler=NULL_PROFILER):
+        self.cap = cap
+        self.profiler = profiler
+        self.detector = detector
+        self.prepare = prepare
+        self.capture_queue = LatestFrameQueue(queue_size, drop_frames)
+        self.result_queue = LatestFrameQueue(queue_size, drop_frames)
+        self.stats = PipelineStats()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._detect_loop, name="detect", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def _capture_loop(self):
+        index = 0
+        while not self._stop.is_set():
+            with self.profiler.span("capture"):
+                ret, frame = self.cap.read()
+            if not ret:
+                print("无法获取图像")
+                break
+            self.stats.captured += 1
+            self.capture_queue.put(FramePacket(index, time.perf_counter(), frame))
+            self.stats.capture_dropped = self.capture_queue.dropped
+            index += 1
+        self.capture_queue.close()
+
+    def _detect_loop(self):
+        while not self._stop.is_set():
+            packet = self.capture_queue.get()
+            if packet is None:
+                break
+            with self.profiler.span("prepare"):
+                packet.raw_frame, packet.frame_for_ui = self.prepare(packet.frame, packet.captured_at)
+            packet.frame = None
+            with self.profiler.span("detect"):
+                packet.hands, packet.frame_for_ui = self.detector.findHands(packet.frame_for_ui)
+            self.stats.detected += 1
+            self.result_queue.put(packet)
+            self.stats.detect_dropped = self.result_queue.dropped
+        self.result_queue.close()
+
+    def results(self):
+        while True:
+            packet = self.result_queue.get()
+            if packet is None:
+                return
+            yield packet
+
+    def stop(self):
+        self._stop.set()
+        self.capture_queue.close()
+        self.result_queue.close()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
@@ -0,0 +1,48 @@
+import numpy as np
+
+# 每根手指的 (MCP, PIP, DIP, TIP) 关键点编号
+FINGER_JOINTS = np.array([[1 + 4 * i, 2 + 4 * i, 3 + 4 * i, 4 + 4 * i] for i in range(5)])
+
+
+def as_landmark_array(landmarks):
+    # 接受单只手 (21, 3) 或批量 (N, 21, 3)，统一返回 (N, 21, 3)
+    arr = np.asarray(landmarks, dtype=np.float64)
+    if arr.ndim == 2:
+        arr = arr[np.newaxis]
+    return arr
+
+
+def _angles(v1, v2):
+    dot = np.einsum('...k,...k->...', v1, v2)
+    mag = np.linalg.norm(v1, axis=-1) * np.linalg.norm(v2, axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cos = np.clip(dot / mag, -1.0, 1.0)
+    angles = np.degrees(np.arccos(cos))
+    return np.where(mag == 0, 0.0, angles)
+
+
+def finger_bending_degrees(landmarks):
+    # 返回 (N, 10)：每根手指依次为 [根部弯曲, 指尖弯曲]，与 get_finger_bending_degree 顺序一致
+    arr = as_landmark_array(landmarks)
+    p0 = arr[:, np.newaxis, 0]
+    p1, p2, p3, p4 = (arr[:, FINGER_JOINTS[:, j]] for j in range(4))
+    base = p2 - p1
+    bend1 = _angles(p1 - p0, base)
+    bend2 = _angles(p4 - p3, base)
+    return np.stack([bend1, bend2], axis=-1).reshape(arr.shape[0], 10)
+
+
+def finger_states(bending, threshold=30):
+    # (N, 10) 弯曲角 -> (N, 5) 伸直状态
+    bending = np.asarray(bending).reshape(-1, 5, 2)
+    return np.all(bending < threshold, axis=-1).astype(np.int8)
+
+
+def batch_finger_features(landmarks, threshold=30, chunk_size=65536):
+    # 离线处理长时间的关键点日志，分块避免一次性占用过多内存
+    arr = np.asarray(landmarks)
+    n = arr.shape[0]
+    bending = np.empty((n, 10), dtype=np.float64)
+    for start in range(0, n, chunk_size):
+        bending[start:start + chunk_size] = finger_bending_degrees(arr[start:start + chunk_size])
+    return bending, finger_states(bending, threshold)
@@ -0,0 +1,151 @@
+import numpy as np
+from utils.gesture_features import as_landmark_array
+from utils.landmark_recording import HAND_TYPES
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy 可选，没有时使用暴力搜索
+    cKDTree = None
+
+# 归一化时以手腕 (0) -> 中指根部 (9) 为基准方向和长度
+WRIST, MIDDLE_MCP = 0, 9
+EMBEDDING_SIZE = 20 * 3
+
+
+def landmark_embeddings(landmarks, types=None):
+    # (21, 3) 或 (N, 21, 3) -> (N, 60) float32 嵌入：
+    #   平移到手腕为原点，旋转使手腕->中指根部朝上，按其长度缩放；types 中的 "Left" 会先做水平镜像
+    # 与手在画面中的位置、远近和平面内旋转无关
+    arr = as_landmark_array(landmarks).copy()
+    if types is not None:
+        left = np.array([t == "Left" for t in types], dtype=bool)
+        arr[left, :, 0] *= -1
+    arr -= arr[:, WRIST:WRIST + 1]
+    axis = arr[:, MIDDLE_MCP, :2]
+    length = np.hypot(axis[:, 0], axis[:, 1])
+    length[length == 0] = 1.0
+    # 旋转到 (0, -1)，即图像坐标中的正上方
+    cos, sin = -axis[:, 1] / length, -axis[:, 0] / length
+    x, y = arr[..., 0], arr[..., 1]
+    rotated = np.stack([x * cos[:, None] - y * sin[:, None], x * sin[:, None] + y * cos[:, None], arr[..., 2]],
+                       axis=-1)
+    rotated /= length[:, None, None]
+    return np.ascontiguousarray(rotated[:, 1:].reshape(len(arr), EMBEDDING_SIZE), dtype=np.float32)
+
+
+def recording_types(recording, rows):
+    # 录制中第一只手的类型编码 -> "Left"/"Right"/None
+    return [HAND_TYPES[t] if t < len(HAND_TYPES) else None for t in recording.hand_types[rows, 0]]
+
+
+class ExemplarLibrary:
+    # 手势样本库：连续的 (M, 60) float32 嵌入矩阵 + 标签编号，保存为 .npz
+    def __init__(self, embeddings=None, labels=None, names=()):
+        self.names = list(names)
+        self.embeddings = np.zeros((0, EMBEDDING_SIZE), np.float32) if embeddings is None else \
+            np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.labels = np.zeros(0, np.int32) if labels is None else np.asarray(labels, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def label_id(self, name):
+        if name not in self.names:
+            self.names.append(name)
+        return self.names.index(name)
+
+    def add(self, landmarks, name, types=None):
+        emb = landmark_embeddings(landmarks, types)
+        self.embeddings = np.concatenate([self.embeddings, emb])
+        self.labels = np.concatenate([self.labels, np.full(len(emb), self.label_id(name), np.int32)])
+        return len(emb)
+
+    def add_recording(self, recording, name, step=1):
+        # 取录制中每帧的第一只手作为 name 的样本，step 为抽帧间隔
+        landmarks, present = recording.primary_landmarks()
+        rows = np.flatnonzero(present)[::step]
+        if not len(rows):
+            return 0
+        return self.add(np.asarray(landmarks[rows], dtype=np.float64), name, recording_types(recording, rows))
+
+    def save(self, path):
+        np.savez_compressed(path, embeddings=self.embeddings, labels=self.labels, names=np.array(self.names))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["embeddings"], data["labels"], data["names"].tolist())
+
+
+class NearestNeighborClassifier:
+    # k 近邻投票；max_distance 为嵌入空间中的拒识距离（超过则返回 None）
+    # 默认用一次矩阵乘法暴力计算全部距离：几千个样本时单帧只需几十微秒；
+    # use_kdtree=True 且安装了 scipy 时改用 cKDTree（样本量很大时更省）
+    def __init__(self, library, k=5, max_distance=0.5, use_kdtree=False):
+        if not len(library):
+            raise ValueError("样本库为空")
+        self.library = library
+        self.names = list(library.names)
+        self.k = min(k, len(library))
+        self.max_distance = max_distance
+        self.embeddings = library.embeddings
+        self.labels = library.labels
+        self._sq_norms = np.einsum('ij,ij->i', self.embeddings, self.embeddings)
+        self._tree = cKDTree(self.embeddings) if use_kdtree and cKDTree is not None else None
+
+    def _neighbours(self, queries):
+        # 返回 (N, k) 的近邻下标和距离
+        if self._tree is not None:
+            dist, idx = self._tree.query(queries, k=self.k)
+            return idx.reshape(len(queries), -1), dist.reshape(len(queries), -1)
+        sq = self._sq_norms[None, :] - 2.0 * (queries @ self.embeddings.T)
+        sq += np.einsum('ij,ij->i', queries, queries)[:, None]
+        if self.k == 1:
+            idx = sq.argmin(axis=1)[:, None]
+        else:
+            idx = np.argpartition(sq, self.k - 1, axis=1)[:, :self.k]
+        dist = np.sqrt(np.maximum(np.take_along_axis(sq, idx, axis=1), 0.0))
+        return idx, dist
+
+    def _vote(self, idx, dist):
+        labels = self.labels[idx]
+        counts = np.zeros((len(idx), len(self.names)), dtype=np.int32)
+        np.add.at(counts, (np.arange(len(idx))[:, None], labels), 1)
+        best = counts.argmax(axis=1)
+        # 距离取获胜类别中最近的那个样本
+        best_dist = np.where(labels == best[:, None], dist, np.inf).min(axis=1)
+        return best, best_dist
+
+    def classify(self, lmList, hand_type=None):
+        # 单只手 -> (手势名或 None, 距离)
+        label, dist = self.classify_batch(np.asarray(lmList)[None], [hand_type])
+        return label[0], float(dist[0])
+
+    def classify_batch(self, landmarks, types=None, chunk_size=4096):
+        # (N, 21, 3) -> 长度 N 的手势名列表（拒识为 None）和距离数组；分块避免距离矩阵过大
+        landmarks = as_landmark_array(landmarks)
+        n = len(landmarks)
+        best = np.empty(n, dtype=np.int64)
+        best_dist = np.empty(n)
+        for start in range(0, n, chunk_size):
+            chunk_types = types[start:start + chunk_size] if types is not None else None
+            queries = landmark_embeddings(landmarks[start:start + chunk_size], chunk_types)
+            idx, dist = self._neighbours(queries)
+            best[start:start + chunk_size], best_dist[start:start + chunk_size] = self._vote(idx, dist)
+        names = [None if (self.max_distance is not None and d > self.max_distance) else self.names[b]
+                 for b, d in zip(best, best_dist)]
+        return names, best_dist
+
+    def classify_recording(self, recording):
+        # 对整段录制逐帧打分（每帧第一只手），无手的帧为 None
+        landmarks, present = recording.primary_landmarks()
+        names = [None] * len(recording)
+        dist = np.full(len(recording), np.inf)
+        rows = np.flatnonzero(present)
+        if len(rows):
+            found, found_dist = self.classify_batch(np.asarray(landmarks[rows], dtype=np.float64),
+                                                    recording_types(recording, rows))
+            for row, name in zip(rows, found):
+                names[row] = name
+            dist[rows] = found_dist
+        return names, dist
@@ -0,0 +1,87 @@
+import numpy as np
+
+FINGER_BITS = 1 << np.arange(5)
+
+
+def fingers_to_mask(fingers):
+    # [拇指, 食指, 中指, 无名指, 小指] -> 5 位掩码；支持 (5,) 或 (N, 5)
+    return np.asarray(fingers, dtype=np.int64) @ FINGER_BITS
+
+
+class GestureRuleIndex:
+    # 将 gesture_config 编译为索引结构：
+    #   'fingers': [..]            -> 掩码直接查表
+    #   'touch': (a, b, max_dist)  -> 所有距离规则合并为一次向量化计算，可给出多条（同时满足）
+    #   'check': callable          -> 兼容原有的任意判断函数
+    # 与原线性匹配一致：任意一项满足即命中，结果按配置顺序返回
+    def __init__(self, gesture_config):
+        self.names = list(gesture_config)
+        self._by_mask = {}
+        self._checks = []
+        touch_rows = []
+        self._touch_required = np.zeros(len(self.names), dtype=np.int64)
+
+        for pos, name in enumerate(self.names):
+            config = gesture_config[name]
+            if 'fingers' in config:
+                mask = int(fingers_to_mask(config['fingers']))
+                self._by_mask.setdefault(mask, []).append(pos)
+            if 'touch' in config:
+                rules = config['touch']
+                if np.ndim(rules) == 1:
+                    rules = [rules]
+                for a, b, max_dist in rules:
+                    touch_rows.append((pos, a, b, max_dist))
+                self._touch_required[pos] = len(rules)
+            if 'check' in config:
+                self._checks.append((pos, config['check']))
+
+        rows = np.array(touch_rows, dtype=np.float64).reshape(-1, 4)
+        self._touch_pos = rows[:, 0].astype(np.int64)
+        self._touch_a = rows[:, 1].astype(np.int64)
+        self._touch_b = rows[:, 2].astype(np.int64)
+        self._touch_limit = rows[:, 3]
+        self._touch_gestures = np.flatnonzero(self._touch_required)
+        self._by_mask = {mask: tuple(positions) for mask, positions in self._by_mask.items()}
+        # 掩码 -> 命中行的查表：32 种手指状态 × G 个手势，批量匹配一次索引即可，与手势数无关
+        self._mask_table = np.zeros((1 << len(FINGER_BITS), len(self.names)), dtype=bool)
+        for mask, positions in self._by_mask.items():
+            self._mask_table[mask, list(positions)] = True
+
+    def _touch_hits(self, landmarks):
+        # landmarks: (N, 21, >=2) -> (N, G) 布尔矩阵
+        n = landmarks.shape[0]
+        hits = np.zeros((n, len(self.names)), dtype=bool)
+        if not len(self._touch_pos):
+            return hits
+        diff = landmarks[:, self._touch_a, :2] - landmarks[:, self._touch_b, :2]
+        passed = np.hypot(diff[..., 0], diff[..., 1]) < self._touch_limit
+        counts = np.zeros((n, len(self.names)), dtype=np.int64)
+        np.add.at(counts, (slice(None), self._touch_pos), passed)
+        hits[:, self._touch_gestures] = counts[:, self._touch_gestures] == self._touch_required[self._touch_gestures]
+        return hits
+
+    def match(self, fingers, lmList):
+        positions = set(self._by_mask.get(int(fingers_to_mask(fingers)), ()))
+        if len(self._touch_pos):
+            landmarks = np.asarray(lmList, dtype=np.float64)[np.newaxis]
+            positions.update(np.flatnonzero(self._touch_hits(landmarks)[0]).tolist())
+        for pos, check in self._checks:
+            if pos not in positions and check(lmList):
+                positions.add(pos)
+        return [self.names[pos] for pos in sorted(positions)]
+
+    def hit_matrix(self, fingers, landmarks):
+        # fingers: (N, 5)，landmarks: (N, 21, 3) -> (N, G) 布尔矩阵，列顺序同 self.names
+        landmarks = np.asarray(landmarks, dtype=np.float64)
+        hits = self._touch_hits(landmarks)
+        hits |= self._mask_table[fingers_to_mask(fingers)]
+        for pos, check in self._checks:
+            for i in np.flatnonzero(~hits[:, pos]):
+                hits[i, pos] = bool(check(landmarks[i].tolist()))
+        return hits
+
+    def match_batch(self, fingers, landmarks):
+        # fingers: (N, 5)，landmarks: (N, 21, 3) -> 每帧命中的手势列表
+        hits = self.hit_matrix(fingers, landmarks)
+        return [[self.names[pos] for pos in np.flatnonzero(row)] for row in hits]
@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+
+class StageHistogram:
+    # 固定大小的环形缓冲，记录最近 size 次耗时（纳秒），分位数只在读取时计算
+    def __init__(self, size=1024):
+        self.samples = np.zeros(size, dtype=np.int64)
+        self.size = size
+        self.count = 0
+        self.total_ns = 0
+
+    def add(self, ns):
+        self.samples[self.count % self.size] = ns
+        self.count += 1
+        self.total_ns += ns
+
+    def stats(self):
+        n = min(self.count, self.size)
+        if n == 0:
+            return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+        p50, p95, p99 = np.percentile(self.samples[:n], (50, 95, 99)) / 1e6
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ns / self.count / 1e6,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+        }
+
+
+class _Span:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.started = 0
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.add(time.perf_counter_ns() - self.started)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Profiler:
+    # 命名计时区间：with profiler.span("detect"): ...
+    # 或者 t0 = profiler.now() ... profiler.record_since("draw", t0)，适合跨越多个分支的区间
+    # 每次 span() 返回新的计时对象，同名区间嵌套或在多个线程中同时计时互不覆盖起点；enabled=False 时全部为空操作
+    # 流水线模式下检测线程与主线程共用一个 Profiler：新建直方图和 snapshot() 在锁内进行
+    def __init__(self, size=1024, enabled=True):
+        self.size = size
+        self.enabled = enabled
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._frame_times = np.zeros(128, dtype=np.float64)
+        self._frames = 0
+        self._last_export = 0.0
+
+    def histogram(self, name):
+        hist = self.histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.get(name)
+                if hist is None:
+                    hist = self.histograms[name] = StageHistogram(self.size)
+        return hist
+
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self.histogram(name))
+
+    def now(self):
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def record_since(self, name, started_ns):
+        if self.enabled:
+            self.histogram(name).add(time.perf_counter_ns() - started_ns)
+
+    def frame(self):
+        # 每帧调用一次，用于计算 FPS
+        if self.enabled:
+            self._frame_times[self._frames % len(self._frame_times)] = time.perf_counter()
+            self._frames += 1
+
+    def fps(self):
+        n = min(self._frames, len(self._frame_times))
+        if n < 2:
+            return 0.0
+        newest = self._frame_times[(self._frames - 1) % len(self._frame_times)]
+        oldest = self._frame_times[(self._frames - n) % len(self._frame_times)]
+        return (n - 1) / (newest - oldest) if newest > oldest else 0.0
+
+    def snapshot(self):
+        with self._lock:
+            return {name: hist.stats() for name, hist in self.histograms.items()}
+
+    def draw_hud(self, frame, origin=(10, None), stages=None):
+        if not self.enabled:
+            return frame
+        snapshot = self.snapshot()
+        names = stages or list(snapshot)
+        lines = [f"FPS {self.fps():5.1f}"]
+        for name in names:
+            if name in snapshot:
+                s = snapshot[name]
+                lines.append(f"{name:<18} p50 {s['p50_ms']:6.2f}  p95 {s['p95_ms']:6.2f}  p99 {s['p99_ms']:6.2f} ms")
+        x = origin[0]
+        line_h = 18
+        y = origin[1] if origin[1] is not None else frame.shape[0] - 10 - line_h * (len(lines) - 1)
+        for i, line in enumerate(lines):
+            pos = (x, y + i * line_h)
+            cv2.putText(frame, line, pos, cv2.FONT_HERSHEY_PLAIN, 1.1, (0, 0, 0), 3)
+            cv2.putText(frame, line, pos, cv2.FONT_HERSHEY_PLAIN, 1.1, (255, 255, 255), 1)
+        return frame
+
+    def to_csv(self):
+        rows = ["stage,count,mean_ms,p50_ms,p95_ms,p99_ms"]
+        for name, s in self.snapshot().items():
+            rows.append(f"{name},{s['count']},{s['mean_ms']:.4f},{s['p50_ms']:.4f},{s['p95_ms']:.4f},{s['p99_ms']:.4f}")
+        rows.append(f"fps,{self._frames},{self.fps():.3f},,,")
+        return "\n".join(rows) + "\n"
+
+    def to_prometheus(self, prefix="gesture"):
+        lines = [
+            f"# HELP {prefix}_stage_latency_seconds Per-stage latency over the most recent samples.",
+            f"# TYPE {prefix}_stage_latency_seconds summary",
+        ]
+        for name, s in self.snapshot().items():
+            for q, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+                lines.append(f'{prefix}_stage_latency_seconds{{stage="{name}",quantile="{q}"}} {s[key] / 1000:.6f}')
+            lines.append(f'{prefix}_stage_latency_seconds_count{{stage="{name}"}} {s["count"]}')
+            lines.append(f'{prefix}_stage_latency_seconds_sum{{stage="{name}"}} {s["mean_ms"] * s["count"] / 1000:.6f}')
+        lines.append(f"# TYPE {prefix}_fps gauge")
+        lines.append(f"{prefix}_fps {self.fps():.3f}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        # 扩展名 .prom 写出 Prometheus 文本格式，其余为 CSV；先写临时文件再替换，避免读到半个文件
+        text = self.to_prometheus() if path.endswith(".prom") else self.to_csv()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def maybe_export(self, path, interval=10.0):
+        now = time.monotonic()
+        if self.enabled and path and now - self._last_export >= interval:
+            self._last_export = now
+            self.export(path)
+
+
+NULL_PROFILER = Profiler(enabled=False)
@@ -0,0 +1,160 @@
+import json
+import os
+import time
+import numpy as np
+from utils.roi_tracker import make_hand
+
+# 录制目录结构：
+#   meta.json        帧数、每帧最大手数、画面尺寸等；开始录制时即写入，帧数在 close() 时更新
+#                    （进程异常退出时读取端按各 .bin 文件大小恢复帧数）
+#   landmarks.bin    int16 (frames, max_hands, 21, 3)，可直接 np.memmap
+#   hand_counts.bin  uint8 (frames,)
+#   hand_types.bin   uint8 (frames, max_hands)，见 HAND_TYPES
+#   timestamps.bin   float64 (frames,)，相对录制开始的秒数
+FORMAT_VERSION = 1
+HAND_TYPES = ("Left", "Right")
+UNKNOWN_TYPE = 255
+
+
+def hands_to_array(hands, max_hands, out=None):
+    # hands 列表 -> (max_hands, 21, 3) int16 数组、手数、类型编码
+    if out is None:
+        out = np.zeros((max_hands, 21, 3), dtype=np.int16)
+    else:
+        out[:] = 0
+    types = np.full(max_hands, UNKNOWN_TYPE, dtype=np.uint8)
+    count = min(len(hands), max_hands)
+    for i in range(count):
+        out[i] = np.clip(np.asarray(hands[i]["lmList"], dtype=np.int64)[:21, :3], -32768, 32767)
+        hand_type = hands[i].get("type")
+        if hand_type in HAND_TYPES:
+            types[i] = HAND_TYPES.index(hand_type)
+    return out, count, types
+
+
+def array_to_hands(landmarks, count, types=None):
+    # 与 hands_to_array 相反，还原为 cvzone 结构的 hands 列表
+    hands = []
+    for i in range(int(count)):
+        hand_type = None
+        if types is not None and types[i] != UNKNOWN_TYPE:
+            hand_type = HAND_TYPES[types[i]]
+        hands.append(make_hand(landmarks[i].tolist(), hand_type))
+    return hands
+
+
+# 每帧在各 .bin 文件中的形状和类型（不含帧维度）
+def frame_layout(max_hands):
+    return {
+        "landmarks": (np.int16, (max_hands, 21, 3)),
+        "hand_counts": (np.uint8, ()),
+        "hand_types": (np.uint8, (max_hands,)),
+        "timestamps": (np.float64, ()),
+    }
+
+
+class LandmarkRecorder:
+    def __init__(self, directory, max_hands=2, frame_size=None, fps=None, source=None):
+        self.directory = directory
+        self.max_hands = max_hands
+        self.frame_size = frame_size
+        self.fps = fps
+        self.source = source
+        self.frames = 0
+        self._started_at = None
+        self._buffer = np.zeros((max_hands, 21, 3), dtype=np.int16)
+        os.makedirs(directory, exist_ok=True)
+        self._files = {name: open(os.path.join(directory, f"{name}.bin"), "wb") for name in frame_layout(max_hands)}
+        self._write_meta()
+
+    def write(self, hands, timestamp=None, frame_size=None):
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if self._started_at is None:
+            self._started_at = timestamp
+        if self.frame_size is None and frame_size is not None:
+            self.frame_size = (int(frame_size[0]), int(frame_size[1]))
+            self._write_meta()
+
+        landmarks, count, types = hands_to_array(hands or [], self.max_hands, self._buffer)
+        landmarks.tofile(self._files["landmarks"])
+        np.array([count], dtype=np.uint8).tofile(self._files["hand_counts"])
+        types.tofile(self._files["hand_types"])
+        np.array([timestamp - self._started_at], dtype=np.float64).tofile(self._files["timestamps"])
+        self.frames += 1
+
+    def close(self):
+        if self._files is None:
+            return
+        for f in self._files.values():
+            f.close()
+        self._files = None
+        self._write_meta()
+
+    def _write_meta(self):
+        meta = {
+            "version": FORMAT_VERSION,
+            "frames": self.frames,
+            "max_hands": self.max_hands,
+            "frame_size": list(self.frame_size) if self.frame_size else None,
+            "fps": self.fps,
+            "source": self.source,
+        }
+        # 先写临时文件再替换，异常退出时不会留下半个 meta.json
+        path = os.path.join(self.directory, "meta.json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkRecording:
+    # 以内存映射方式打开录制结果，不会一次性读入内存
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"不支持的录制格式版本 {self.meta.get('version')}")
+        layout = frame_layout(self.meta["max_hands"])
+        # 未正常 close() 的录制 meta.json 中帧数为 0 或偏小：按各文件中完整帧的个数恢复（取最小值，丢弃写了一半的帧）
+        n = min(self._complete_frames(name, dtype, shape) for name, (dtype, shape) in layout.items())
+        if n != self.meta["frames"]:
+            print(f"⚠️ {directory} 未正常结束录制，按文件大小恢复 {n} 帧")
+        self.frames = n
+        self.landmarks, self.hand_counts, self.hand_types, self.timestamps = (
+            self._map(name, dtype, (n,) + shape) for name, (dtype, shape) in layout.items())
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def _complete_frames(self, name, dtype, shape):
+        path = self._path(name)
+        if not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // (np.dtype(dtype).itemsize * int(np.prod(shape)))
+
+    def _map(self, name, dtype, shape):
+        if shape[0] == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self._path(name), dtype=dtype, mode="r", shape=shape)
+
+    def __len__(self):
+        return self.frames
+
+    @property
+    def frame_size(self):
+        size = self.meta.get("frame_size")
+        return tuple(size) if size else (1280, 720)
+
+    def hands_at(self, index):
+        return array_to_hands(self.landmarks[index], self.hand_counts[index], self.hand_types[index])
+
+    def primary_landmarks(self):
+        # 每帧第一只手的关键点 (帧数, 21, 3) 及是否有手的掩码，便于批量特征提取
+        return self.landmarks[:, 0], self.hand_counts > 0
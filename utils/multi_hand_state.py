@@ -0,0 +1,287 @@
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # scipy 可选，没有时用贪心匹配
+    linear_sum_assignment = None
+
+
+def assign(cost, max_cost):
+    # cost: (P, C) 代价矩阵 -> (行下标, 列下标)，只保留代价不超过 max_cost 的配对
+    empty = np.empty(0, dtype=np.intp)
+    if cost.size == 0:
+        return empty, empty
+    if linear_sum_assignment is not None:
+        # 超限的配对换成一个足够大的常数，保证有可行配对时不会为了它们牺牲其他配对
+        rows, cols = linear_sum_assignment(np.where(cost <= max_cost, cost, max_cost * cost.size + 1.0))
+        keep = cost[rows, cols] <= max_cost
+        return rows[keep], cols[keep]
+    # 贪心：按代价从小到大取互不冲突的配对（手数很少时与最优解几乎总是一致）
+    order = np.argsort(cost, axis=None)
+    used_rows = np.zeros(cost.shape[0], dtype=bool)
+    used_cols = np.zeros(cost.shape[1], dtype=bool)
+    rows, cols = [], []
+    for r, c in zip(*np.unravel_index(order, cost.shape)):
+        if cost[r, c] > max_cost:
+            break
+        if used_rows[r] or used_cols[c]:
+            continue
+        used_rows[r] = used_cols[c] = True
+        rows.append(r)
+        cols.append(c)
+    return np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)
+
+
+class MultiHandState:
+    # 多只手的状态（稳定 ID、停留计时、手势投票历史）按槽位存放在连续数组中，每帧所有手一次向量化更新
+    #   每帧按锚点（默认即跟踪点）与上一帧位置做最优匹配（有 scipy 时用 linear_sum_assignment，否则贪心），
+    #   距离不超过 max_distance 的沿用原 ID，其余分配新 ID；超过 max_missing 秒未出现的手释放槽位，
+    #   再出现时作为新手重新计时
+    #   例外：已知的手和本帧检测到的手都只有一只时总是沿用原 ID（不论移动距离和丢失时长）
+    #   最多同时跟踪 capacity 只手，超出的手不分配槽位（slot 为 -1）
+    #   停留判定与 DwellTimer 相同：跟踪点相对至少 window 秒前位置的速度低于 max_speed 并持续 dwell_seconds 秒；
+    #     位置历史为每只手 trail_size 个点的环形缓冲，需覆盖 window 秒（默认 8 点可到 240 FPS）
+    #   手势投票：窗口（history_ms 毫秒内，且设置了 window_frames 时只取最近 window_frames 帧）内出现次数最多者，
+    #     平票时保持当前结果；每帧的手势以布尔命中行（列顺序同 gesture_names，手势种类不设上限）存入每只手的环形缓冲，
+    #     同时维护每只手各手势的累计次数：写入时加上新一帧，移出窗口（按帧数或时间）的旧帧减掉，
+    #     每帧开销与窗口长度无关；缓冲初始为 history_size 帧，窗口内的帧装不下时自动加倍
+    #   迟滞：enter_ratio 为新手势在窗口中占比达到该值才切换（否则为 None），
+    #     exit_ratio 为当前手势占比仍不低于该值时保持不变，None 表示不做迟滞
+    def __init__(self, capacity=8, max_distance=150.0, max_missing=0.5, dwell_seconds=100 / 30, max_speed=300.0,
+                 window=1 / 30, min_distance=3.0, history_ms=5 * 1000 / 30, history_size=32, trail_size=8,
+                 window_frames=None, enter_ratio=0.0, exit_ratio=None):
+        self.capacity = capacity
+        self.max_distance = max_distance
+        self.max_missing = max_missing
+        self.dwell_seconds = dwell_seconds
+        self.max_speed = max_speed
+        self.window = window
+        self.min_distance = min_distance
+        if history_ms is None and window_frames is None:
+            raise ValueError("history_ms 和 window_frames 至少需要设置一个")
+        self.history_ms = history_ms
+        self.window_frames = window_frames
+        self.history_size = history_size
+        self.enter_ratio = enter_ratio
+        self.exit_ratio = exit_ratio
+        self.trail_size = trail_size
+        self.gesture_names = []
+        self.reset()
+
+    def reset(self):
+        cap = self.capacity
+        self.ids = np.full(cap, -1, dtype=np.int64)
+        self.born = np.zeros(cap)
+        self.last_seen = np.zeros(cap)
+        self.anchors = np.zeros((cap, 2))
+        self.points = np.zeros((cap, 2))
+        self.moving = np.zeros(cap, dtype=bool)
+        self._trail_pos = np.zeros((cap, self.trail_size, 2))
+        self._trail_t = np.full((cap, self.trail_size), -np.inf)
+        self._trail_head = np.zeros(cap, dtype=np.intp)
+        # 停留开始时间，NaN 表示尚未开始（下一次更新时开始计时）
+        self._dwell_started = np.full(cap, np.nan)
+        self.elapsed = np.zeros(cap)
+        self._hist_hits = np.zeros((cap, self.history_size, len(self.gesture_names)), dtype=bool)
+        self._hist_t = np.full((cap, self.history_size), -np.inf)
+        # 下一次写入的位置、窗口内的帧数（最旧的一帧在 head - len 处）
+        self._hist_head = np.zeros(cap, dtype=np.intp)
+        self._hist_len = np.zeros(cap, dtype=np.intp)
+        # 窗口内各手势的出现次数、窗口内的总帧数
+        self._counts = np.zeros((cap, len(self.gesture_names)), dtype=np.int64)
+        self._total = np.zeros(cap, dtype=np.int64)
+        self.gestures = np.full(cap, -1, dtype=np.int64)
+        self._next_id = 0
+
+    def gesture_code(self, name):
+        # 手势名 -> 命中矩阵中的列号；新名字追加在最后
+        if name not in self.gesture_names:
+            self.gesture_names.append(name)
+        return self.gesture_names.index(name)
+
+    def gesture_hits(self, gestures):
+        # 每只手的手势名列表 -> (N, G) 布尔命中矩阵
+        codes = [[self.gesture_code(name) for name in names] for names in gestures]
+        hits = np.zeros((len(gestures), len(self.gesture_names)), dtype=bool)
+        for row, row_codes in zip(hits, codes):
+            row[row_codes] = True
+        return hits
+
+    def _clear_slots(self, slots):
+        self._trail_t[slots] = -np.inf
+        self._dwell_started[slots] = np.nan
+        self.elapsed[slots] = 0.0
+        self.moving[slots] = False
+
+    def update(self, points, now, anchors=None):
+        # points：每只手的跟踪点 (N, >=2)（例如食指指尖），anchors：用于匹配身份的点 (N, 2)，默认同 points
+        # 返回与输入顺序对应的槽位下标 (N,)，未能分配的为 -1
+        n = len(points)
+        points = np.asarray(points, dtype=np.float64).reshape(n, -1)[:, :2] if n else np.zeros((0, 2))
+        anchors = points if anchors is None else np.asarray(anchors, dtype=np.float64).reshape(n, 2)
+
+        slots = np.full(n, -1, dtype=np.intp)
+        known = np.flatnonzero(self.ids >= 0)
+        if n == 1 and len(known) == 1:
+            # 只有一只手时不需要区分身份：快速移动（低帧率下一帧可超过 max_distance）或短暂丢失后仍沿用原 ID
+            slots[0] = known[0]
+            if now - self.last_seen[known[0]] > self.max_missing:
+                # 丢失较久后重新出现：身份不变，停留计时重新开始
+                self._clear_slots(known)
+        else:
+            expired = (self.ids >= 0) & (now - self.last_seen > self.max_missing)
+            self.ids[expired] = -1
+
+            active = np.flatnonzero(self.ids >= 0)
+            diff = self.anchors[active, None, :] - anchors[None, :, :]
+            rows, cols = assign(np.hypot(diff[..., 0], diff[..., 1]), self.max_distance)
+            slots[cols] = active[rows]
+
+        new = np.flatnonzero(slots < 0)
+        free = np.flatnonzero(self.ids < 0)[:len(new)]
+        new = new[:len(free)]
+        if len(new):
+            slots[new] = free
+            self.ids[free] = self._next_id + np.arange(len(free))
+            self._next_id += len(free)
+            self.born[free] = now
+            self._clear_slots(free)
+            self._hist_len[free] = 0
+            self._counts[free] = 0
+            self._total[free] = 0
+            self.gestures[free] = -1
+
+        tracked = slots >= 0
+        s = slots[tracked]
+        pos = points[tracked]
+        self.last_seen[s] = now
+        self.anchors[s] = anchors[tracked]
+        self.points[s] = pos
+
+        # 参考位置：每只手环形缓冲中最新的、至少 window 秒前的点
+        trail_t = self._trail_t[s]
+        candidates = np.where(trail_t <= now - self.window, trail_t, -np.inf)
+        ref = candidates.argmax(axis=1)
+        ref_t = candidates[np.arange(len(s)), ref]
+        has_ref = np.isfinite(ref_t)
+        delta = pos - self._trail_pos[s, ref]
+        dist = np.hypot(delta[:, 0], delta[:, 1])
+        limit = np.maximum(self.max_speed * np.where(has_ref, now - ref_t, 0.0), self.min_distance)
+        moving = has_ref & (dist >= limit)
+        started = self._dwell_started[s]
+        started = np.where(moving | np.isnan(started), now, started)
+        self._dwell_started[s] = started
+        self.elapsed[s] = now - started
+        self.moving[s] = moving
+
+        head = self._trail_head[s]
+        self._trail_pos[s, head] = pos
+        self._trail_t[s, head] = now
+        self._trail_head[s] = (head + 1) % self.trail_size
+        return slots
+
+    def _grow_history(self):
+        # 把每只手的环形缓冲按从旧到新展开，再把长度加倍
+        size = self.history_size
+        order = (self._hist_head[:, None] - self._hist_len[:, None] + np.arange(size)) % size
+        rows = np.arange(self.capacity)[:, None]
+        self._hist_hits = np.pad(self._hist_hits[rows, order], ((0, 0), (0, size), (0, 0)))
+        self._hist_t = np.pad(self._hist_t[rows, order], ((0, 0), (0, size)), constant_values=-np.inf)
+        self._hist_head = self._hist_len.copy()
+        self.history_size = 2 * size
+
+    def _evict(self, slot, cutoff, max_len):
+        # 从最旧的一帧开始移出时间不晚于 cutoff 或超出 max_len 帧的记录；每帧记录只会被移出一次，均摊 O(1)
+        length = int(self._hist_len[slot])
+        tail = (int(self._hist_head[slot]) - length) % self.history_size
+        times = self._hist_t[slot]
+        while length and (length > max_len or times[tail] <= cutoff):
+            self._counts[slot] -= self._hist_hits[slot, tail]
+            self._total[slot] -= 1
+            tail = (tail + 1) % self.history_size
+            length -= 1
+        self._hist_len[slot] = length
+
+    def vote(self, slots, hits, now):
+        # hits：与 slots 对应的本帧命中矩阵 (N, G)，列顺序同 gesture_names，列数可少于已登记的手势数（见 gesture_hits）
+        # 返回每只手平滑后的手势名（无则 None）
+        slots = np.asarray(slots, dtype=np.intp)
+        hits = np.asarray(hits, dtype=bool).reshape(len(slots), -1)
+        names = self.gesture_names
+        g = len(names)
+        if hits.shape[1] > g:
+            raise ValueError(f"命中矩阵有 {hits.shape[1]} 列，只登记了 {g} 种手势")
+        if self._counts.shape[1] < g:
+            # 新登记的手势：历史和计数中补上新的列
+            extra = g - self._counts.shape[1]
+            self._hist_hits = np.pad(self._hist_hits, ((0, 0), (0, 0), (0, extra)))
+            self._counts = np.pad(self._counts, ((0, 0), (0, extra)))
+        if hits.shape[1] < g:
+            hits = np.pad(hits, ((0, 0), (0, g - hits.shape[1])))
+        tracked = slots >= 0
+        s = slots[tracked]
+        hits = hits[tracked]
+
+        cutoff = now - self.history_ms / 1000.0 if self.history_ms is not None else -np.inf
+        # 写入本帧之前最多保留 window_frames - 1 帧
+        max_len = self.window_frames - 1 if self.window_frames is not None else self.history_size
+        for slot in s.tolist():
+            self._evict(slot, cutoff, max_len)
+        if len(s) and self._hist_len[s].max() >= self.history_size:
+            self._grow_history()
+        head = self._hist_head[s]
+        self._hist_hits[s, head] = hits
+        self._hist_t[s, head] = now
+        self._hist_head[s] = (head + 1) % self.history_size
+        self._hist_len[s] += 1
+        self._counts[s] += hits
+        self._total[s] += 1
+
+        result = [None] * len(slots)
+        if not names:
+            return result
+        counts = self._counts[s]
+        total = self._total[s]
+        best = counts.max(axis=1)
+        leaders = counts == best[:, None]
+        rows = np.arange(len(s))
+        current = self.gestures[s]
+        current_count = np.where(current >= 0, counts[rows, np.maximum(current, 0)], 0)
+        keep = (current >= 0) & leaders[rows, np.maximum(current, 0)]
+        top = np.where(keep, current, leaders.argmax(axis=1))
+        top = np.where((best > 0) & (best >= self.enter_ratio * total), top, -1)
+        if self.exit_ratio is not None:
+            # 当前手势占比仍不低于 exit_ratio 时保持不变
+            hold = (current >= 0) & (current_count > 0) & (current_count >= self.exit_ratio * total)
+            top = np.where(hold, current, top)
+        self.gestures[s] = top
+
+        for i, code in zip(np.flatnonzero(tracked), top):
+            if code >= 0:
+                result[i] = names[code]
+        return result
+
+    def ids_of(self, slots):
+        slots = np.asarray(slots, dtype=np.intp)
+        return np.where(slots >= 0, self.ids[slots], -1)
+
+    def progress(self, slots):
+        slots = np.asarray(slots, dtype=np.intp)
+        if self.dwell_seconds <= 0:
+            return np.ones(len(slots))
+        return np.minimum(self.elapsed[slots] / self.dwell_seconds, 1.0)
+
+    def done(self, slots):
+        return self.elapsed[np.asarray(slots, dtype=np.intp)] >= self.dwell_seconds
+
+    def restart(self, slots, now):
+        # 保留位置历史，只重新开始计时（同 DwellTimer.restart）
+        slots = np.asarray(slots, dtype=np.intp)
+        self._dwell_started[slots] = now
+        self.elapsed[slots] = 0.0
+
+    def by_age(self, slots):
+        # 已跟踪的手在输入中的下标，按出现先后（ID 从旧到新）排序
+        slots = np.asarray(slots, dtype=np.intp)
+        tracked = np.flatnonzero(slots >= 0)
+        return tracked[np.argsort(self.ids[slots[tracked]], kind="stable")]
@@ -1,13 +1,26 @@
 import cv2
 import numpy as np
-import math
-import os
+import time
 from datetime import datetime
+from utils.asset_cache import load_resized_image
+from utils.capture_writer import default_writer
+from utils.dwell_timer import DwellTimer
+from utils.frame_history import BestFrameCapture
+from utils.gesture_features import batch_finger_features, finger_bending_degrees, finger_states
+from utils.gesture_rules import GestureRuleIndex
+from utils.instrumentation import NULL_PROFILER
+from utils.multi_hand_state import MultiHandState
+from utils.ui_compositor import UICompositor, draw_save_button
+from utils.stroke_store import StrokeStore
 
 class HandGestureRecognizer:
-    def __init__(self):
+    def __init__(self, use_asset_cache=True):
+        self.use_asset_cache = use_asset_cache
         self.latest_crop = None
+        # 截图的附加信息（手势、区域、时间），保存时写入同名 .json
+        self.latest_crop_info = {}
         self.save_directory = "captures"
+        self.writer = default_writer
 
         self.gesture_config = {
             'one': {
@@ -16,32 +29,68 @@ class HandGestureRecognizer:
             },
             'ok': {
                 'file': './hand_images/ok.png',
-                'check': self.check_ok_gesture,
+                # 与 check_ok_gesture 等价（拇指尖与食指尖距离 < 30 像素），写成距离规则后与其他规则一起向量化计算
+                # 等价性见 tests/test_gesture_rules.py
+                'touch': (4, 8, 30),
             }
         }
         self.valid_gestures = self._load_gesture_images()
-        self.gesture_history = []
-        self.history_length = 5
-
-        self.hover_counter = 0
-        self.hover_frames_threshold = 100
-
-        self.last_tip_positions = None
+        self.rule_index = GestureRuleIndex({name: data['config'] for name, data in self.valid_gestures.items()})
+        # 投票窗口、停留时长和移动速度都按时间计算，帧率变化时行为不变
+        # （数值取自原先 30 FPS 下的 5 帧窗口、100 帧停留和每帧 10 像素）
+        self.history_ms = 5 * 1000 / 30
+        self.bend_threshold = 30
+        # 画面中每只手的稳定 ID、手势投票历史（连续数组，所有手一次更新）
+        # 规则手势按 rule_index.names 的顺序先登记，命中矩阵的列直接对应投票的手势编号；近邻分类的标签登记在其后
+        # 嘈杂的 RTSP 流可加长窗口并设置迟滞，例如 MultiHandState(history_ms=500, enter_ratio=0.5, exit_ratio=0.3)
+        self.hands_state = MultiHandState(history_ms=self.history_ms)
+        for name in self.rule_index.names:
+            self.hands_state.gesture_code(name)
+        # 当前驱动交互的手（最早出现的那只）的 ID，以及本帧每只手 ID -> 平滑后的手势
+        self.primary_id = None
+        self.hand_gestures = {}
+        # 可选的近邻分类器（utils.gesture_knn.NearestNeighborClassifier）；给出结果时优先于规则，拒识时回退到规则
+        self.nn_classifier = None
+
+        self.dwell = DwellTimer(seconds=100 / 30, max_speed=300.0)
 
         self.preview_image = None
         self.show_save_button = False
         self.save_button_rect = None
 
-        self.draw_points = []
+        self.stroke = StrokeStore(capacity=2048, min_step=2)
+        # 'one' 手势下指尖轨迹的动态手势（画圈、划动、折线）识别，默认关闭：每帧的带宽 DTW 是纯 Python 循环（约 0.35 ms），
+        # 需要时设为 utils.trajectory_recognizer.TrajectoryRecognizer()（main.py / batch.py 等的 --motion）
+        # motion_events 为本帧完成的动作事件，last_motion 为最近一次事件（界面上显示 motion_display_seconds 秒）
+        self.motion = None
+        self.motion_events = []
+        self.last_motion = None
+        self.motion_display_seconds = 1.0
         self.preview_stopped = False
 
+        # render=False 时不做任何绘制和预览缩放（无界面批处理）
+        self.render = True
+        # 本帧停留完成时的截图区域 (x_min, y_min, x_max, y_max)，其余帧为 None
+        self.captured_rect = None
+        # 内部计时区间：recognize.features / rules / smoothing / drawing / preview
+        self.profiler = NULL_PROFILER
+        # 预渲染的静态控件（Save 按钮、手势示意图），状态不变时每帧只做一次 ROI 复制
+        self.ui = UICompositor()
+        # 停留完成时先用当前帧截图，后台从最近画面中选出最清晰的一帧后再替换（见 BestFrameCapture）
+        self.best_frame = BestFrameCapture()
+
     def _load_gesture_images(self):
         valid = {}
         for name, config in self.gesture_config.items():
-            img = cv2.imread(config['file'])
+            if self.use_asset_cache:
+                img = load_resized_image(config['file'], (200, 200))
+            else:
+                img = cv2.imread(config['file'])
+                if img is not None:
+                    img = cv2.resize(img, (200, 200))
             if img is not None:
                 valid[name] = {
-                    'img': cv2.resize(img, (200, 200)),
+                    'img': img,
                     'config': config
                 }
             else:
@@ -56,19 +105,16 @@ class HandGestureRecognizer:
         return np.degrees(np.arccos(np.clip(np.dot(v1, v2) / (mag1 * mag2), -1.0, 1.0)))
 
     def get_finger_bending_degree(self, lmList):
-        coord = np.array(lmList).T
-        p0 = coord[:, 0]
-        bending = []
-        for i in range(5):
-            p1 = coord[:, 1 + 4 * i]
-            p2 = coord[:, 2 + 4 * i]
-            p3 = coord[:, 3 + 4 * i]
-            p4 = coord[:, 4 + 4 * i]
-            bend1 = self.angle_between_vectors(p1 - p0, p2 - p1)
-            bend2 = self.angle_between_vectors(p4 - p3, p2 - p1)
-            bending.append(bend1)
-            bending.append(bend2)
-        return bending
+        return finger_bending_degrees(lmList)[0].tolist()
+
+    def get_finger_states_batch(self, landmarks):
+        # 批量入口：(N, 21, 3) 关键点 -> (N, 10) 弯曲角与 (N, 5) 手指状态
+        return batch_finger_features(landmarks, self.bend_threshold)
+
+    def detect_gestures_batch(self, landmarks):
+        # 批量规则匹配（不做时间平滑），用于离线处理录制的关键点
+        bending, fingers = self.get_finger_states_batch(landmarks)
+        return self.rule_index.match_batch(fingers, landmarks)
 
     def check_ok_gesture(self, lmList):
         thumb_tip = lmList[4][:2]
@@ -78,91 +124,147 @@ class HandGestureRecognizer:
 
     def _draw_progress_ring(self, frame, center, radius=20, thickness=5):
         cv2.circle(frame, center, radius, (200, 200, 200), thickness)
-        progress_ratio = min(self.hover_counter / self.hover_frames_threshold, 1.0)
+        progress_ratio = self.dwell.progress
         if progress_ratio > 0:
             angle = int(360 * progress_ratio)
             cv2.ellipse(frame, center, (radius, radius), -90, 0, angle, (0, 255, 0), thickness)
 
+    def _draw_gesture_image(self, frame, gesture):
+        img_gesture = self.valid_gestures[gesture]['img']
+        x, y = 50, 100
+        h, w = min(200, frame.shape[0] - y), min(200, frame.shape[1] - x)
+        if h > 0 and w > 0:
+            frame[y:y + h, x:x + w] = img_gesture[:h, :w]
+        return frame
+
     def draw_preview_and_save_button(self, frame):
         if self.preview_image is not None:
             h, w = self.preview_image.shape[:2]
             x, y = frame.shape[1] - w - 20, frame.shape[0] - h - 45
             frame[y:y + h, x:x + w] = self.preview_image
             if self.show_save_button and self.save_button_rect:
-                bx, by, bw, bh = self.save_button_rect
-                cv2.rectangle(frame, (bx, by), (bx + bw, by + bh), (0, 255, 255), -1)
-                text = "Save"
-                font = cv2.FONT_HERSHEY_SIMPLEX
-                font_scale = 0.6
-                thickness = 2
-                (text_w, text_h), baseline = cv2.getTextSize(text, font, font_scale, thickness)
-                text_x = bx + (bw - text_w) // 2
-                text_y = by + (bh + text_h) // 2
-                cv2.putText(frame, text, (text_x, text_y), font, font_scale, (0, 0, 0), thickness)
+                rect = self.save_button_rect
+                self.ui.draw(frame, 'save', rect, lambda canvas: draw_save_button(canvas, rect))
         return frame
 
-    def draw_transparent_lines(self, frame, points, color=(0, 0, 255), thickness=5, alpha=0.7):
-        overlay = frame.copy()
-        for i in range(1, len(points)):
-            cv2.line(overlay, points[i - 1], points[i], color, thickness)
-        return cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0)
+    def draw_transparent_lines(self, frame, points, color=(0, 0, 255), thickness=5, alpha=0.7, buffers=None):
+        # 只在笔迹覆盖的区域内做半透明混合，结果直接写回 frame
+        if len(points) < 2:
+            return frame
+        pts = np.asarray(points, dtype=np.int32).reshape(-1, 2)
+        pad = thickness + 1
+        x0, y0 = np.maximum(pts.min(axis=0) - pad, 0)
+        x1, y1 = pts.max(axis=0) + pad + 1
+        roi = frame[y0:min(y1, frame.shape[0]), x0:min(x1, frame.shape[1])]
+        if roi.size == 0:
+            return frame
+        if buffers is not None:
+            # 按整帧尺寸取缓冲区再切出 ROI 大小，笔迹包围框每帧变化也不会重新分配
+            overlay = buffers.acquire('stroke.overlay', frame.shape, frame.dtype)[:roi.shape[0], :roi.shape[1]]
+            np.copyto(overlay, roi)
+            buffers.count_copy(roi.nbytes)
+        else:
+            overlay = roi.copy()
+        cv2.polylines(overlay, [(pts - (x0, y0)).reshape(-1, 1, 2)], False, color, thickness)
+        cv2.addWeighted(overlay, alpha, roi, 1 - alpha, 0, dst=roi)
+        return frame
+
+    def _update_preview(self, raw_frame, buffers=None):
+        # 只在包围框变化或需要截图时重新裁剪、缩放
+        h, w = raw_frame.shape[:2]
+        x_min, y_min, x_max, y_max = self.stroke.clipped_bbox(w, h, margin=10)
+        self.best_frame.cancel()
+        self.latest_crop = raw_frame[y_min:y_max, x_min:x_max].copy()
+        if self.render and self.latest_crop.size != 0:
+            dst = buffers.acquire('gesture.preview', (200, 200, 3)) if buffers is not None else None
+            self.preview_image = cv2.resize(self.latest_crop, (200, 200), dst=dst)
+
+    def _apply_best_frame(self, buffers=None):
+        # 后台选出的最清晰一帧就绪后替换截图和预览
+        selected = self.best_frame.poll()
+        if selected is None or self.latest_crop is None:
+            return
+        crop, self.latest_crop_info["frame_age_ms"] = selected
+        self.latest_crop = crop
+        if self.render and crop.size != 0:
+            dst = buffers.acquire('gesture.preview', (200, 200, 3)) if buffers is not None else None
+            self.preview_image = cv2.resize(crop, (200, 200), dst=dst)
+
+    def _draw_stroke_box(self, frame):
+        if len(self.stroke) > 0:
+            x_min, y_min, x_max, y_max = self.stroke.clipped_bbox(frame.shape[1], frame.shape[0])
+            cv2.rectangle(frame, (x_min, y_min), (x_max, y_max), (0, 255, 0), 2)
 
     def handle_mouse_event(self, event, x, y, flags, param):
         if event == cv2.EVENT_LBUTTONDOWN and self.show_save_button and self.save_button_rect:
             bx, by, bw, bh = self.save_button_rect
             if bx <= x <= bx + bw and by <= y <= by + bh:
                 if self.latest_crop is not None:
-                    os.makedirs(self.save_directory, exist_ok=True)
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    filename = os.path.join(self.save_directory, f"hand_{timestamp}.png")
-                    cv2.imwrite(filename, self.latest_crop)
-                    print(f"图片已保存为 {filename}")
+                    # 后台选帧还没完成时由它的完成回调提交，界面线程不等待
+                    self.best_frame.save(self.writer, self.latest_crop, self.save_directory, self.latest_crop_info)
                     self.latest_crop = None
+                    self.latest_crop_info = {}
                     self.save_button_rect = None
-                    self.hover_counter = 0
-                    self.last_tip_positions = None
+                    self.dwell.reset()
                     self.show_save_button = False
                     self.preview_image = None
-                    self.draw_points.clear()
+                    self.stroke.clear()
                     self.preview_stopped = False
 
-    def recognize(self, frame, hands, raw_frame):
+    def recognize(self, frame, hands, raw_frame, buffers=None, now=None):
+        # now 为本帧时间（秒），回放和批处理时传入录制时间，默认取当前时间
+        if now is None:
+            now = time.perf_counter()
         current_gesture = None
+        self.captured_rect = None
+        self.motion_events = []
+        self._apply_best_frame(buffers)
 
         if hands:
-            hand = hands[0]
+            landmarks = np.asarray([hand["lmList"] for hand in hands], dtype=np.float64)
+
+            with self.profiler.span('recognize.features'):
+                fingers = finger_states(finger_bending_degrees(landmarks), self.bend_threshold)
+
+            with self.profiler.span('recognize.rules'):
+                hits = self.rule_index.hit_matrix(fingers, landmarks)
+
+            if self.nn_classifier is not None:
+                with self.profiler.span('recognize.nn'):
+                    labels, _ = self.nn_classifier.classify_batch(landmarks, [hand.get("type") for hand in hands])
+                codes = [self.hands_state.gesture_code(label) if label is not None else None for label in labels]
+                hits = np.pad(hits, ((0, 0), (0, len(self.hands_state.gesture_names) - hits.shape[1])))
+                for i, code in enumerate(codes):
+                    if code is not None:
+                        hits[i] = False
+                        hits[i, code] = True
+
+            with self.profiler.span('recognize.smoothing'):
+                # 按稳定 ID 跟踪所有手（锚点取全部关键点的中心），各自投票；交互由最早出现的那只手驱动
+                slots = self.hands_state.update(landmarks[:, 8, :2], now, anchors=landmarks[:, :, :2].mean(axis=1))
+                gestures = self.hands_state.vote(slots, hits, now)
+                ids = self.hands_state.ids_of(slots)
+                self.hand_gestures = {int(hand_id): g for hand_id, g in zip(ids, gestures) if hand_id >= 0}
+                order = self.hands_state.by_age(slots)
+                primary = int(order[0]) if len(order) else 0
+                current_gesture = gestures[primary]
+                self._switch_primary(int(ids[primary]), now)
+
+            hand = hands[primary]
             lmList = hand["lmList"]
 
-            bending = self.get_finger_bending_degree(lmList)
-            threshold = 30
-            fingers = [
-                int(bending[0] < threshold and bending[1] < threshold),
-                int(bending[2] < threshold and bending[3] < threshold),
-                int(bending[4] < threshold and bending[5] < threshold),
-                int(bending[6] < threshold and bending[7] < threshold),
-                int(bending[8] < threshold and bending[9] < threshold),
-            ]
-
-            detected_gestures = []
-            for name, data in self.valid_gestures.items():
-                config = data['config']
-                if 'fingers' in config and fingers == config['fingers']:
-                    detected_gestures.append(name)
-                elif 'check' in config and config['check'](lmList):
-                    detected_gestures.append(name)
-
-            self.gesture_history.append(detected_gestures)
-            if len(self.gesture_history) > self.history_length:
-                self.gesture_history.pop(0)
-
-            all_detected = [g for sublist in self.gesture_history for g in sublist]
-            if all_detected:
-                current_gesture = max(set(all_detected), key=all_detected.count)
-
-            if current_gesture and current_gesture in self.valid_gestures:
-                img_gesture = self.valid_gestures[current_gesture]['img']
-                x, y = 50, 100
-                frame[y:y + 200, x:x + 200] = img_gesture
+            if self.motion is not None:
+                with self.profiler.span('recognize.motion'):
+                    if current_gesture == 'one':
+                        self._add_motion_event(self.motion.update((lmList[8][0], lmList[8][1]), now))
+                    else:
+                        self._add_motion_event(self.motion.flush())
+
+            draw_started = self.profiler.now()
+
+            if self.render and current_gesture and current_gesture in self.valid_gestures:
+                self.ui.draw(frame, f'gesture.{current_gesture}', None,
+                             lambda canvas: self._draw_gesture_image(canvas, current_gesture))
 
             if self.preview_stopped and current_gesture != 'ok':
                 pass
@@ -171,79 +273,80 @@ class HandGestureRecognizer:
                     offset_x, offset_y = 20, 20
                     tip_pos_2d = (int(lmList[8][0]) - offset_x, int(lmList[8][1]) - offset_y)
 
-                    moving = True
-                    if self.last_tip_positions is not None:
-                        dist = math.hypot(tip_pos_2d[0] - self.last_tip_positions[0],
-                                          tip_pos_2d[1] - self.last_tip_positions[1])
-                        moving = dist >= 10
-                    else:
-                        moving = False
-
-                    self._draw_progress_ring(frame, tip_pos_2d)
+                    if self.render:
+                        self._draw_progress_ring(frame, tip_pos_2d)
 
-                    if not moving:
-                        self.hover_counter += 1
-                    else:
-                        self.hover_counter = 0
+                    if self.dwell.update(tip_pos_2d, now):
                         self.preview_stopped = False
 
-                    if self.hover_counter >= self.hover_frames_threshold:
-                        self.draw_points.clear()
+                    if self.dwell.done:
+                        if len(self.stroke) > 0:
+                            self.captured_rect = self.stroke.clipped_bbox(
+                                raw_frame.shape[1], raw_frame.shape[0], margin=10)
+                            self._update_preview(raw_frame, buffers)
+                            self.latest_crop_info = {
+                                "gesture": current_gesture,
+                                "rect": list(self.captured_rect),
+                                "captured_at": datetime.now().isoformat(timespec="milliseconds"),
+                                "frame_age_ms": 0.0,
+                            }
+                            self.best_frame.start(self.captured_rect, now)
+                        self.stroke.clear()
                         self.preview_stopped = True
                         self.show_save_button = True
                         h_frame, w_frame = frame.shape[:2]
                         self.save_button_rect = (w_frame - 220, h_frame - 35, 200, 40)
-                        self.hover_counter = 0
+                        self.dwell.restart(now)
 
                     if not self.preview_stopped:
-                        self.draw_points.append(tip_pos_2d)
-                        if len(self.draw_points) > 0:
-                            x_coords = [p[0] for p in self.draw_points]
-                            y_coords = [p[1] for p in self.draw_points]
-                            x_min, x_max = max(min(x_coords), 0), min(max(x_coords), frame.shape[1] - 1)
-                            y_min, y_max = max(min(y_coords), 0), min(max(y_coords), frame.shape[0] - 1)
-
-                            margin = 10
-                            x_min = max(x_min - margin, 0)
-                            y_min = max(y_min - margin, 0)
-                            x_max = min(x_max + margin, frame.shape[1] - 1)
-                            y_max = min(y_max + margin, frame.shape[0] - 1)
+                        if self.stroke.append(tip_pos_2d) and self.render:
+                            self._update_preview(raw_frame, buffers)
 
-                            self.latest_crop = raw_frame[y_min:y_max, x_min:x_max].copy()
-
-                            if self.latest_crop.size != 0:
-                                self.preview_image = cv2.resize(self.latest_crop, (200, 200))
-
-                    self.last_tip_positions = tip_pos_2d
-
-                    frame = self.draw_transparent_lines(frame, self.draw_points)
-
-                    if len(self.draw_points) > 0:
-                        x_coords = [p[0] for p in self.draw_points]
-                        y_coords = [p[1] for p in self.draw_points]
-                        x_min, x_max = max(min(x_coords), 0), min(max(x_coords), frame.shape[1] - 1)
-                        y_min, y_max = max(min(y_coords), 0), min(max(y_coords), frame.shape[0] - 1)
-                        cv2.rectangle(frame, (x_min, y_min), (x_max, y_max), (0, 255, 0), 2)
+                    if self.render:
+                        frame = self.stroke.draw(frame, (0, 0, 255), 5, alpha=0.7, buffers=buffers)
+                        self._draw_stroke_box(frame)
 
                 elif current_gesture == 'ok':
-                    self.hover_counter = 0
-                    self.last_tip_positions = None
+                    self.dwell.reset()
                     self.show_save_button = False
                     self.preview_image = None
-                    self.draw_points.clear()
+                    self.best_frame.cancel()
+                    self.stroke.clear()
                     self.preview_stopped = False
 
                 else:
-                    self.hover_counter = 0
-                    self.last_tip_positions = None
-                    frame = self.draw_transparent_lines(frame, self.draw_points)
-
-                    if len(self.draw_points) > 0:
-                        x_coords = [p[0] for p in self.draw_points]
-                        y_coords = [p[1] for p in self.draw_points]
-                        x_min, x_max = max(min(x_coords), 0), min(max(x_coords), frame.shape[1] - 1)
-                        y_min, y_max = max(min(y_coords), 0), min(max(y_coords), frame.shape[0] - 1)
-                        cv2.rectangle(frame, (x_min, y_min), (x_max, y_max), (0, 255, 0), 2)
-
-        frame = self.draw_preview_and_save_button(frame)
+                    self.dwell.reset()
+                    if self.render:
+                        frame = self.stroke.draw(frame, (0, 0, 255), 5, alpha=0.7, buffers=buffers)
+                        self._draw_stroke_box(frame)
+            self.profiler.record_since('recognize.drawing', draw_started)
+        else:
+            self.hand_gestures = {}
+            if self.motion is not None:
+                self._add_motion_event(self.motion.flush())
+
+        if self.render:
+            with self.profiler.span('recognize.preview'):
+                frame = self.draw_preview_and_save_button(frame)
+            if self.last_motion is not None and now - self.last_motion["end"] <= self.motion_display_seconds:
+                motion = self.last_motion["gesture"]
+                self.ui.draw(frame, f'motion_text.{motion}', None, lambda canvas: cv2.putText(
+                    canvas, f'Motion: {motion}', (30, 100), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 128, 0), 2))
         return frame, current_gesture
+
+    def _switch_primary(self, hand_id, now):
+        # 驱动交互的手换了（原来的手离开画面）：停留计时、动作轨迹和未截图的笔迹都属于原来那只手，清空
+        if hand_id == self.primary_id:
+            return
+        if self.primary_id is not None:
+            self.dwell.reset()
+            if self.motion is not None:
+                self._add_motion_event(self.motion.flush())
+            if not self.preview_stopped:
+                self.stroke.clear()
+        self.primary_id = hand_id
+
+    def _add_motion_event(self, event):
+        if event is not None:
+            self.motion_events.append(event)
+            self.last_motion = event
@@ -1,18 +1,27 @@
 import cv2
 import math
-import os
+import numpy as np
+import time
 from datetime import datetime
+from utils.capture_writer import default_writer
+from utils.frame_history import BestFrameCapture, crop_rect
+from utils.instrumentation import NULL_PROFILER
+from utils.multi_hand_state import MultiHandState
+from utils.ui_compositor import UICompositor, draw_save_button
 
 class HandsCapture:
-    def __init__(self, min_distance=30, hover_frames_threshold=100):
+    # hover_seconds / move_speed：两指尖速度低于 move_speed（像素/秒）持续 hover_seconds 秒后截图
+    # 每只手按稳定 ID 各自计时，框选用的是最早出现的两只手，手的检测顺序变化不会让状态串到另一只手上
+    def __init__(self, min_distance=30, hover_seconds=100 / 30, move_speed=300.0):
         self.min_distance = min_distance
-        self.hover_frames_threshold = hover_frames_threshold
-        self.tip_hover_pos_dict = {}
-        self.tip_hover_counter = 0
+        self.hands_state = MultiHandState(dwell_seconds=hover_seconds, max_speed=move_speed)
+        # 本帧参与框选的两只手的指尖（按 ID 从旧到新）
+        self.pair_tips = []
         self.capture_done = False
 
         self.preview_image = None
         self.latest_crop = None  # 原图截图用于保存
+        self.latest_crop_info = {}  # 保存时写入同名 .json
         self.show_save_button = False
         self.save_button_rect = None
         self.last_captured_rect = None
@@ -20,6 +29,18 @@ class HandsCapture:
         self.capture_padding = -10
 
         self.save_directory = "captures"
+        self.writer = default_writer
+
+        # render=False 时不做任何绘制和预览缩放（无界面批处理）
+        self.render = True
+        # 本帧停留完成时的截图区域 (x_min, y_min, x_max, y_max)，其余帧为 None
+        self.captured_rect = None
+        # 内部计时区间：capture.progress / capture.drawing
+        self.profiler = NULL_PROFILER
+        # 预渲染的 Save 按钮，状态不变时每帧只做一次 ROI 复制
+        self.ui = UICompositor()
+        # 停留完成时先用当前帧截图，后台从最近画面中选出最清晰的一帧后再替换（见 BestFrameCapture）
+        self.best_frame = BestFrameCapture()
 
     def draw_rectangle_around_fingertips(self, frame, index_tips):
         if len(index_tips) < 2:
@@ -38,41 +59,37 @@ class HandsCapture:
         cv2.rectangle(frame, (x_min, y_min), (x_max, y_max), (0, 255, 0), 2)
         return frame
 
-    def update_and_draw_progress(self, frame, index_tips, raw_frame):
-        if len(index_tips) < 2:
+    def update_and_draw_progress(self, frame, index_tips, raw_frame, buffers=None, now=None, anchors=None):
+        # index_tips 为所有手的指尖（顺序任意）；anchors 为匹配身份用的点，默认即指尖
+        if now is None:
+            now = time.perf_counter()
+        slots = self.hands_state.update(index_tips, now, anchors)
+        pair = self.hands_state.by_age(slots)[:2]
+        self.pair_tips = [index_tips[i] for i in pair]
+        if len(pair) < 2:
             return frame, None, False
+        pair_slots = slots[pair]
+        index_tips = self.pair_tips
 
-        moving = False
-        for i, tip in enumerate(index_tips[:2]):
-            x, y = tip[:2]
-            if i not in self.tip_hover_pos_dict:
-                self.tip_hover_pos_dict[i] = (x, y)
-            else:
-                dist = math.hypot(x - self.tip_hover_pos_dict[i][0], y - self.tip_hover_pos_dict[i][1])
-                if dist >= 10:
-                    moving = True
-                self.tip_hover_pos_dict[i] = (x, y)
-
-        if moving:
-            self.tip_hover_counter = 0
+        if self.hands_state.moving[pair_slots].any():
             self.capture_done = False
-        elif not self.capture_done:
-            self.tip_hover_counter += 1
 
-        progress_ratio = min(self.tip_hover_counter / self.hover_frames_threshold, 1.0)
+        # 两只手都停住才算停留：取两者中较短的停留时间
+        progress_ratio = float(self.hands_state.progress(pair_slots).min())
 
         # 绘制进度环
-        radius = 20
-        thickness = 5
-        for tip in index_tips[:2]:
-            center = (int(tip[0]), int(tip[1]))
-            cv2.circle(frame, center, radius, (200, 200, 200), thickness)
-            angle = int(360 * progress_ratio)
-            cv2.ellipse(frame, center, (radius, radius), -90, 0, angle, (0, 255, 0), thickness)
+        if self.render:
+            radius = 20
+            thickness = 5
+            for tip in index_tips:
+                center = (int(tip[0]), int(tip[1]))
+                cv2.circle(frame, center, radius, (200, 200, 200), thickness)
+                angle = int(360 * progress_ratio)
+                cv2.ellipse(frame, center, (radius, radius), -90, 0, angle, (0, 255, 0), thickness)
 
         progress_full = False
         rect_coords = None
-        if progress_ratio >= 1.0 and not self.capture_done:
+        if self.hands_state.done(pair_slots).all() and not self.capture_done:
             pt1 = (int(index_tips[0][0]), int(index_tips[0][1]))
             pt2 = (int(index_tips[1][0]), int(index_tips[1][1]))
 
@@ -81,16 +98,26 @@ class HandsCapture:
             x_max = min(raw_frame.shape[1], max(pt1[0], pt2[0]) + self.capture_padding)
             y_max = min(raw_frame.shape[0], max(pt1[1], pt2[1]) + self.capture_padding)
 
-            # 原始尺寸截图
-            self.latest_crop = raw_frame[y_min:y_max, x_min:x_max].copy()
+            # 原始尺寸截图；有画面缓冲时在后台从停留窗口内挑截图区域最清晰的一帧，就绪后替换
+            rect = (x_min, y_min, x_max, y_max)
+            self.latest_crop = crop_rect(raw_frame, rect)
+            self.best_frame.start(rect, now)
 
             # 创建预览图（缩略图）
-            self.preview_image = cv2.resize(self.latest_crop, (200, 200))
+            if self.render:
+                dst = buffers.acquire('capture.preview', (200, 200, 3)) if buffers is not None else None
+                self.preview_image = cv2.resize(self.latest_crop, (200, 200), dst=dst)
 
             self.capture_done = True
             self.show_save_button = True
             self.save_button_rect = (frame.shape[1] - 220, frame.shape[0] - 35, 200, 40)
             self.last_captured_rect = (x_min, y_min, x_max, y_max)
+            self.latest_crop_info = {
+                "gesture": "two_hands",
+                "rect": list(self.last_captured_rect),
+                "captured_at": datetime.now().isoformat(timespec="milliseconds"),
+                "frame_age_ms": 0.0,
+            }
             progress_full = True
             rect_coords = self.last_captured_rect
 
@@ -102,59 +129,60 @@ class HandsCapture:
             x, y = frame.shape[1] - w - 20, frame.shape[0] - h - 45
             frame[y:y + h, x:x + w] = self.preview_image
             if self.show_save_button and self.save_button_rect:
-                bx, by, bw, bh = self.save_button_rect
-                cv2.rectangle(frame, (bx, by), (bx + bw, by + bh), (0, 255, 255), -1)
-                text = "Save"
-                font = cv2.FONT_HERSHEY_SIMPLEX
-                font_scale = 0.6
-                thickness = 2
-
-                (text_w, text_h), baseline = cv2.getTextSize(text, font, font_scale, thickness)
-
-                # 框的位置和大小
-                bx, by, bw, bh = self.save_button_rect
-
-                # 计算文字左下角坐标，让文字水平垂直居中
-                text_x = bx + (bw - text_w) // 2
-                text_y = by + (bh + text_h) // 2
-
-                cv2.putText(frame, text, (text_x, text_y), font, font_scale, (0, 0, 0), thickness)
-
+                rect = self.save_button_rect
+                self.ui.draw(frame, 'save', rect, lambda canvas: draw_save_button(canvas, rect))
         return frame
 
     def reset_progress(self):
-        self.tip_hover_pos_dict = {}
-        self.tip_hover_counter = 0
+        self.hands_state.reset()
         self.capture_done = False
         self.show_save_button = False
         self.preview_image = None
         self.latest_crop = None
+        self.latest_crop_info = {}
+        self.best_frame.cancel()
         self.save_button_rect = None
         self.last_captured_rect = None
 
+    def _apply_best_frame(self, buffers=None):
+        # 后台选出的最清晰一帧就绪后替换截图和预览
+        selected = self.best_frame.poll()
+        if selected is None or self.latest_crop is None:
+            return
+        crop, self.latest_crop_info["frame_age_ms"] = selected
+        self.latest_crop = crop
+        if self.render and crop.size != 0:
+            dst = buffers.acquire('capture.preview', (200, 200, 3)) if buffers is not None else None
+            self.preview_image = cv2.resize(crop, (200, 200), dst=dst)
+
     def handle_mouse_event(self, event, x, y, flags, param):
         if event == cv2.EVENT_LBUTTONDOWN and self.show_save_button and self.save_button_rect:
             bx, by, bw, bh = self.save_button_rect
             if bx <= x <= bx + bw and by <= y <= by + bh:
                 if self.latest_crop is not None:
-                    os.makedirs(self.save_directory, exist_ok=True)
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    filename = os.path.join(self.save_directory, f"hand_{timestamp}.png")
-                    cv2.imwrite(filename, self.latest_crop)
-                    print(f"图片已保存为 {filename}")
+                    # 后台选帧还没完成时由它的完成回调提交，界面线程不等待
+                    self.best_frame.save(self.writer, self.latest_crop, self.save_directory, self.latest_crop_info)
                     self.show_save_button = False
                     self.capture_done = False
                     self.preview_image = None
                     self.latest_crop = None
+                    self.latest_crop_info = {}
                     self.save_button_rect = None
 
-    def process_frame(self, frame, hands, raw_frame):
-        index_tips = []
-        for hand in hands:
-            if "lmList" in hand and len(hand["lmList"]) > 8:
-                index_tips.append(hand["lmList"][8])
-
-        frame = self.draw_rectangle_around_fingertips(frame, index_tips)
-        frame, rect_coords, progress_full = self.update_and_draw_progress(frame, index_tips, raw_frame)
-        frame = self.draw_preview_and_save_button(frame)
+    def process_frame(self, frame, hands, raw_frame, buffers=None, now=None):
+        self._apply_best_frame(buffers)
+        hands = [hand for hand in hands if "lmList" in hand and len(hand["lmList"]) > 8]
+        index_tips = [hand["lmList"][8] for hand in hands]
+        anchors = None
+        if hands and all(len(hand["lmList"]) == 21 for hand in hands):
+            anchors = np.asarray([hand["lmList"] for hand in hands], dtype=np.float64)[:, :, :2].mean(axis=1)
+
+        with self.profiler.span('capture.progress'):
+            frame, rect_coords, progress_full = self.update_and_draw_progress(
+                frame, index_tips, raw_frame, buffers, now, anchors)
+        self.captured_rect = rect_coords
+        if self.render:
+            with self.profiler.span('capture.drawing'):
+                frame = self.draw_rectangle_around_fingertips(frame, self.pair_tips)
+                frame = self.draw_preview_and_save_button(frame)
         return frame
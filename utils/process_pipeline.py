@@ -0,0 +1,298 @@
+import multiprocessing as mp
+import queue
+import time
+import cv2
+import numpy as np
+from multiprocessing import shared_memory
+from utils.detection_governor import DetectionGovernor
+from utils.detector_pool import create_hand_detector
+from utils.frame_pipeline import PipelineStats
+from utils.landmark_recording import array_to_hands, hands_to_array
+from utils.roi_tracker import find_hands_raw
+
+
+class SharedFrameRing:
+    # 一块共享内存里预分配 slots 个同尺寸的帧槽位，各进程按槽位下标直接读写，帧数据不经过队列、不做 pickle
+    # 创建者负责 unlink；其他进程用 attach(spec) 按名字挂载
+    def __init__(self, slots, shape, dtype=np.uint8, name=None):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.owner = name is None
+        self._shm = shared_memory.SharedMemory(name=name, create=self.owner, size=frame_bytes * slots)
+        self._frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=self._shm.buf)
+
+    @property
+    def spec(self):
+        # 可以通过队列传给其他进程的描述
+        return self._shm.name, self.slots, self.shape, self.dtype.str
+
+    @classmethod
+    def attach(cls, spec):
+        name, slots, shape, dtype = spec
+        return cls(slots, shape, dtype, name=name)
+
+    def view(self, slot):
+        return self._frames[slot]
+
+    def close(self):
+        # 先释放 ndarray 对共享内存的引用，否则 close 会报 BufferError
+        self._frames = None
+        self._shm.close()
+
+    def unlink(self):
+        if self.owner:
+            self._shm.unlink()
+
+
+def open_capture(source):
+    cap = cv2.VideoCapture(source)
+    cap.set(3, 1280)
+    cap.set(4, 768)
+    return cap
+
+
+def build_detector(max_hands, detection_con=0.8, model_complexity=1, detect_every=1, detect_budget=None):
+    # 在检测进程内创建检测器，包装方式与 main.open_camera 相同
+    detector = create_hand_detector(maxHands=max_hands, detectionCon=detection_con, modelComplexity=model_complexity)
+    if detect_every > 1 or detect_budget:
+        detector = DetectionGovernor(detector, every=detect_every, budget_ms=detect_budget)
+    return detector
+
+
+def _capture_worker(source, capture_factory, flip, drop_frames, info_queue, ring_queue, free_queue, detect_queue,
+                    stop, counters):
+    # 采集进程：读帧 -> 取空闲槽位 -> 翻转直接写入槽位 -> 只把槽位下标交给检测进程
+    cap = capture_factory(source)
+    ret, frame = cap.read() if cap.isOpened() else (False, None)
+    if not ret:
+        print("无法打开摄像头" if not cap.isOpened() else "无法获取图像")
+        info_queue.put(None)
+        cap.release()
+        return
+    info_queue.put((frame.shape, frame.dtype.str))
+    spec = ring_queue.get()
+    if spec is None:
+        cap.release()
+        return
+    ring = SharedFrameRing.attach(spec)
+    detect_queue.put(("ring", spec))
+    index = 0
+    try:
+        while not stop.is_set():
+            if index:
+                ret, frame = cap.read(frame)
+                if not ret:
+                    print("无法获取图像")
+                    break
+            captured_at = time.perf_counter()
+            counters["captured"].value += 1
+            index += 1
+            slot = None
+            while slot is None and not stop.is_set():
+                try:
+                    # 实时源没有空闲槽位时直接丢弃这一帧（背压），录像文件则等待
+                    slot = free_queue.get_nowait() if drop_frames else free_queue.get(timeout=0.1)
+                except queue.Empty:
+                    if drop_frames:
+                        break
+            if slot is None:
+                counters["capture_dropped"].value += 1
+                continue
+            if frame.shape != ring.shape:
+                frame = cv2.resize(frame, ring.shape[1::-1])
+            dst = ring.view(slot)
+            if flip is None:
+                dst[...] = frame
+            else:
+                cv2.flip(frame, flip, dst=dst)
+            detect_queue.put(("frame", slot, index - 1, captured_at))
+    finally:
+        detect_queue.put(None)
+        ring.close()
+        cap.release()
+
+
+def _detect_worker(detector_factory, detector_options, max_hands, detect_queue, result_queue, control_queue, stop,
+                   counters):
+    # 检测进程：按槽位下标读帧检测，结果以关键点数组（hands_to_array）发给渲染进程；不在帧上绘制
+    ring = None
+    detectors = {}
+    try:
+        while True:
+            try:
+                message = detect_queue.get(timeout=0.1)
+            except queue.Empty:
+                if stop.is_set():
+                    break
+                continue
+            if message is None:
+                break
+            if message[0] == "ring":
+                ring = SharedFrameRing.attach(message[1])
+                result_queue.put(message)
+                continue
+            _, slot, index, captured_at = message
+            # 渲染进程切换模式时发来新的 maxHands
+            while True:
+                try:
+                    max_hands = control_queue.get_nowait()
+                except queue.Empty:
+                    break
+            detector = detectors.get(max_hands)
+            if detector is None:
+                try:
+                    detector = detectors[max_hands] = detector_factory(max_hands, **detector_options)
+                except Exception as e:
+                    print(f"⚠️ 检测器创建失败：{e}")
+                    stop.set()
+                    break
+            img = ring.view(slot)
+            if isinstance(detector, DetectionGovernor):
+                hands, _ = detector.findHands(img, draw=False, now=captured_at)
+            else:
+                hands = find_hands_raw(detector, img)
+            landmarks, count, types = hands_to_array(hands, max_hands)
+            counters["detected"].value += 1
+            result_queue.put(("frame", slot, index, captured_at, landmarks, count, types))
+    finally:
+        result_queue.put(None)
+        if ring is not None:
+            ring.close()
+
+
+class ProcessPacket:
+    __slots__ = ("slot", "index", "captured_at", "frame", "hands", "released")
+
+    def __init__(self, slot, index, captured_at, frame, hands):
+        self.slot = slot
+        self.index = index
+        self.captured_at = captured_at
+        self.frame = frame
+        self.hands = hands
+        self.released = False
+
+
+class ProcessPipeline:
+    # 采集进程 -> 检测进程 -> 渲染（调用方所在的主进程，cv2.imshow 需要在主进程）
+    #   帧放在 SharedFrameRing 的预分配槽位里，队列中只传槽位下标和关键点数组
+    #   背压：空闲槽位队列就是令牌，所有槽位都在途时实时源丢弃新帧（drop_frames=False 时采集等待）
+    #   packet.frame 是槽位的只读视图，只在处理该帧期间有效；取下一帧时自动归还槽位（也可提前 release）
+    #   detector_factory(max_hands, **detector_options) 与 capture_factory(source) 会在子进程中调用，需可 pickle
+    def __init__(self, source, max_hands=1, slots=4, flip=None, drop_frames=True, detector_factory=build_detector,
+                 detector_options=None, capture_factory=open_capture, start_timeout=30.0):
+        self.source = source
+        self.max_hands = max_hands
+        self.slots = slots
+        self.flip = flip
+        self.drop_frames = drop_frames
+        self.detector_factory = detector_factory
+        self.detector_options = detector_options or {}
+        self.capture_factory = capture_factory
+        self.start_timeout = start_timeout
+        self.stats = PipelineStats()
+        self.ring = None
+        self._processes = []
+
+    def start(self):
+        # spawn：子进程不继承主进程里已加载的 MediaPipe/OpenCV 线程状态
+        ctx = mp.get_context("spawn")
+        self._stop = ctx.Event()
+        self._counters = {name: ctx.RawValue('q', 0) for name in ("captured", "capture_dropped", "detected")}
+        info_queue, self._ring_queue = ctx.Queue(), ctx.Queue()
+        self._free_queue = ctx.Queue()
+        self._detect_queue = ctx.Queue()
+        self._result_queue = ctx.Queue()
+        self._control_queue = ctx.Queue()
+        self._processes = [
+            ctx.Process(target=_capture_worker, name="capture", daemon=True, args=(
+                self.source, self.capture_factory, self.flip, self.drop_frames, info_queue, self._ring_queue,
+                self._free_queue, self._detect_queue, self._stop, self._counters)),
+            ctx.Process(target=_detect_worker, name="detect", daemon=True, args=(
+                self.detector_factory, self.detector_options, self.max_hands, self._detect_queue,
+                self._result_queue, self._control_queue, self._stop, self._counters)),
+        ]
+        for process in self._processes:
+            process.start()
+
+        # 采集进程读到第一帧后才知道画面尺寸，据此分配共享内存
+        try:
+            info = info_queue.get(timeout=self.start_timeout)
+        except queue.Empty:
+            info = None
+        if info is None:
+            self._ring_queue.put(None)
+            self.stop()
+            return self
+        shape, dtype = info
+        self.ring = SharedFrameRing(self.slots, shape, dtype)
+        for slot in range(self.slots):
+            self._free_queue.put(slot)
+        self._ring_queue.put(self.ring.spec)
+        return self
+
+    def set_max_hands(self, max_hands):
+        if max_hands != self.max_hands:
+            self.max_hands = max_hands
+            self._control_queue.put(max_hands)
+
+    def release(self, packet):
+        if not packet.released:
+            packet.released = True
+            self._free_queue.put(packet.slot)
+
+    def _sync_stats(self):
+        self.stats.captured = self._counters["captured"].value
+        self.stats.capture_dropped = self._counters["capture_dropped"].value
+        self.stats.detected = self._counters["detected"].value
+
+    def results(self):
+        if self.ring is None:
+            return
+        packet = None
+        while True:
+            try:
+                message = self._result_queue.get(timeout=0.5)
+            except queue.Empty:
+                if not any(process.is_alive() for process in self._processes):
+                    break
+                continue
+            if message is None:
+                break
+            if message[0] == "ring":
+                continue
+            _, slot, index, captured_at, landmarks, count, types = message
+            frame = self.ring.view(slot)
+            frame.flags.writeable = False
+            packet = ProcessPacket(slot, index, captured_at, frame, array_to_hands(landmarks, count, types))
+            self._sync_stats()
+            yield packet
+            self.release(packet)
+        self._sync_stats()
+
+    def stop(self):
+        if not self._processes:
+            return
+        self._stop.set()
+        self._ring_queue.put(None)
+        deadline = time.perf_counter() + 2.0
+        for process in self._processes:
+            # 清空队列，避免子进程因队列数据未被读走而无法退出
+            while process.is_alive() and time.perf_counter() < deadline:
+                for pending in (self._detect_queue, self._result_queue):
+                    try:
+                        while True:
+                            pending.get_nowait()
+                    except queue.Empty:
+                        pass
+                process.join(timeout=0.05)
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout=1.0)
+        self._processes = []
+        self._sync_stats()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
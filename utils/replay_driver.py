@@ -0,0 +1,52 @@
+import time
+import cv2
+import numpy as np
+from utils.batch_runner import HeadlessSession
+from utils.frame_buffers import FrameBufferPool
+
+
+def replay(recording, mode="option1", realtime=False, render=False, frames_source=None, motion=False):
+    # 将录制的 hands 逐帧送入识别器，依次产出 (画面, 结果行)
+    #   realtime=True 时按录制时间戳节奏回放，否则全速回放
+    #   frames_source 为与录制同步的视频文件；不提供时使用纯黑合成画面
+    session = HeadlessSession(mode, render, motion)
+    width, height = recording.frame_size
+    synthetic = np.zeros((height, width, 3), dtype=np.uint8)
+    buffers = FrameBufferPool()
+    cap = cv2.VideoCapture(frames_source) if frames_source else None
+    frame = None
+    started = time.perf_counter()
+    try:
+        for i in range(len(recording)):
+            timestamp = float(recording.timestamps[i])
+            if realtime:
+                delay = started + timestamp - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            raw_frame = synthetic
+            if cap is not None:
+                ret, frame = cap.read(frame)
+                if not ret:
+                    break
+                raw_frame = frame
+
+            buffers.begin_frame()
+            ui_frame = buffers.copy("ui", raw_frame) if render else None
+            ui_frame, row = session.step(i, timestamp * 1000.0, recording.hands_at(i), raw_frame, ui_frame)
+            yield ui_frame, row
+    finally:
+        if cap is not None:
+            cap.release()
+
+
+def measure_replay(recording, mode="option1", render=False, repeat=1):
+    # 全速回放并统计吞吐
+    frames = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for _ in replay(recording, mode=mode, render=render):
+            frames += 1
+    elapsed = time.perf_counter() - started
+    return {"frames": frames, "seconds": elapsed, "fps": frames / elapsed if elapsed else 0.0,
+            "ms_per_frame": elapsed * 1000.0 / frames if frames else 0.0}
@@ -0,0 +1,50 @@
+import cv2
+
+# MediaPipe 手部 21 点连接关系
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (17, 18), (18, 19), (19, 20),
+    (0, 17),
+)
+
+
+def make_hand(lmList, hand_type):
+    # 与 cvzone HandDetector.findHands 返回的字典结构一致
+    x_list = [p[0] for p in lmList]
+    y_list = [p[1] for p in lmList]
+    x_min, y_min = min(x_list), min(y_list)
+    bbox = (x_min, y_min, max(x_list) - x_min, max(y_list) - y_min)
+    return {
+        "lmList": lmList,
+        "bbox": bbox,
+        "center": (bbox[0] + bbox[2] // 2, bbox[1] + bbox[3] // 2),
+        "type": hand_type,
+    }
+
+
+def draw_hands(img, hands):
+    # 仿照 cvzone/MediaPipe 的默认绘制样式
+    for hand in hands:
+        pts = [(int(p[0]), int(p[1])) for p in hand["lmList"]]
+        for a, b in HAND_CONNECTIONS:
+            cv2.line(img, pts[a], pts[b], (224, 224, 224), 2)
+        for pt in pts:
+            cv2.circle(img, pt, 3, (224, 224, 224), -1)
+            cv2.circle(img, pt, 2, (0, 0, 255), -1)
+        x, y, w, h = hand["bbox"]
+        cv2.rectangle(img, (x - 20, y - 20), (x + w + 20, y + h + 20), (255, 0, 255), 2)
+        if hand.get("type"):
+            cv2.putText(img, hand["type"], (x - 30, y - 30), cv2.FONT_HERSHEY_PLAIN, 2, (255, 0, 255), 2)
+    return img
+
+
+def find_hands_raw(detector, img, flipType=True):
+    # 不绘制的检测；兼容 cvzone 不同版本在 draw=False 时只返回 allHands 的情况
+    result = detector.findHands(img, draw=False, flipType=flipType)
+    if isinstance(result, tuple):
+        return result[0]
+    return result
+
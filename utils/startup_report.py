@@ -0,0 +1,26 @@
+import time
+
+
+class StartupReport:
+    # 记录启动各阶段耗时，直到第一帧处理完成
+    def __init__(self, label="", started_at=None):
+        self.label = label
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter()))
+
+    def summary(self):
+        rows = []
+        last = self.started_at
+        for name, t in self.marks:
+            rows.append((name, (t - last) * 1000, (t - self.started_at) * 1000))
+            last = t
+        return rows
+
+    def print(self):
+        title = f"启动耗时报告 {self.label}".strip()
+        print(title)
+        for name, step_ms, total_ms in self.summary():
+            print(f"  {name:<16} +{step_ms:8.1f} ms  累计 {total_ms:8.1f} ms")
@@ -0,0 +1,204 @@
+import os
+import threading
+import time
+from collections import deque
+import cv2
+from utils.batch_runner import HeadlessSession, TimelineWriter, video_fps
+from utils.detector_pool import create_hand_detector
+from utils.frame_pipeline import FramePacket, PipelineStats
+from utils.roi_tracker import find_hands_raw
+
+
+def parse_source(source):
+    # "0" -> 摄像头编号，其余原样作为文件路径或 RTSP 地址
+    return int(source) if isinstance(source, str) and source.isdigit() else source
+
+
+class StreamSource:
+    # 一路输入：独立的采集线程、待处理帧队列和识别状态
+    #   pace：按视频自身帧率读取本地文件，模拟实时摄像头（此时也会丢帧）
+    #   drop：队列满时丢弃最旧的帧；为 False 时采集线程等待，不丢帧
+    def __init__(self, name, source, mode="option1", render=False, queue_size=2, pace=False, drop=None,
+                 flip=None, loop=False, timeline=None, motion=False):
+        self.name = name
+        self.source = parse_source(source)
+        self.is_file = isinstance(self.source, str) and os.path.isfile(self.source)
+        # 本地文件按帧号和自身帧率计时（与 batch_runner.iter_frames 相同），时间轴可复现；实时来源用采集时刻
+        self.fps = video_fps(self.source) if self.is_file else None
+        self.pace = pace and self.is_file
+        self.drop = (not self.is_file or self.pace) if drop is None else drop
+        self.queue_size = queue_size
+        self.flip = flip
+        self.loop = loop and self.is_file
+        self.session = HeadlessSession(mode, render, motion)
+        self.stats = PipelineStats()
+        self.pending = deque()
+        self.busy = False
+        self.finished = False
+        self.writer = TimelineWriter(timeline, "csv" if timeline.endswith(".csv") else "jsonl") if timeline else None
+        # 本路专用的检测器（按配置缓存）：视频模式的 MediaPipe 会沿用上一帧的手部区域做跟踪，
+        # 不能让多路画面交替输入同一个检测器
+        self.detectors = {}
+
+    @property
+    def detector_config(self):
+        return {"maxHands": self.session.max_hands, "detectionCon": 0.8}
+
+
+class StreamServer:
+    # 多路输入共享一组检测线程：
+    #   工作线程按轮询顺序从各路取最新帧，用该路自己的 HandDetector 检测（各路的视频模式跟踪状态互不干扰）
+    #   同一路同一时刻只交给一个线程，所以每个检测器不会被并发调用，识别状态也按帧序更新；
+    #   OpenCV/MediaPipe 计算时释放 GIL，吞吐随线程数增长
+    #   MediaPipe Hands 每次只接受一张图，没有批量推理接口，各路按帧分别检测
+    def __init__(self, streams, workers=2, detector_factory=create_hand_detector):
+        self.streams = list(streams)
+        self.workers = workers
+        self.detector_factory = detector_factory
+        self._cond = threading.Condition()
+        self._next = 0
+        self._stop = threading.Event()
+        self._threads = []
+        self.started_at = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        for stream in self.streams:
+            thread = threading.Thread(target=self._capture_loop, args=(stream,), name=f"capture-{stream.name}",
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"detect-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _offer(self, stream, packet):
+        with self._cond:
+            if stream.drop:
+                while len(stream.pending) >= stream.queue_size:
+                    stream.pending.popleft()
+                    stream.stats.capture_dropped += 1
+            else:
+                while len(stream.pending) >= stream.queue_size and not self._stop.is_set():
+                    self._cond.wait()
+            stream.pending.append(packet)
+            self._cond.notify_all()
+
+    def _capture_loop(self, stream):
+        interval = 1.0 / stream.fps if stream.pace else 0.0
+        cap = cv2.VideoCapture(stream.source)
+        if not cap.isOpened():
+            print(f"⚠️ 无法打开 {stream.source}")
+        index = 0
+        next_due = time.perf_counter()
+        try:
+            while cap.isOpened() and not self._stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    if stream.loop and index:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    break
+                if interval:
+                    next_due += interval
+                    delay = next_due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                if stream.flip is not None:
+                    frame = cv2.flip(frame, stream.flip)
+                stream.stats.captured += 1
+                self._offer(stream, FramePacket(index, time.perf_counter(), frame))
+                index += 1
+        finally:
+            cap.release()
+            with self._cond:
+                stream.finished = True
+                self._cond.notify_all()
+
+    def _take(self):
+        # 从上次取帧那一路的下一路开始轮询，跳过正在被处理的路，保证各路公平
+        with self._cond:
+            while not self._stop.is_set():
+                n = len(self.streams)
+                for k in range(n):
+                    i = (self._next + k) % n
+                    stream = self.streams[i]
+                    if stream.pending and not stream.busy:
+                        stream.busy = True
+                        self._next = (i + 1) % n
+                        return stream, stream.pending.popleft()
+                if all(s.finished and not s.pending for s in self.streams):
+                    return None
+                self._cond.wait()
+            return None
+
+    def _release(self, stream):
+        with self._cond:
+            stream.busy = False
+            self._cond.notify_all()
+
+    def _worker_loop(self):
+        while True:
+            item = self._take()
+            if item is None:
+                return
+            stream, packet = item
+            config = stream.detector_config
+            key = tuple(sorted(config.items()))
+            detectors = stream.detectors
+            if key not in detectors:
+                try:
+                    detectors[key] = self.detector_factory(**config)
+                except Exception as e:
+                    # 检测器都建不起来时继续跑也没有意义，整体停止
+                    print(f"⚠️ 创建检测器失败: {e}")
+                    self._release(stream)
+                    self._stop.set()
+                    with self._cond:
+                        self._cond.notify_all()
+                    return
+            try:
+                hands = find_hands_raw(detectors[key], packet.frame)
+                stream.stats.detected += 1
+                if stream.fps:
+                    time_ms = packet.index * 1000.0 / stream.fps
+                else:
+                    time_ms = (packet.captured_at - self.started_at) * 1000
+                frame = packet.frame.copy() if stream.session.render else None
+                _, row = stream.session.step(packet.index, time_ms, hands, packet.frame, frame)
+                if stream.writer:
+                    stream.writer.write(row)
+                stream.stats.record_render(packet)
+            except Exception as e:
+                print(f"⚠️ {stream.name} 第 {packet.index} 帧处理失败: {e}")
+            finally:
+                self._release(stream)
+
+    def running(self):
+        with self._cond:
+            if self._stop.is_set():
+                return False
+            return not all(s.finished and not s.pending and not s.busy for s in self.streams)
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        for stream in self.streams:
+            if stream.writer:
+                stream.writer.close()
+
+    def summary(self):
+        elapsed = max(time.perf_counter() - self.started_at, 1e-6)
+        streams = {}
+        for stream in self.streams:
+            stats = stream.stats.summary()
+            stats["fps"] = stats["rendered"] / elapsed
+            streams[stream.name] = stats
+        total = sum(s["rendered"] for s in streams.values())
+        return {"elapsed": elapsed, "workers": self.workers, "processed": total, "fps": total / elapsed,
+                "streams": streams}
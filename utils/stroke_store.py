@@ -0,0 +1,127 @@
+import cv2
+import numpy as np
+
+
+class StrokeStore:
+    # 预分配数组保存笔迹点，增量维护包围框
+    #   capacity：最多保存的点数，写满后隔点抽稀（首尾保留），包围框不变
+    #   min_step：与上一个点距离小于该值（像素）的点不保存，只更新包围框
+    # draw() 把新增线段增量画到常驻的整帧掩码上，每帧只在包围框内按掩码混合，耗时与笔迹长度无关；
+    # 清空或抽稀后下一次 draw() 重画掩码
+    def __init__(self, capacity=2048, min_step=0):
+        if capacity < 4:
+            raise ValueError("capacity 至少为 4")
+        self.capacity = capacity
+        self.min_step = min_step
+        self._points = np.empty((capacity, 2), dtype=np.int32)
+        self.count = 0
+        self.bbox = None
+        self._mask = None
+        self._mask_thickness = None
+        # 整帧纯色图，颜色或分辨率变化时才重新填充
+        self._color_image = None
+        self._color = None
+        # 已画进掩码的点数；掩码中可能非零的区域 (x0, y0, x1, y1)
+        self._drawn = 0
+        self._painted = None
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def points(self):
+        return self._points[:self.count]
+
+    def clear(self):
+        self.count = 0
+        self.bbox = None
+        self._drawn = 0
+
+    def _decimate(self):
+        last = self._points[self.count - 1].copy()
+        kept = (self.count + 1) // 2
+        self._points[:kept] = self._points[0:self.count:2]
+        if (self.count - 1) % 2:
+            self._points[kept] = last
+            kept += 1
+        self.count = kept
+        self._drawn = 0
+
+    def append(self, point):
+        # 返回包围框是否发生变化
+        x, y = int(point[0]), int(point[1])
+        skip = False
+        if self.min_step and self.count:
+            last_x, last_y = self._points[self.count - 1]
+            skip = (x - last_x) ** 2 + (y - last_y) ** 2 < self.min_step ** 2
+        if not skip:
+            if self.count == self.capacity:
+                self._decimate()
+            self._points[self.count] = (x, y)
+            self.count += 1
+
+        if self.bbox is None:
+            self.bbox = (x, y, x, y)
+        else:
+            x_min, y_min, x_max, y_max = self.bbox
+            if x_min <= x <= x_max and y_min <= y <= y_max:
+                return False
+            self.bbox = (min(x_min, x), min(y_min, y), max(x_max, x), max(y_max, y))
+        return True
+
+    def clipped_bbox(self, width, height, margin=0):
+        # 裁剪到画面范围内的包围框 (x_min, y_min, x_max, y_max)，可选外扩 margin
+        if self.bbox is None:
+            return None
+        x_min, y_min, x_max, y_max = self.bbox
+        x_min, x_max = max(x_min, 0), min(x_max, width - 1)
+        y_min, y_max = max(y_min, 0), min(y_max, height - 1)
+        if margin:
+            x_min = max(x_min - margin, 0)
+            y_min = max(y_min - margin, 0)
+            x_max = min(x_max + margin, width - 1)
+            y_max = min(y_max + margin, height - 1)
+        return x_min, y_min, x_max, y_max
+
+    def draw(self, frame, color, thickness, alpha=1.0, buffers=None):
+        # 与 cv2.polylines 画在副本上再 addWeighted 混合的结果逐像素相同，结果直接写回 frame
+        if self.count < 2:
+            return frame
+        h, w = frame.shape[:2]
+        if self._mask is None or self._mask.shape != (h, w) or self._mask_thickness != thickness:
+            self._mask = np.zeros((h, w), dtype=np.uint8)
+            self._mask_thickness = thickness
+            self._drawn = 0
+            self._painted = None
+        if self._drawn == 0 and self._painted is not None:
+            x0, y0, x1, y1 = self._painted
+            self._mask[y0:y1, x0:x1] = 0
+        if self._drawn < self.count:
+            new = self._points[max(self._drawn - 1, 0):self.count]
+            cv2.polylines(self._mask, [new.reshape(-1, 1, 2)], False, 1, thickness)
+            self._drawn = self.count
+
+        # 包围框在清空前只增不减，当前包围框外扩线宽即覆盖掩码中所有非零像素
+        pad = thickness + 1
+        x_min, y_min, x_max, y_max = self.bbox
+        x0, y0 = max(x_min - pad, 0), max(y_min - pad, 0)
+        x1, y1 = min(x_max + pad + 1, w), min(y_max + pad + 1, h)
+        self._painted = (x0, y0, x1, y1)
+        if x1 <= x0 or y1 <= y0:
+            return frame
+        roi = frame[y0:y1, x0:x1]
+        mask = self._mask[y0:y1, x0:x1]
+        if alpha >= 1.0:
+            roi[mask.view(bool)] = color
+            return frame
+        if self._color_image is None or self._color_image.shape != frame.shape or self._color != tuple(color):
+            self._color_image = np.empty_like(frame)
+            self._color_image[:] = color
+            self._color = tuple(color)
+        if buffers is not None:
+            blended = buffers.acquire('stroke.overlay', frame.shape, frame.dtype)[:roi.shape[0], :roi.shape[1]]
+        else:
+            blended = np.empty_like(roi)
+        cv2.addWeighted(self._color_image[y0:y1, x0:x1], alpha, roi, 1 - alpha, 0, dst=blended)
+        cv2.copyTo(blended, mask, dst=roi)
+        return frame
@@ -0,0 +1,106 @@
+import numpy as np
+
+# 每根手指：(根部方向角，度；根部到手腕距离；三节长度)，长度以手掌尺寸为 1
+FINGER_LAYOUT = (
+    (-50.0, 0.30, (0.35, 0.30, 0.25)),   # 拇指 1-4
+    (-15.0, 0.95, (0.40, 0.25, 0.20)),   # 食指 5-8
+    (0.0, 1.00, (0.45, 0.28, 0.22)),     # 中指 9-12
+    (15.0, 0.95, (0.42, 0.26, 0.20)),    # 无名指 13-16
+    (30.0, 0.85, (0.32, 0.20, 0.18)),    # 小指 17-20
+)
+# 各手势的手指状态 [拇指, 食指, 中指, 无名指, 小指]，1 为伸直
+POSE_FINGERS = {
+    "one": (0, 1, 0, 0, 0),
+    "two": (0, 1, 1, 0, 0),
+    "open": (1, 1, 1, 1, 1),
+    "fist": (0, 0, 0, 0, 0),
+    "ok": (0, 0, 1, 1, 1),
+}
+TRAJECTORIES = ("circle", "swipe_left", "swipe_right", "swipe_up", "swipe_down", "zigzag", "still")
+
+
+def _direction(angle_deg):
+    rad = np.radians(angle_deg)
+    return np.array([np.sin(rad), -np.cos(rad)])
+
+
+class SyntheticHands:
+    # 固定随机种子的手部关键点与指尖轨迹生成器，输出与 cvzone lmList 相同的像素坐标 (21, 3)
+    def __init__(self, seed=0, frame_size=(1280, 720)):
+        self.rng = np.random.default_rng(seed)
+        self.frame_size = frame_size
+
+    def pose(self, name="one", wrist=None, scale=None, angle=None, noise=1.0):
+        if name not in POSE_FINGERS:
+            raise ValueError(f"未知手势 {name}")
+        w, h = self.frame_size
+        if wrist is None:
+            wrist = (self.rng.uniform(0.3, 0.7) * w, self.rng.uniform(0.6, 0.9) * h)
+        if scale is None:
+            scale = self.rng.uniform(110, 160)
+        if angle is None:
+            angle = self.rng.uniform(-20, 20)
+
+        pts = np.zeros((21, 2))
+        for i, (base_angle, base_dist, lengths) in enumerate(FINGER_LAYOUT):
+            direction = base_angle + angle
+            joint = _direction(direction) * base_dist
+            pts[1 + 4 * i] = joint
+            curl = 0.0 if POSE_FINGERS[name][i] else 70.0
+            if i == 0:
+                curl = -curl * 0.6
+            for j, length in enumerate(lengths):
+                direction += curl
+                joint = joint + _direction(direction) * length
+                pts[2 + 4 * i + j] = joint
+
+        if name == "ok":
+            # 拇指尖与食指尖相接
+            pts[4] = pts[8] + self.rng.normal(0, 0.03, 2)
+
+        pts = pts * scale + np.asarray(wrist, dtype=np.float64)
+        pts += self.rng.normal(0, noise, pts.shape)
+        z = self.rng.normal(0, noise, (21, 1))
+        return np.round(np.hstack([pts, z])).astype(np.int64)
+
+    def batch(self, n, poses=("one", "ok", "open", "fist")):
+        labels = [poses[i] for i in self.rng.integers(0, len(poses), n)]
+        return np.stack([self.pose(label) for label in labels]), labels
+
+    def trajectory(self, kind="circle", n=60, center=None, size=150.0, jitter=1.0):
+        # 指尖轨迹 (n, 2)
+        w, h = self.frame_size
+        if center is None:
+            center = (w / 2, h / 2)
+        t = np.linspace(0.0, 1.0, n)
+        if kind == "circle":
+            path = np.stack([np.cos(2 * np.pi * t), np.sin(2 * np.pi * t)], axis=1) * size / 2
+        elif kind in ("swipe_left", "swipe_right"):
+            sign = -1 if kind == "swipe_left" else 1
+            path = np.stack([sign * (t - 0.5) * size * 2, np.zeros(n)], axis=1)
+        elif kind in ("swipe_up", "swipe_down"):
+            sign = -1 if kind == "swipe_up" else 1
+            path = np.stack([np.zeros(n), sign * (t - 0.5) * size * 2], axis=1)
+        elif kind == "zigzag":
+            path = np.stack([(t - 0.5) * size * 2, np.abs((t * 4) % 2 - 1) * size - size / 2], axis=1)
+        elif kind == "still":
+            path = np.zeros((n, 2))
+        else:
+            raise ValueError(f"未知轨迹 {kind}")
+        return path + np.asarray(center) + self.rng.normal(0, jitter, (n, 2))
+
+    def session(self, tip_path, pose="one", hands=1, spacing=300.0):
+        # 让手势沿指尖轨迹移动，返回每帧的 hands 列表（与 findHands 输出结构一致）
+        from utils.roi_tracker import make_hand
+        template = self.pose(pose, wrist=(0.0, 0.0), angle=0.0, noise=0.0)
+        offset = template[8, :2]
+        frames = []
+        for tip in tip_path:
+            frame_hands = []
+            for k in range(hands):
+                shift = np.asarray(tip) - offset + (k * spacing, 0)
+                lm = template.copy()
+                lm[:, :2] = np.round(lm[:, :2] + shift + self.rng.normal(0, 0.5, (21, 2)))
+                frame_hands.append(make_hand(lm.tolist(), "Right" if k == 0 else "Left"))
+            frames.append(frame_hands)
+        return frames
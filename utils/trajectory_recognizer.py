@@ -0,0 +1,219 @@
+from collections import deque
+import numpy as np
+
+
+def resample_path(points, n):
+    # 按弧长把轨迹重采样为 n 个等间距点
+    pts = np.asarray(points, dtype=np.float64)
+    seg = np.hypot(*np.diff(pts, axis=0).T)
+    dist = np.concatenate([[0.0], np.cumsum(seg)])
+    if dist[-1] == 0:
+        return np.repeat(pts[:1], n, axis=0)
+    target = np.linspace(0.0, dist[-1], n)
+    return np.stack([np.interp(target, dist, pts[:, 0]), np.interp(target, dist, pts[:, 1])], axis=1)
+
+
+def normalize_path(points):
+    # 平移到质心，按包围框较长边缩放到 1；保留方向（左划/右划不同）
+    pts = points - points.mean(axis=0)
+    extent = np.ptp(pts, axis=0).max()
+    return pts / extent if extent > 0 else pts
+
+
+def dtw_distance(query, template, band, limit=np.inf):
+    # Sakoe-Chiba 带宽约束的 DTW，代价为点间欧氏距离；累计值超过 limit 时提前放弃（返回 inf）
+    n = len(query)
+    diff = query[:, None, :] - template[None, :, :]
+    cost = np.hypot(diff[..., 0], diff[..., 1]).tolist()
+    inf = float("inf")
+    prev = [inf] * n
+    for i in range(n):
+        row = [inf] * n
+        lo, hi = max(0, i - band), min(n, i + band + 1)
+        row_min = inf
+        for j in range(lo, hi):
+            if i == 0 and j == 0:
+                best = 0.0
+            else:
+                best = prev[j]
+                if j > 0:
+                    if prev[j - 1] < best:
+                        best = prev[j - 1]
+                    if row[j - 1] < best:
+                        best = row[j - 1]
+            value = cost[i][j] + best
+            row[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return inf
+        prev = row
+    return prev[n - 1]
+
+
+def default_templates(n_points=32):
+    # 圆（顺/逆时针，4 个起点）、四个方向的划动、左右方向的折线
+    from utils.synthetic_hands import SyntheticHands
+    gen = SyntheticHands(0, frame_size=(0, 0))
+
+    def path(kind):
+        return gen.trajectory(kind, n=n_points * 4, center=(0.0, 0.0), size=1.0, jitter=0.0)
+
+    templates = []
+    circle = path("circle")[:-1]
+    for direction in (1, -1):
+        for phase in range(4):
+            rolled = np.roll(circle[::direction], phase * len(circle) // 4, axis=0)
+            templates.append(("circle", np.vstack([rolled, rolled[:1]])))
+    for kind in ("swipe_left", "swipe_right", "swipe_up", "swipe_down"):
+        templates.append((kind, path(kind)))
+    zigzag = path("zigzag")
+    templates.append(("zigzag", zigzag))
+    templates.append(("zigzag", zigzag[::-1]))
+    return templates
+
+
+class TrajectoryRecognizer:
+    # 指尖轨迹的流式动态手势识别：
+    #   只保留最近 window_seconds 秒的点（固定上限 max_points），每帧取几个不同时长的尾段，
+    #   重采样为 n_points 个点并归一化后与模板做带宽 DTW；先用 LB_Keogh 下界一次性筛掉不可能的模板，
+    #   每帧开销只与模板数和 n_points 有关，与会话长度无关
+    #   threshold：每点平均 DTW 距离（归一化坐标）低于该值视为匹配
+    #   min_extent：尾段包围框小于该值（像素）时不匹配，避免把静止抖动当成手势
+    # 匹配到的手势先暂存，之后更长的匹配会替换它；等指尖停下（settle_seconds 内移动不超过 settle_distance）、
+    # 或超过 max(durations) 秒没有新的匹配时才作为事件发出，这样一次动作只产生一个事件，
+    # 画圆开头的一小段弧线也不会被当成划动
+    def __init__(self, templates=None, n_points=32, band=4, window_seconds=1.5,
+                 durations=(0.4, 0.6, 0.8, 1.0, 1.2), threshold=0.12, min_extent=80.0, settle_seconds=0.15, settle_distance=20.0, max_points=256):
+        self.n_points = n_points
+        self.band = band
+        self.window_seconds = window_seconds
+        self.durations = durations
+        self.threshold = threshold
+        self.min_extent = min_extent
+        self.settle_seconds = settle_seconds
+        self.settle_distance = settle_distance
+        self.set_templates(templates if templates is not None else default_templates(n_points))
+        self._points = deque(maxlen=max_points)
+        self.pending = None
+        self.evaluated = 0
+        self.pruned = 0
+        self.dtw_runs = 0
+
+    def set_templates(self, templates):
+        self.labels = [label for label, _ in templates]
+        self.templates = np.stack([normalize_path(resample_path(t, self.n_points)) for _, t in templates])
+        self._lower, self._upper = self._envelope(self.templates)
+
+    def reset(self):
+        self._points.clear()
+        self.pending = None
+
+    def flush(self):
+        # 手势中断（换手势、手离开画面）时调用：发出暂存的匹配并清空窗口
+        event = self.pending
+        self.reset()
+        return event
+
+    def _lower_bounds(self, queries):
+        # queries: (S, n, 2) -> (S, T)，不大于真实 DTW 距离：
+        #   LB_Keogh 分别以模板包络和查询包络计算取较大者；首尾两点必然对齐，直接用精确距离
+        q = queries[:, None]
+        t = self.templates[None]
+        forward = self._box_distance(q, self._lower[None], self._upper[None])
+        lower, upper = self._envelope(queries)
+        backward = self._box_distance(t, lower[:, None], upper[:, None])
+        ends = self._box_distance(q[:, :, [0, -1]], t[:, :, [0, -1]], t[:, :, [0, -1]])
+        forward[..., [0, -1]] = ends
+        backward[..., [0, -1]] = ends
+        return np.maximum(forward.sum(axis=2), backward.sum(axis=2))
+
+    @staticmethod
+    def _box_distance(points, lower, upper):
+        # 每个点到对应包络盒的欧氏距离（最后一维只有 x、y，直接用 hypot 比沿该轴求和快）
+        gap = np.maximum(points - upper, 0.0) + np.maximum(lower - points, 0.0)
+        return np.hypot(gap[..., 0], gap[..., 1])
+
+    def _envelope(self, paths):
+        # (K, n, 2) -> 每个位置前后 band 范围内的最小/最大值（两端按边界值填充，与截断窗口等价）
+        n, r = self.n_points, self.band
+        padded = np.pad(paths, ((0, 0), (r, r), (0, 0)), mode="edge")
+        lower = padded[:, :n].copy()
+        upper = lower.copy()
+        # 逐个平移取最值，比在滑动窗口视图上做归约快
+        for k in range(1, 2 * r + 1):
+            np.minimum(lower, padded[:, k:k + n], out=lower)
+            np.maximum(upper, padded[:, k:k + n], out=upper)
+        return lower, upper
+
+    def _queries(self, data, now):
+        # 所有时长的尾段一次性完成筛选、按弧长重采样和归一化 -> ((S, n, 2), 各段起始时间)
+        times, xy = data[:, 0], data[:, 1:]
+        durations = np.asarray(self.durations)
+        starts = np.searchsorted(times, now - durations)
+        starts = np.minimum(starts, len(times) - 1)
+        # 后缀最小/最大值：任意尾段的包围框只需一次查表
+        suffix_min = np.minimum.accumulate(xy[::-1])[::-1]
+        suffix_max = np.maximum.accumulate(xy[::-1])[::-1]
+        extent = (suffix_max[starts] - suffix_min[starts]).max(axis=1)
+        keep = (len(times) - starts >= 8) & (now - times[starts] >= durations * 0.8) & (extent >= self.min_extent)
+        starts = starts[keep]
+        if not len(starts):
+            return None, None
+        dist = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(xy, axis=0).T))])
+        targets = dist[starts, None] + (dist[-1] - dist[starts])[:, None] * np.linspace(0.0, 1.0, self.n_points)
+        queries = np.stack([np.interp(targets, dist, xy[:, 0]), np.interp(targets, dist, xy[:, 1])], axis=2)
+        queries -= queries.mean(axis=1, keepdims=True)
+        queries /= np.ptp(queries, axis=1).max(axis=1)[:, None, None]
+        return queries, times[starts]
+
+    def _match(self, data, now):
+        queries, starts = self._queries(data, now)
+        if queries is None:
+            return None
+
+        bounds = self._lower_bounds(queries)
+        limit = self.threshold * self.n_points
+        best = (np.inf, None, None)
+        runs = 0
+        # 从下界最小的组合开始算，下界已超过当前最优或阈值的（及其后所有组合）直接跳过
+        for flat in np.argsort(bounds, axis=None):
+            s, t = divmod(int(flat), bounds.shape[1])
+            if bounds[s, t] >= min(best[0], limit):
+                break
+            runs += 1
+            dist = dtw_distance(queries[s], self.templates[t], self.band, min(best[0], limit))
+            if dist < best[0]:
+                best = (dist, s, t)
+        self.evaluated += bounds.size
+        self.dtw_runs += runs
+        self.pruned += bounds.size - runs
+        if best[1] is None or best[0] > limit:
+            return None
+        dist, s, t = best
+        return {"gesture": self.labels[t], "distance": dist / self.n_points, "start": starts[s], "end": now}
+
+    def update(self, point, now):
+        # 加入一个指尖位置；有手势完成时返回事件 dict（gesture/distance/start/end，单位秒），否则返回 None
+        points = self._points
+        points.append((now, float(point[0]), float(point[1])))
+        while points and points[0][0] < now - self.window_seconds:
+            points.popleft()
+        if len(points) < 8:
+            return None
+
+        data = np.asarray(points)
+        recent = data[data[:, 0] >= now - self.settle_seconds, 1:]
+        settled = now - data[0, 0] >= self.settle_seconds and np.ptp(recent, axis=0).max() <= self.settle_distance
+        match = None if settled else self._match(data, now)
+        if match is not None:
+            self.pending = match
+            return None
+        if self.pending is None or (not settled and now - self.pending["end"] < max(self.durations)):
+            return None
+        event = self.pending
+        # 已识别的这段轨迹不再参与之后的匹配
+        while points and points[0][0] <= event["end"]:
+            points.popleft()
+        self.pending = None
+        return event
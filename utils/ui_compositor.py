@@ -0,0 +1,105 @@
+import cv2
+import numpy as np
+
+
+class UILayer:
+    # 预渲染好的一组控件：只保存包围框内的像素
+    #   mask：完全不透明的像素（uint8 掩码，用 cv2.copyTo 复制）
+    #   edge_*：抗锯齿边缘等半透明像素的坐标、预乘颜色和透明度，单独按 alpha 混合
+    __slots__ = ("key", "x", "y", "pixels", "mask", "opaque", "edge_ys", "edge_xs", "edge_color", "edge_alpha")
+
+    def __init__(self, key, x, y, pixels, mask, edges=None):
+        self.key = key
+        self.x = x
+        self.y = y
+        self.pixels = pixels
+        self.mask = mask
+        self.opaque = mask is None or bool(mask.all())
+        if edges is None:
+            edges = (np.empty(0, np.intp), np.empty(0, np.intp), np.empty((0, 3)), np.empty((0, 1)))
+        self.edge_ys, self.edge_xs, self.edge_color, self.edge_alpha = edges
+
+    def blit(self, frame):
+        h, w = self.pixels.shape[:2]
+        # 画面比缓存时小（例如分辨率变化前的旧层）时裁掉越界部分
+        h, w = min(h, frame.shape[0] - self.y), min(w, frame.shape[1] - self.x)
+        if h <= 0 or w <= 0:
+            return frame
+        roi = frame[self.y:self.y + h, self.x:self.x + w]
+        if self.opaque:
+            roi[...] = self.pixels[:h, :w]
+        else:
+            # cv2.copyTo 按掩码复制，比 np.copyto(where=...) 快得多
+            cv2.copyTo(self.pixels[:h, :w], self.mask[:h, :w], roi)
+        if len(self.edge_ys):
+            keep = (self.edge_ys < h) & (self.edge_xs < w)
+            ys, xs = self.edge_ys[keep], self.edge_xs[keep]
+            under = roi[ys, xs]
+            roi[ys, xs] = np.rint(self.edge_color[keep] + under * (1.0 - self.edge_alpha[keep])).astype(np.uint8)
+        return frame
+
+
+class UICompositor:
+    # 静态控件缓存：每组控件按 key（状态 + 分辨率）缓存一次渲染结果，之后每帧只做一次带掩码的 ROI 复制
+    # render(canvas) 在与画面同尺寸的画布上按画面坐标绘制；分别在黑底和白底上各画一次，
+    # 由两次结果之差得到每个像素的透明度，纯黑/纯白的文字边框和抗锯齿边缘都能正确还原
+    def __init__(self):
+        self._layers = {}
+        self.renders = 0
+        self.blits = 0
+
+    def layer(self, name, key, shape, render):
+        key = (key, tuple(shape))
+        layer = self._layers.get(name)
+        if layer is None or layer.key != key:
+            layer = self._layers[name] = self._render(key, shape, render)
+        return layer
+
+    def _render(self, key, shape, render):
+        self.renders += 1
+        dark = np.zeros(shape, dtype=np.uint8)
+        light = np.full(shape, 255, dtype=np.uint8)
+        render(dark)
+        render(light)
+        # 黑底结果 = alpha * 颜色，白底结果 = alpha * 颜色 + (1 - alpha) * 255
+        transparency = (light.astype(np.int16) - dark).max(axis=2)
+        drawn = transparency < 255
+        rows = np.flatnonzero(drawn.any(axis=1))
+        cols = np.flatnonzero(drawn.any(axis=0))
+        if rows.size == 0:
+            return UILayer(key, 0, 0, dark[:0, :0], None)
+        y0, y1, x0, x1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+        transparency = transparency[y0:y1, x0:x1]
+        pixels = dark[y0:y1, x0:x1].copy()
+        solid = transparency <= 0
+        ys, xs = np.nonzero(~solid & (transparency < 255))
+        alpha = (1.0 - transparency[ys, xs] / 255.0)[:, None]
+        edges = (ys, xs, pixels[ys, xs].astype(np.float64), alpha)
+        return UILayer(key, int(x0), int(y0), pixels, solid.astype(np.uint8), edges)
+
+    def draw(self, frame, name, key, render):
+        # key 相同则直接复用缓存层，否则重新渲染该组
+        self.layer(name, key, frame.shape, render).blit(frame)
+        self.blits += 1
+        return frame
+
+    def invalidate(self, name=None):
+        if name is None:
+            self._layers.clear()
+        else:
+            self._layers.pop(name, None)
+
+
+def draw_save_button(frame, rect):
+    bx, by, bw, bh = rect
+    cv2.rectangle(frame, (bx, by), (bx + bw, by + bh), (0, 255, 255), -1)
+    text = "Save"
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    font_scale = 0.6
+    thickness = 2
+    (text_w, text_h), baseline = cv2.getTextSize(text, font, font_scale, thickness)
+    # 文字水平垂直居中
+    text_x = bx + (bw - text_w) // 2
+    text_y = by + (bh + text_h) // 2
+    cv2.putText(frame, text, (text_x, text_y), font, font_scale, (0, 0, 0), thickness)
+    return frame